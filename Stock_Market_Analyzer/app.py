@@ -14,9 +14,25 @@ if str(src_path) not in sys.path:
 
 # Import your backend functions (assumes these files are available in src/)
 from data_cleaning import load_data, clean_data
-from data_analysis import daily_returns, cumulative_returns, annualized_volatility, correlation_matrix, sharpe_ratio
+from schema import CLOSE_FIELDS, get_schema
+from data_analysis import compute_all_metrics, risk_metrics
+from correlation_engine import summarize_correlation_matrix
+from resampling import infer_periods_per_year
 from utils.plot_cumulative_returns import plot_cumulative_returns
 from utils.plot_corr_matrix import plot_corr_matrix
+from utils.plot_efficient_frontier import plot_efficient_frontier
+from portfolio import (shrink_covariance, efficient_frontier, min_variance, max_sharpe,
+                       risk_parity, portfolio_stats)
+from result_cache import ResultCache, make_key
+from instrumentation import Tracer, NULL_TRACER
+
+# Local OHLCV store so repeat queries only download the dates not seen yet
+PRICE_CACHE_DIR = Path(__file__).parent.joinpath(".price_cache")
+DATA_PROVIDER = "yfinance"
+# Portfolio construction is O(k^3) per optimizer step; skip it for larger universes
+MAX_PORTFOLIO_TICKERS = 250
+# Append every request's stage trace to this JSON lines file when set
+TRACE_LOG = os.environ.get("STOCK_ANALYZER_TRACE_LOG")
 
 # Configure the page
 st.set_page_config(
@@ -92,9 +108,13 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-def generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, tickers):
+def generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, tickers, corr_summary=None, risk=None):
     """
     Generate textual insights from computed metrics.
+
+    corr_summary (from correlation_engine) avoids scanning
+    every pair of corr_matrix; it is derived from corr_matrix when omitted.
+    risk (from data_analysis.risk_metrics) adds a downside risk section.
     """
     st.subheader("📊 Cumulative Returns Analysis")
 
@@ -133,24 +153,32 @@ def generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, tickers):
         if vol_range > 2:
             st.info("- ⚠️ Significant difference in risk profiles - consider diversification")
 
+    # Downside risk
+    if risk is not None and not risk.empty:
+        st.subheader("\n 🩸 Downside Risk")
+        worst_dd = risk['max_drawdown'].idxmin()
+        worst_cvar = risk['cvar'].idxmax()
+        st.markdown(f"- 📉 **{worst_dd}** had the deepest drawdown: **{risk['max_drawdown'].min() * 100:.1f}%**")
+        st.markdown(f"- 🔥 **{worst_cvar}** has the heaviest tail: average loss of "
+                    f"**{risk['cvar'].max() * 100:.1f}%** on its worst 5% of days")
+        if risk['sortino'].notna().any():
+            st.markdown(f"- 🛡️ **{risk['sortino'].idxmax()}** had the best downside-adjusted returns (Sortino Ratio)")
+        if 'beta' in risk:
+            defensive = [t for t, b in risk['beta'].items() if b < 0.8]
+            aggressive = [t for t, b in risk['beta'].items() if b > 1.2]
+            if aggressive:
+                st.markdown(f"- 🚀 **High beta:** {', '.join(aggressive)} - amplify the basket's moves")
+            if defensive:
+                st.markdown(f"- 🧱 **Low beta:** {', '.join(defensive)} - move less than the basket")
+
     # Correlation
     st.subheader("\n 🔗 Correlation & Diversification")
-    if corr_matrix is not None and not corr_matrix.empty and corr_matrix.shape[0] > 1:
-        strong_corr_pairs = []
-        weak_corr_pairs = []
-
-        cols = corr_matrix.columns
-        for i in range(len(cols)):
-            for j in range(i + 1, len(cols)):
-                stock_a = cols[i]
-                stock_b = cols[j]
-                corr_value = corr_matrix.iloc[i, j]
-                if pd.isna(corr_value):
-                    continue
-                if corr_value > 0.7:
-                    strong_corr_pairs.append((stock_a, stock_b, corr_value))
-                elif corr_value < 0.3:
-                    weak_corr_pairs.append((stock_a, stock_b, corr_value))
+    if corr_summary is None and corr_matrix is not None and not corr_matrix.empty and corr_matrix.shape[0] > 1:
+        corr_summary = summarize_correlation_matrix(corr_matrix)
+
+    if corr_summary is not None and corr_summary.n_pairs > 0:
+        strong_corr_pairs = [p for p in corr_summary.most_correlated if p[2] > 0.7]
+        weak_corr_pairs = [p for p in corr_summary.least_correlated if p[2] < 0.3]
 
         if strong_corr_pairs:
             st.markdown("**Strong Correlations (Move Together):**")
@@ -184,17 +212,15 @@ def generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, tickers):
 
     # Overall portfolio assessment (avg correlation)
     st.subheader("\n 💼 Overall Portfolio Assessment")
-    if corr_matrix is not None and not corr_matrix.empty and corr_matrix.shape[0] > 1:
-        # compute average off-diagonal correlation
-        tri_idxs = np.triu_indices_from(corr_matrix.values, k=1)
-        if len(tri_idxs[0]) > 0:
-            avg_correlation = np.nanmean(corr_matrix.values[tri_idxs])
-            if avg_correlation < 0.4:
-                st.markdown("**🎉 Excellent Diversification** - Low average correlation provides strong risk reduction")
-            elif avg_correlation < 0.7:
-                st.markdown("**👍 Good Diversification** - Moderate correlations offer reasonable risk management")
-            else:
-                st.markdown("**⚠️ Limited Diversification** - High correlations mean stocks tend to move together")
+    if corr_summary is not None and corr_summary.n_pairs > 0:
+        # average off-diagonal correlation
+        avg_correlation = corr_summary.average
+        if avg_correlation < 0.4:
+            st.markdown("**🎉 Excellent Diversification** - Low average correlation provides strong risk reduction")
+        elif avg_correlation < 0.7:
+            st.markdown("**👍 Good Diversification** - Moderate correlations offer reasonable risk management")
+        else:
+            st.markdown("**⚠️ Limited Diversification** - High correlations mean stocks tend to move together")
 
     # Investment implications: match returns vs risk
     st.subheader("\n 💡 Investment Implications")
@@ -220,6 +246,239 @@ def generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, tickers):
     return "\n"
 
 
+@st.cache_resource
+def get_result_cache():
+    """One ResultCache shared by every session and rerun of the app."""
+    return ResultCache(maxsize=32, ttl=15 * 60)
+
+
+def compute_analysis(tickers, start, end, provider=DATA_PROVIDER, tracer=NULL_TRACER,
+                     dtype_policy="full", portfolios=True):
+    """
+    Load, clean and analyze prices and build the figures for one query.
+
+    dtype_policy='compact' loads only the close fields and keeps prices and
+    returns as float32 (see data_cleaning.DTYPE_POLICIES).
+    portfolios=False skips portfolio construction, which is also skipped
+    above MAX_PORTFOLIO_TICKERS tickers.
+    Every step is recorded as a stage of tracer (a no-op by default).
+    Raises ValueError with a user-facing message when there is nothing to show.
+    """
+    # The dashboard only analyzes close prices
+    fields = CLOSE_FIELDS if dtype_policy == "compact" else None
+    with tracer.stage("load_data") as stage:
+        raw_data = stage.record_shape(
+            load_data(list(tickers), start, end, cache=PRICE_CACHE_DIR, provider=provider,
+                      fields=fields, dtype_policy=dtype_policy))
+    with tracer.stage("clean_data") as stage:
+        cleaned_data = stage.record_shape(clean_data(raw_data, fields=fields, dtype_policy=dtype_policy))
+    del raw_data
+
+    if cleaned_data is None or cleaned_data.empty:
+        raise ValueError("No data found for the given tickers and date range.")
+
+    # Exact (ticker, field) -> column map filled in by clean_data
+    schema = get_schema(cleaned_data)
+    close_field = schema.close_field()
+    if close_field is None:
+        raise ValueError("No close/adjusted close columns found in the data.")
+
+    with tracer.stage("select_close") as stage:
+        adj_close = stage.record_shape(schema.select(cleaned_data, close_field))
+
+    # Annualize by the bar size of the loaded prices (252 for daily bars)
+    periods = infer_periods_per_year(adj_close.index)
+
+    # Calculate metrics in a single pass over the price matrix
+    with tracer.stage("compute_all_metrics") as stage:
+        metrics = compute_all_metrics(adj_close, periods_per_year=periods)
+        stage.record_shape(adj_close)
+    if metrics is None or metrics.daily_returns.empty:
+        raise ValueError("Daily returns calculation produced no data.")
+
+    # Downside risk, with beta measured against the equal-weighted basket
+    with tracer.stage("risk_metrics") as stage:
+        risk = stage.record_shape(
+            risk_metrics(metrics.daily_returns, benchmark=metrics.daily_returns.mean(axis=1),
+                         periods_per_year=periods))
+    with tracer.stage("correlation_summary"):
+        # compute_all_metrics already produced the full matrix
+        corr_summary = summarize_correlation_matrix(metrics.correlation)
+    with tracer.stage("plot_cumulative_returns"):
+        fig_cumulative = plot_cumulative_returns(metrics.cumulative_returns)
+    with tracer.stage("plot_corr_matrix"):
+        fig_corr = plot_corr_matrix(metrics.correlation)
+    n_tickers = metrics.daily_returns.shape[1]
+    portfolio_note = None
+    if portfolios and n_tickers > MAX_PORTFOLIO_TICKERS:
+        portfolio_note = (f"Portfolio construction skipped for {n_tickers} tickers "
+                          f"(limit {MAX_PORTFOLIO_TICKERS}).")
+    if portfolios and portfolio_note is None:
+        with tracer.stage("build_portfolios"):
+            portfolios = build_portfolios(metrics, periods)
+    else:
+        portfolios = None
+
+    # Prepare CSV for download
+    with tracer.stage("csv_export") as stage:
+        output_data = metrics.cumulative_returns.copy()
+        output_data = output_data.reset_index().rename(columns={'index': 'Date'}) if output_data.index.name is None else output_data.reset_index()
+        csv = output_data.to_csv(index=False)
+        stage.record_shape(output_data)
+
+    return {
+        'adj_close': adj_close,
+        'metrics': metrics,
+        'risk': risk,
+        'corr_summary': corr_summary,
+        'fig_cumulative': fig_cumulative,
+        'fig_corr': fig_corr,
+        'portfolios': portfolios,
+        'portfolio_note': portfolio_note,
+        'csv': csv,
+    }
+
+
+def build_portfolios(metrics, periods_per_year=252):
+    """
+    Efficient frontier and the minimum-variance, maximum-Sharpe and
+    risk-parity portfolios on the Ledoit-Wolf shrunk covariance.
+
+    Returns None when there are fewer than two tickers.
+    """
+    if metrics.daily_returns.shape[1] < 2:
+        return None
+    cov, _ = shrink_covariance(metrics.daily_returns)
+    mu = metrics.mean
+    weights = pd.DataFrame({
+        'Min Variance': min_variance(cov),
+        'Max Sharpe': max_sharpe(cov, mu, periods_per_year=periods_per_year),
+        'Risk Parity': risk_parity(cov),
+    })
+    stats = {name: portfolio_stats(w, cov, mu, periods_per_year=periods_per_year)[:2]
+             for name, w in weights.items()}
+    frontier = efficient_frontier(cov, mu, periods_per_year=periods_per_year)
+    figure = plot_efficient_frontier(frontier, mu * periods_per_year, metrics.volatility, stats)
+    return {'weights': weights, 'fig_frontier': figure}
+
+
+def run_analysis(tickers, start, end, provider=DATA_PROVIDER, tracer=NULL_TRACER, dtype_policy="full",
+                 portfolios=True):
+    """
+    compute_analysis, memoized per (tickers, start, end, provider, dtype_policy, portfolios).
+
+    Cached results record no compute stages in tracer.
+    """
+    key = make_key(tickers, start, end, provider) + (dtype_policy, portfolios)
+    return get_result_cache().get_or_compute(key, compute_analysis, tuple(key[0]), start, end, provider,
+                                             tracer=tracer, dtype_policy=dtype_policy, portfolios=portfolios)
+
+
+def render_analysis(result, tracer=NULL_TRACER):
+    """Draw the charts, tables and insights of a run_analysis result."""
+    adj_close = result['adj_close']
+    metrics = result['metrics']
+    cum_ret = metrics.cumulative_returns
+    ann_vol = metrics.volatility
+    corr_matrix = metrics.correlation
+    sharpe = metrics.sharpe
+
+    st.success(f"✅ Successfully loaded data for {len(adj_close.columns)} stocks")
+
+    # Visuals
+    st.markdown("---")
+    st.subheader("📈 Visual Analysis")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Cumulative Returns**")
+        st.plotly_chart(result['fig_cumulative'], use_container_width=True)
+
+    with col2:
+        st.markdown("**Correlation Matrix**")
+        st.plotly_chart(result['fig_corr'], use_container_width=True)
+
+    # Metrics table
+    st.markdown("## 📋 Key Metrics")
+    metrics_data = {
+        'Ticker': list(ann_vol.index),
+        'Annualized Volatility': [f"{v:.3f}" for v in ann_vol.values],
+        'Sharpe Ratio': [f"{v:.3f}" for v in sharpe.reindex(ann_vol.index).values]
+    }
+    risk = result['risk']
+    if not risk.empty:
+        risk = risk.reindex(ann_vol.index)
+        metrics_data.update({
+            'Sortino Ratio': [f"{v:.3f}" for v in risk['sortino'].values],
+            'Max Drawdown': [f"{v:.1%}" for v in risk['max_drawdown'].values],
+            'VaR 95%': [f"{v:.2%}" for v in risk['var_historical'].values],
+            'CVaR 95%': [f"{v:.2%}" for v in risk['cvar'].values],
+            'Beta': [f"{v:.2f}" for v in risk['beta'].values],
+        })
+    metrics_df = pd.DataFrame(metrics_data)
+    st.dataframe(metrics_df, use_container_width=True)
+
+    # Portfolio construction
+    portfolios = result['portfolios']
+    if portfolios is not None:
+        st.markdown("## 🧮 Portfolio Construction")
+        st.plotly_chart(portfolios['fig_frontier'], use_container_width=True)
+        weights = portfolios['weights']
+        weights = weights[(weights > 0.001).any(axis=1)].sort_values('Max Sharpe', ascending=False)
+        st.dataframe(weights.style.format("{:.1%}"), use_container_width=True)
+    elif result['portfolio_note']:
+        st.info(result['portfolio_note'])
+
+    # Insights
+    st.markdown("## 🧠 Theoretical Analysis & Insights")
+    with tracer.stage("generate_insights"):
+        insights = generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, list(adj_close.columns),
+                                     result['corr_summary'], result['risk'])
+    # st.markdown(f'<div class="insight-box">{insights}</div>', unsafe_allow_html=True)
+
+    # Interpretation helper
+    with st.expander("📖 How to Interpret These Metrics"):
+        st.markdown(
+            """
+- **Cumulative Returns**: Shows growth of $1 investment over time
+- **Volatility**: Higher values = more risk/price swings
+- **Sharpe Ratio**: >1 = Good, >2 = Excellent, <0 = Poor risk-adjusted returns
+- **Sortino Ratio**: Like Sharpe, but only penalizes downside volatility
+- **Max Drawdown**: Largest fall from a previous peak
+- **VaR / CVaR 95%**: Daily loss exceeded on 5% of days / average loss on those days
+- **Beta**: Sensitivity to the equal-weighted basket (>1 amplifies its moves)
+- **Efficient Frontier**: Highest expected return for each level of risk (long-only, fully invested)
+- **Risk Parity**: Weights where every stock contributes equally to portfolio risk
+- **Correlation**: 
+  - 0.8-1.0: Very strong (stocks move together)
+  - 0.5-0.8: Strong correlation  
+  - 0.3-0.5: Moderate correlation
+  - 0.0-0.3: Weak correlation (good for diversification)
+  - Negative: Stocks move in opposite directions
+            """
+        )
+
+    st.download_button(
+        label="📥 Download CSV Report",
+        data=result['csv'],
+        file_name="stock_analysis_report.csv",
+        mime="text/csv"
+    )
+
+
+def render_trace(tracer, show=True):
+    """Log the request's trace and, if asked, show it in an expander."""
+    if not tracer.enabled:
+        return
+    if TRACE_LOG:
+        tracer.write_json_lines(TRACE_LOG)
+    if show:
+        with st.expander("⏱️ Performance Trace"):
+            if not any(r.name == "load_data" for r in tracer.records):
+                st.caption("Analysis served from the result cache; only rendering was timed.")
+            st.dataframe(tracer.to_frame(), use_container_width=True)
+
+
 def main():
     st.title("📈 Stock Performance Analytics")
     st.markdown("Analyze cumulative returns, correlations, and risk metrics for multiple stocks.")
@@ -245,6 +504,14 @@ def main():
     with col2:
         end_date = st.date_input("End Date", value=default_end)
 
+    show_trace = st.checkbox("Show performance trace", value=False,
+                             help="Time every pipeline stage of this request")
+    compact = st.checkbox("Compact memory mode", value=False,
+                          help="Load only close prices and keep them as float32; "
+                               "for large universes or long histories")
+    optimize = st.checkbox("Portfolio construction", value=True,
+                           help="Efficient frontier, max-Sharpe and risk-parity weights; "
+                                f"skipped above {MAX_PORTFOLIO_TICKERS} tickers")
     generate_clicked = st.button("Generate Analysis")
 
     if generate_clicked:
@@ -257,118 +524,33 @@ def main():
             st.error("Start date must be before end date.")
             return
 
-        try:
-            tickers = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
-            # yfinance treats end date as exclusive. Add one day to include the user's end date.
-            yf_end = (pd.to_datetime(end_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
-            yf_start = pd.to_datetime(start_date).strftime("%Y-%m-%d")
-
-            with st.spinner("Loading and analyzing data..."):
-                raw_data = load_data(tickers, yf_start, yf_end)
-                cleaned_data = clean_data(raw_data)
-
-                if cleaned_data is None or cleaned_data.empty:
-                    st.error("No data found for the given tickers and date range.")
-                    return
-
-                # Find adjusted close columns robustly: common naming includes 'Adj Close', 'Close'
-                close_candidates = [c for c in cleaned_data.columns if 'Adj Close' in c or 'AdjClose' in c or c.endswith('_Adj Close') or 'Close' in c]
-                if not close_candidates:
-                    st.error("No close/adjusted close columns found in the data.")
-                    return
-
-                adj_close = cleaned_data[close_candidates].copy()
-
-                # Map columns to tickers: if the cleaned columns contain ticker prefix/suffix
-                column_mapping = {}
-                for col in adj_close.columns:
-                    upper_col = col.upper()
-                    matched = None
-                    for ticker in tickers:
-                        if ticker in upper_col:
-                            matched = ticker
-                            break
-                    # fallback: keep original column name if no match
-                    column_mapping[col] = matched if matched is not None else col
-
-                adj_close.rename(columns=column_mapping, inplace=True)
-
-                # If any duplicate ticker column names after mapping, keep first occurrence
-                adj_close = adj_close.loc[:, ~adj_close.columns.duplicated()]
-
-                st.success(f"✅ Successfully loaded data for {len(adj_close.columns)} stocks")
-
-                # Calculate metrics
-                daily_ret = daily_returns(adj_close)
-                if daily_ret.empty:
-                    st.error("Daily returns calculation produced no data.")
-                    return
-
-                cum_ret = cumulative_returns(adj_close)
-                ann_vol = annualized_volatility(daily_ret)
-                corr_matrix = correlation_matrix(daily_ret)
-                sharpe = sharpe_ratio(daily_ret, ann_vol)
-
-                # Visuals
-                st.markdown("---")
-                st.subheader("📈 Visual Analysis")
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**Cumulative Returns**")
-                    fig_cumulative = plot_cumulative_returns(cum_ret)
-                    st.plotly_chart(fig_cumulative, use_container_width=True)
-
-                with col2:
-                    st.markdown("**Correlation Matrix**")
-                    fig_corr = plot_corr_matrix(corr_matrix)
-                    st.plotly_chart(fig_corr, use_container_width=True)
-
-                # Metrics table
-                st.markdown("## 📋 Key Metrics")
-                metrics_data = {
-                    'Ticker': list(ann_vol.index),
-                    'Annualized Volatility': [f"{v:.3f}" for v in ann_vol.values],
-                    'Sharpe Ratio': [f"{v:.3f}" for v in sharpe.reindex(ann_vol.index).values]
-                }
-                metrics_df = pd.DataFrame(metrics_data)
-                st.dataframe(metrics_df, use_container_width=True)
-
-                # Insights
-                st.markdown("## 🧠 Theoretical Analysis & Insights")
-                insights = generate_insights(cum_ret, corr_matrix, ann_vol, sharpe, list(adj_close.columns))
-                # st.markdown(f'<div class="insight-box">{insights}</div>', unsafe_allow_html=True)
-
-                # Interpretation helper
-                with st.expander("📖 How to Interpret These Metrics"):
-                    st.markdown(
-                        """
-- **Cumulative Returns**: Shows growth of $1 investment over time
-- **Volatility**: Higher values = more risk/price swings
-- **Sharpe Ratio**: >1 = Good, >2 = Excellent, <0 = Poor risk-adjusted returns
-- **Correlation**: 
-  - 0.8-1.0: Very strong (stocks move together)
-  - 0.5-0.8: Strong correlation  
-  - 0.3-0.5: Moderate correlation
-  - 0.0-0.3: Weak correlation (good for diversification)
-  - Negative: Stocks move in opposite directions
-                        """
-                    )
-
-                # Prepare CSV for download
-                output_data = cum_ret.copy()
-                output_data = output_data.reset_index().rename(columns={'index': 'Date'}) if output_data.index.name is None else output_data.reset_index()
-                csv = output_data.to_csv(index=False)
-
-                st.download_button(
-                    label="📥 Download CSV Report",
-                    data=csv,
-                    file_name="stock_analysis_report.csv",
-                    mime="text/csv"
-                )
-
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
+        tickers = [ticker.strip().upper() for ticker in tickers_input.split(',') if ticker.strip()]
+        # yfinance treats end date as exclusive. Add one day to include the user's end date.
+        yf_end = (pd.to_datetime(end_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        yf_start = pd.to_datetime(start_date).strftime("%Y-%m-%d")
+        # Remember the query so later reruns (any widget change) keep showing it
+        st.session_state['analysis_query'] = (tuple(tickers), yf_start, yf_end)
+
+    query = st.session_state.get('analysis_query')
+    if query is None:
+        return
+
+    tracer = Tracer(name=",".join(query[0]), enabled=show_trace or bool(TRACE_LOG))
+    try:
+        with st.spinner("Loading and analyzing data..."):
+            with tracer.stage("run_analysis"):
+                result = run_analysis(*query, tracer=tracer,
+                                      dtype_policy="compact" if compact else "full",
+                                      portfolios=optimize)
+        with tracer.stage("render_analysis"):
+            render_analysis(result, tracer)
+
+    except ValueError as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
+    finally:
+        render_trace(tracer, show_trace)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+"""
+Headless batch report generator.
+
+Runs load_data -> clean_data -> data_analysis metrics for every basket in a
+baskets file and writes the results to CSV or Parquet, without Streamlit.
+
+Prices are fetched once in the parent process into a shared on-disk
+PriceCache; baskets are then analyzed in parallel worker processes that only
+read from that cache.
+
+Baskets file (CSV or JSON) with one basket per row/object:
+    name,tickers,start,end
+    tech,"AAPL MSFT GOOGL",2023-01-01,2024-01-01
+
+Usage:
+    python batch_report.py baskets.csv --output reports --format parquet --workers 8
+    python batch_report.py baskets.csv --provider minute_data/ --bar-size 30min
+"""
+
+import argparse
+import json
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+src_path = Path(__file__).parent.joinpath("src")
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from data_cleaning import load_data, clean_data
+from data_providers import LocalFileProvider, get_provider
+from price_cache import PriceCache
+from schema import CLOSE_FIELDS, get_schema
+from data_analysis import compute_all_metrics
+from correlation_engine import summarize_correlation_matrix
+from resampling import infer_periods_per_year, periods_per_year
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.joinpath(".price_cache")
+
+
+def basket_dirname(name, taken):
+    """
+    Directory name for a basket: characters other than letters, digits,
+    '-', '_' and '.' are replaced and leading dots stripped (so names cannot
+    leave the output directory), and repeated names get a _2, _3, ... suffix.
+    """
+    base = re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".") or "basket"
+    dirname, n = base, 1
+    while dirname.lower() in taken:
+        n += 1
+        dirname = f"{base}_{n}"
+    taken.add(dirname.lower())
+    return dirname
+
+
+def _basket_dates(row):
+    """(start, end) of a basket row as YYYY-MM-DD strings."""
+    dates = []
+    for key in ("start", "end"):
+        date = pd.Timestamp(row.get(key) or None)
+        if pd.isna(date):
+            raise ValueError(f"missing {key} date")
+        dates.append(date.strftime("%Y-%m-%d"))
+    return dates
+
+
+def read_baskets(path):
+    """
+    Load baskets as a list of {'name', 'tickers', 'start', 'end'} dicts.
+    Names are made safe and unique with basket_dirname. Rows without
+    tickers or with missing/invalid dates are skipped with a warning.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        text = path.read_text().strip()
+        rows = json.loads(text) if text else []
+    else:
+        try:
+            rows = pd.read_csv(path, dtype=str).fillna("").to_dict("records")
+        except pd.errors.EmptyDataError:
+            rows = []
+
+    baskets = []
+    taken = set()
+    for i, row in enumerate(rows):
+        tickers = row.get("tickers") or []
+        if isinstance(tickers, str):
+            tickers = tickers.replace(",", " ").replace(";", " ").split()
+        tickers = [str(t).strip().upper() for t in tickers if str(t).strip()]
+        try:
+            if not tickers:
+                raise ValueError("no tickers")
+            start, end = _basket_dates(row)
+        except ValueError as e:
+            print(f"⚠️ Skipping basket {i + 1} ({row.get('name') or 'unnamed'}): {e}", file=sys.stderr)
+            continue
+        baskets.append({
+            "name": basket_dirname(str(row.get("name") or "").strip() or f"basket_{i}", taken),
+            "tickers": tickers,
+            "start": start,
+            "end": end,
+        })
+    return baskets
+
+
+def prefetch(baskets, cache_dir, provider):
+    """Fill the shared price cache once per distinct date range."""
+    by_range = {}
+    for basket in baskets:
+        by_range.setdefault((basket["start"], basket["end"]), set()).update(basket["tickers"])
+    for (start, end), tickers in by_range.items():
+        load_data(sorted(tickers), start, end, cache=cache_dir, provider=provider)
+
+
+def write_table(df, path, fmt):
+    if fmt == "parquet":
+        df.to_parquet(path.with_suffix(".parquet"))
+    else:
+        df.to_csv(path.with_suffix(".csv"))
+
+
+def run_basket(basket, cache_path, output_dir, fmt, dtype_policy="full", periods=None):
+    """
+    Analyze one basket from the cache and write its report files.
+
+    dtype_policy='compact' cleans only the close fields, as float32.
+    periods is the number of bars per year used for annualization (None
+    infers it from the spacing of the prices).
+    """
+    status = {"name": basket["name"], "tickers": len(basket["tickers"]), "ok": False, "error": ""}
+    try:
+        raw_data = PriceCache(cache_path).read_range(basket["tickers"], basket["start"], basket["end"])
+        fields = CLOSE_FIELDS if dtype_policy == "compact" else None
+        cleaned_data = clean_data(raw_data, fields=fields, dtype_policy=dtype_policy)
+        del raw_data
+        if cleaned_data.empty:
+            raise ValueError("no data for basket")
+
+        schema = get_schema(cleaned_data)
+        if schema.close_field() is None:
+            raise ValueError("no close/adjusted close columns")
+        prices = schema.select(cleaned_data, schema.close_field())
+        metrics = compute_all_metrics(prices, periods_per_year=periods or infer_periods_per_year(prices.index))
+        if metrics is None or metrics.daily_returns.empty:
+            raise ValueError("not enough prices to compute returns")
+        pairs = summarize_correlation_matrix(metrics.correlation, top_k=10)
+
+        out = Path(output_dir).joinpath(basket["name"])
+        out.mkdir(parents=True, exist_ok=True)
+
+        table = pd.DataFrame({
+            "total_return": metrics.cumulative_returns.iloc[-1],
+            "mean_daily_return": metrics.mean,
+            "annualized_volatility": metrics.volatility,
+            "sharpe_ratio": metrics.sharpe,
+        })
+        table.index.name = "ticker"
+        write_table(table, out / "metrics", fmt)
+        write_table(metrics.cumulative_returns, out / "cumulative_returns", fmt)
+
+        summary = pd.DataFrame(
+            [("most", a, b, v) for a, b, v in pairs.most_correlated]
+            + [("least", a, b, v) for a, b, v in pairs.least_correlated]
+            + [("average", "", "", pairs.average)],
+            columns=["kind", "ticker_a", "ticker_b", "correlation"],
+        )
+        write_table(summary, out / "correlation_summary", fmt)
+
+        status["tickers"] = prices.shape[1]
+        status["ok"] = True
+    except Exception as e:
+        status["error"] = f"{type(e).__name__}: {e}"
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate metrics reports for ticker baskets.")
+    parser.add_argument("baskets", help="CSV or JSON file of baskets (name, tickers, start, end)")
+    parser.add_argument("--output", default="reports", help="Output directory")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Shared price cache directory")
+    parser.add_argument("--provider", default="yfinance", help="'yfinance' or a directory of per-ticker files")
+    parser.add_argument("--dtype-policy", choices=["full", "compact"], default="full",
+                        help="'compact' keeps float32 close prices only, for large baskets")
+    parser.add_argument("--bar-size", default=None,
+                        help="Resample the provider directory's intraday rows to bars of this size (e.g. 5min, h, D)")
+    args = parser.parse_args(argv)
+
+    baskets = read_baskets(args.baskets)
+    if args.bar_size is None:
+        provider, periods = get_provider(args.provider), None
+    elif Path(args.provider).is_dir():
+        provider, periods = LocalFileProvider(args.provider, bar_size=args.bar_size), periods_per_year(args.bar_size)
+    else:
+        parser.error("--bar-size needs --provider to be a directory of per-ticker files")
+    print(f"Fetching prices for {len(baskets)} baskets...")
+    prefetch(baskets, args.cache_dir, provider)
+
+    # Same layout as load_data(cache=...): one subdirectory per provider
+    cache_path = Path(args.cache_dir).joinpath(provider.name)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_basket, b, cache_path, args.output, args.format,
+                               args.dtype_policy, periods) for b in baskets]
+        results = [f.result() for f in futures]
+
+    report = pd.DataFrame(results, columns=["name", "tickers", "ok", "error"])
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    report.to_csv(Path(args.output).joinpath("summary.csv"), index=False)
+
+    failed = report[~report["ok"]]
+    print(f"✅ {len(report) - len(failed)} reports written to {args.output}")
+    for _, row in failed.iterrows():
+        print(f"❌ {row['name']}: {row['error']}")
+    return 0 if failed.empty else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
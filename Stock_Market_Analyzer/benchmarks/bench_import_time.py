@@ -0,0 +1,76 @@
+"""
+Import-time budget for the analysis modules.
+
+Each module is imported several times in a fresh interpreter that has
+already loaded numpy and pandas; the best time is checked against a budget,
+and the run fails if any heavy optional dependency (plotting, ML, Streamlit,
+data download) was loaded along the way.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --modules data_analysis features model --budget 0.3
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent.joinpath("src")
+
+# Modules that must stay off the import path of the analysis code
+HEAVY_MODULES = ("sklearn", "xgboost", "joblib", "matplotlib", "seaborn", "plotly",
+                 "streamlit", "yfinance", "scipy", "IPython")
+# Seconds each module may add on top of importing numpy and pandas
+DEFAULT_BUDGET = 0.1
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+import numpy, pandas
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(statement, repeat):
+    """Best import time of statement in fresh interpreters, and the heavy modules it loaded."""
+    code = PROBE.format(src=str(src_path), statement=statement, heavy=HEAVY_MODULES)
+    best, loaded = float("inf"), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=["data_analysis", "features"])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help="Seconds a module may add on top of numpy and pandas")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (best is kept)")
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'import s':>9}  loaded heavy modules")
+    failures = 0
+    for module in args.modules:
+        seconds, loaded = probe(f"import {module}", args.repeat)
+        over = seconds > args.budget
+        failures += over or bool(loaded)
+        flag = " <-- over budget" if over else ""
+        print(f"{module:<20} {seconds:9.4f}  {', '.join(loaded) or '-'}{flag}")
+
+    if failures:
+        print(f"❌ {failures} module(s) over the {args.budget:.2f} s budget or loading heavy dependencies")
+        return 1
+    print(f"✅ All modules within the {args.budget:.2f} s budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
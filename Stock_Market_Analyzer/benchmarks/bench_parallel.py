@@ -0,0 +1,74 @@
+"""
+Scaling benchmark for parallel_analysis.parallel_metrics by worker count.
+
+Usage:
+    python benchmarks/bench_parallel.py --tickers 2000 --days 2520 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).resolve().parent.parent.joinpath("src")
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from data_analysis import (daily_returns, cumulative_returns, annualized_volatility,
+                           correlation_matrix, sharpe_ratio, max_drawdown)
+from parallel_analysis import parallel_metrics
+
+
+def serial_metrics(prices):
+    returns = daily_returns(prices)
+    vol = annualized_volatility(returns)
+    return {
+        "cumulative_returns": cumulative_returns(prices),
+        "volatility": vol,
+        "sharpe": sharpe_ratio(returns, vol),
+        "max_drawdown": max_drawdown(returns),
+        "correlation": correlation_matrix(returns),
+    }
+
+
+def max_abs_diff(a, b):
+    return float(np.nanmax(np.abs(np.asarray(a, dtype=float) - np.asarray(b, dtype=float))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, size=(args.days, args.tickers)), axis=0)),
+        index=pd.bdate_range("2000-01-03", periods=args.days),
+        columns=[f"T{i}" for i in range(args.tickers)],
+    )
+
+    start = time.perf_counter()
+    serial = serial_metrics(prices)
+    serial_time = time.perf_counter() - start
+    print(f"{args.tickers} tickers x {args.days} days ({os.cpu_count()} CPUs)")
+    print(f"  serial data_analysis : {serial_time:8.3f} s")
+
+    for n_workers in args.workers:
+        start = time.perf_counter()
+        result = parallel_metrics(prices, n_workers=n_workers)
+        elapsed = time.perf_counter() - start
+        diff = max(max_abs_diff(getattr(result, name), serial[name]) for name in serial)
+        print(f"  parallel, {n_workers:3d} workers: {elapsed:8.3f} s  "
+              f"({serial_time / elapsed:5.1f}x)  max abs diff {diff:.1e}")
+
+
+if __name__ == "__main__":
+    main()
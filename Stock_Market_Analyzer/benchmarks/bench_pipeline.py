@@ -0,0 +1,234 @@
+"""
+Stage-by-stage benchmark of the analysis pipeline on synthetic market data.
+
+Times clean_data, field selection, the data_analysis metrics, the
+correlation summary, the plot builders and generate_insights over a grid of
+ticker counts and history lengths, and records each stage's peak traced
+memory and output size. A final traced run of all stages in order gives
+the peak memory of the whole pipeline with every result kept alive, as in
+the dashboard. Runs fully offline (see synthetic.py) and writes JSON results
+that a later run can be compared against.
+
+Usage:
+    python benchmarks/bench_pipeline.py --tickers 10 100 1000 10000 --days 252 2520 --output base.json
+    python benchmarks/bench_pipeline.py --compare base.json --output new.json
+    python benchmarks/bench_pipeline.py --tickers 5000 --days 1260 --dense-limit 5000 --dtype-policy compact
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+root = Path(__file__).resolve().parent.parent
+for path in (root, root.joinpath("src")):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from synthetic import synthetic_ohlcv, FIELDS
+from data_cleaning import apply_dtype_policy, clean_data
+from schema import CLOSE_FIELDS, get_schema
+from data_analysis import (daily_returns, cumulative_returns, annualized_volatility, sharpe_ratio,
+                           correlation_matrix, compute_all_metrics, risk_metrics)
+from correlation_engine import correlation_summary
+from instrumentation import data_nbytes
+from utils.plot_cumulative_returns import plot_cumulative_returns
+from utils.plot_corr_matrix import plot_corr_matrix
+
+# Stages that build a full tickers x tickers matrix are skipped above this size
+DENSE_TICKER_LIMIT = 2000
+# Grid points with more raw cells (days x tickers x fields) than this are skipped
+MAX_CELLS = 50_000_000
+
+
+def load_generate_insights():
+    """app.generate_insights without a Streamlit server (its output is discarded)."""
+    try:
+        import streamlit.logger
+    except ImportError:
+        return None
+    # Silence the "missing ScriptRunContext" warnings of bare-mode calls;
+    # importing app loads the Streamlit config, which resets the level
+    streamlit.logger.set_log_level("error")
+    from app import generate_insights
+    streamlit.logger.set_log_level("error")
+    return generate_insights
+
+
+def pipeline_stages(generate_insights, dense, dtype_policy="full"):
+    """(name, func(state) -> value, needs_dense) in pipeline order; each value is stored in state[name]."""
+    # Compact runs clean only the close fields, like the dashboard
+    fields = CLOSE_FIELDS if dtype_policy == "compact" else None
+    stages = [
+        ("clean_data", lambda s: clean_data(s["raw"], fields=fields, dtype_policy=dtype_policy), False),
+        ("select_close", lambda s: get_schema(s["clean_data"]).select(
+            s["clean_data"], get_schema(s["clean_data"]).close_field()), False),
+        ("daily_returns", lambda s: daily_returns(s["select_close"]), False),
+        ("cumulative_returns", lambda s: cumulative_returns(s["select_close"]), False),
+        ("annualized_volatility", lambda s: annualized_volatility(s["daily_returns"]), False),
+        ("sharpe_ratio", lambda s: sharpe_ratio(s["daily_returns"], s["annualized_volatility"]), False),
+        ("risk_metrics", lambda s: risk_metrics(s["daily_returns"]), False),
+        ("correlation_matrix", lambda s: correlation_matrix(s["daily_returns"]), True),
+        ("compute_all_metrics", lambda s: compute_all_metrics(s["select_close"]), True),
+        ("correlation_summary", lambda s: correlation_summary(s["daily_returns"]), False),
+        ("plot_cumulative_returns", lambda s: plot_cumulative_returns(s["cumulative_returns"]), False),
+        ("plot_corr_matrix", lambda s: plot_corr_matrix(s["correlation_matrix"]), True),
+    ]
+    if generate_insights is not None:
+        stages.append(("generate_insights", lambda s: generate_insights(
+            s["cumulative_returns"], s.get("correlation_matrix"), s["annualized_volatility"],
+            s["sharpe_ratio"], list(s["select_close"].columns), s["correlation_summary"]), False))
+    return [(name, func) for name, func, needs_dense in stages if dense or not needs_dense]
+
+
+def measure(func, state, repeat):
+    """Best wall time over repeat runs, then one traced run for peak memory (MB)."""
+    best = np.inf
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = func(state)
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    func(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return value, best, peak / 2 ** 20
+
+
+def pipeline_peak(stages, raw):
+    """Peak MB of running every stage in order and keeping all results, raw frame included."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        state = {"raw": raw}
+        for name, func in stages:
+            state[name] = func(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak + data_nbytes(raw)) / 2 ** 20
+
+
+def run_grid(tickers_grid, days_grid, fields, repeat, seed, dense_limit, max_cells, dtype_policy="full"):
+    generate_insights = load_generate_insights()
+    results = []
+    for n_days in days_grid:
+        for n_tickers in tickers_grid:
+            point = {"tickers": n_tickers, "days": n_days}
+            if n_tickers * n_days * len(fields) > max_cells:
+                print(f"{n_tickers:>6} tickers x {n_days:>5} days: skipped (over --max-cells)")
+                results.append({**point, "stage": "all", "status": "skipped"})
+                continue
+            print(f"{n_tickers:>6} tickers x {n_days:>5} days")
+            raw = synthetic_ohlcv(n_tickers, n_days, fields=fields, seed=seed)
+            if dtype_policy != "full":
+                # The frame load_data would return under this policy
+                raw = apply_dtype_policy(raw, CLOSE_FIELDS, dtype_policy)
+            state = {"raw": raw}
+            stages = pipeline_stages(generate_insights, n_tickers <= dense_limit, dtype_policy)
+            for name, func in stages:
+                try:
+                    state[name], seconds, peak_mb = measure(func, state, repeat)
+                except Exception as e:
+                    print(f"  {name:<24} failed: {e}")
+                    results.append({**point, "stage": name, "status": f"error: {e}"})
+                    continue
+                out_mb = (data_nbytes(state[name]) or 0) / 2 ** 20
+                print(f"  {name:<24} {seconds:9.4f} s {peak_mb:10.1f} MB peak {out_mb:10.1f} MB out")
+                results.append({**point, "stage": name, "status": "ok",
+                                "seconds": seconds, "peak_mb": peak_mb, "out_mb": out_mb})
+            del state
+            try:
+                peak_mb = pipeline_peak(stages, raw)
+            except Exception as e:
+                print(f"  {'pipeline':<24} failed: {e}")
+            else:
+                print(f"  {'pipeline':<24} {'':>11} {peak_mb:10.1f} MB peak")
+                results.append({**point, "stage": "pipeline", "status": "ok", "peak_mb": peak_mb})
+            del raw
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the time ratio of every stage against a baseline run; return the regressions."""
+    base = {(r["stage"], r["tickers"], r["days"]): r for r in baseline["results"] if r["status"] == "ok"}
+    regressions = []
+    print(f"\n{'stage':<24} {'tickers':>7} {'days':>5} {'base s':>9} {'new s':>9} {'ratio':>6}")
+    for r in results:
+        old = base.get((r["stage"], r["tickers"], r["days"]))
+        if r["status"] != "ok" or old is None:
+            continue
+        if "seconds" not in r:
+            # Whole-pipeline rows only measure memory
+            print(f"{r['stage']:<24} {r['tickers']:>7} {r['days']:>5} peak {old['peak_mb']:.1f} MB -> "
+                  f"{r['peak_mb']:.1f} MB ({r['peak_mb'] / old['peak_mb']:.2f}x)")
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] > 0 else np.inf
+        flag = " <-- slower" if ratio > threshold else ""
+        print(f"{r['stage']:<24} {r['tickers']:>7} {r['days']:>5} {old['seconds']:9.4f} "
+              f"{r['seconds']:9.4f} {ratio:6.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--days", type=int, nargs="+", default=[252, 1260, 2520])
+    parser.add_argument("--fields", nargs="+", default=list(FIELDS), choices=FIELDS)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dense-limit", type=int, default=DENSE_TICKER_LIMIT,
+                        help="Skip tickers x tickers stages above this many tickers")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="Skip grid points with more raw cells than this")
+    parser.add_argument("--dtype-policy", choices=["full", "compact"], default="full",
+                        help="'compact' loads and cleans float32 close prices only")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Time ratio above which a stage counts as a regression")
+    args = parser.parse_args()
+
+    results = run_grid(args.tickers, args.days, args.fields, args.repeat, args.seed,
+                       args.dense_limit, args.max_cells, args.dtype_policy)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            "fields": args.fields,
+            "seed": args.seed,
+            "dtype_policy": args.dtype_policy,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"✅ Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        print(f"{len(regressions)} stage(s) slower than {args.threshold:.2f}x the baseline")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Benchmark rolling_metrics against recomputing each window from scratch.
+
+Usage:
+    python benchmarks/bench_rolling.py --tickers 50 --days 2520 --window 252
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+src_path = Path(__file__).resolve().parent.parent.joinpath("src")
+if str(src_path) not in sys.path:
+    sys.path.append(str(src_path))
+
+from data_analysis import annualized_volatility
+from rolling_metrics import rolling_volatility
+
+
+def naive_rolling_volatility(returns, window):
+    """Call annualized_volatility on every window slice: O(N * W)."""
+    out = pd.DataFrame(np.nan, index=returns.index, columns=returns.columns)
+    for t in range(window - 1, len(returns)):
+        out.iloc[t] = annualized_volatility(returns.iloc[t - window + 1:t + 1])
+    return out
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--window", type=int, default=252)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    returns = pd.DataFrame(
+        rng.normal(0.0005, 0.02, size=(args.days, args.tickers)),
+        index=pd.bdate_range("2000-01-03", periods=args.days),
+        columns=[f"T{i}" for i in range(args.tickers)],
+    )
+
+    fast, fast_time = timed(rolling_volatility, returns, args.window)
+    naive, naive_time = timed(naive_rolling_volatility, returns, args.window)
+    max_diff = np.nanmax(np.abs(fast.to_numpy() - naive.to_numpy()))
+
+    print(f"{args.tickers} tickers x {args.days} days, window {args.window}")
+    print(f"  naive recomputation : {naive_time:8.3f} s")
+    print(f"  running moments     : {fast_time:8.3f} s  ({naive_time / fast_time:.1f}x faster)")
+    print(f"  max abs difference  : {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Seeded synthetic OHLCV data for offline benchmarks.
+
+Close prices follow geometric Brownian motion driven by a few correlated
+market factors plus idiosyncratic noise. Some tickers list late (NaN before
+their first session) and random cells and multi-day stretches are missing,
+like real downloads. The result has the same (ticker, field) MultiIndex
+layout as load_data.
+"""
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+
+
+def factor_returns(n_days, n_tickers, n_factors=4, factor_corr=0.3, rng=None):
+    """
+    Daily log returns from correlated factors: (days x tickers).
+
+    Factors share a pairwise correlation of factor_corr; each ticker has its
+    own loadings, drift and idiosyncratic volatility.
+    """
+    rng = np.random.default_rng(rng)
+    corr = np.full((n_factors, n_factors), factor_corr)
+    np.fill_diagonal(corr, 1.0)
+    factors = rng.standard_normal((n_days, n_factors)) @ np.linalg.cholesky(corr).T * 0.01
+    loadings = rng.normal(0.6, 0.4, size=(n_factors, n_tickers)) / np.sqrt(n_factors)
+    drift = rng.normal(0.08, 0.1, size=n_tickers) / 252
+    idio = rng.uniform(0.01, 0.03, size=n_tickers)
+
+    log_returns = factors @ loadings
+    log_returns += rng.standard_normal((n_days, n_tickers)) * idio
+    # GBM: the drift of log prices is mu - sigma^2 / 2
+    log_returns += drift - 0.5 * log_returns.var(axis=0)
+    return log_returns
+
+
+def synthetic_ohlcv(n_tickers, n_days, fields=FIELDS, seed=0, late_listing=0.1,
+                    missing_cells=0.002, gaps=0.001, start="2000-01-03"):
+    """
+    Raw OHLCV frame with (ticker, field) MultiIndex columns.
+
+    Args:
+        n_tickers: Number of tickers
+        n_days: Number of business days
+        fields: Fields to generate (subset of FIELDS)
+        seed: Random seed; the same arguments always give the same frame
+        late_listing: Fraction of tickers that list during the first 30% of
+            the history
+        missing_cells: Fraction of single missing cells
+        gaps: Chance per ticker and day that a 2-10 day gap starts
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    tickers = [f"S{i:05d}" for i in range(n_tickers)]
+
+    close = np.exp(np.cumsum(factor_returns(n_days, n_tickers, rng=rng), axis=0))
+    close *= rng.uniform(5, 500, size=n_tickers)
+
+    missing = rng.random((n_days, n_tickers)) < missing_cells
+    for day, col in zip(*np.nonzero(rng.random((n_days, n_tickers)) < gaps)):
+        missing[day:day + rng.integers(2, 11), col] = True
+    late = rng.random(n_tickers) < late_listing
+    listing = np.where(late, rng.integers(1, max(int(n_days * 0.3), 2), size=n_tickers), 0)
+    missing |= np.arange(n_days)[:, None] < listing[None, :]
+
+    data = {}
+    if "Adj Close" in fields:
+        # Dividend adjustment: earlier prices scaled down a little
+        adjust = np.cumprod(1 - rng.uniform(0, 0.0002, size=(n_days, 1)), axis=0)[::-1]
+        data["Adj Close"] = close * adjust
+    if "Close" in fields:
+        data["Close"] = close
+    if {"Open", "High", "Low"} & set(fields):
+        opens = np.vstack([close[:1], close[:-1]]) * np.exp(rng.normal(0, 0.005, close.shape))
+        data["Open"] = opens
+        data["High"] = np.maximum(opens, close) * (1 + np.abs(rng.normal(0, 0.005, close.shape)))
+        data["Low"] = np.minimum(opens, close) * (1 - np.abs(rng.normal(0, 0.005, close.shape)))
+    if "Volume" in fields:
+        data["Volume"] = np.round(rng.lognormal(13, 1, close.shape))
+
+    fields = [f for f in FIELDS if f in fields]
+    values = np.empty((n_days, n_tickers, len(fields)))
+    for j, field in enumerate(fields):
+        values[:, :, j] = np.where(missing, np.nan, data[field])
+    columns = pd.MultiIndex.from_product([tickers, fields])
+    return pd.DataFrame(values.reshape(n_days, -1), index=dates, columns=columns, copy=False)
@@ -0,0 +1,282 @@
+"""
+Vectorized backtests of many rebalancing rules over one price panel.
+
+A batch of strategy variants is simulated together, one day at a time:
+holdings of every variant are a single (strategies x tickers) weight matrix
+that drifts with the day's returns, and the variants that rebalance that day
+are reset to their targets with one masked assignment. Supported rules,
+which can be combined per variant:
+
+    period      rebalance every `period` trading days (0 = never)
+    threshold   rebalance when any weight drifts more than `threshold`
+                from its target (np.inf = never)
+    lookback    momentum: at each rebalance hold the `top_k` tickers with the
+                best `lookback`-day return, equally weighted (0 = use static
+                target weights instead)
+    cost        transaction cost as a fraction of traded value (turnover)
+
+Results are daily net returns per variant; summary() reports them through
+the data_analysis metrics.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from data_analysis import (cumulative_returns, annualized_volatility, sharpe_ratio,
+                           max_drawdown)
+
+# Strategies simulated together; bounds the (strategies x tickers) state
+DEFAULT_BATCH_SIZE = 1024
+
+
+class Strategies:
+    """
+    A batch of strategy variants; every argument is a scalar or one value
+    per variant.
+
+    Args:
+        period: Calendar rebalancing interval in trading days (0 = none)
+        threshold: Drift that triggers a rebalance (np.inf = none)
+        lookback: Momentum lookback in trading days (0 = static weights)
+        top_k: Tickers held by momentum variants
+        cost: Transaction cost per unit of turnover
+        weights: Static target weights, one row per variant or one row for
+            all (default: equal weight); renormalized over tradable tickers
+        names: Variant names (default: built from the parameters)
+    """
+
+    def __init__(self, period=0, threshold=np.inf, lookback=0, top_k=0, cost=0.0,
+                 weights=None, names=None):
+        n = np.broadcast(np.atleast_1d(period), threshold, lookback, top_k, cost).size
+        self.period = np.broadcast_to(np.asarray(period, dtype=np.int64), n).copy()
+        self.threshold = np.broadcast_to(np.asarray(threshold, dtype=np.float64), n).copy()
+        self.lookback = np.broadcast_to(np.asarray(lookback, dtype=np.int64), n).copy()
+        self.top_k = np.broadcast_to(np.asarray(top_k, dtype=np.int64), n).copy()
+        self.cost = np.broadcast_to(np.asarray(cost, dtype=np.float64), n).copy()
+        self.weights = None if weights is None else np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        if ((self.lookback > 0) & (self.top_k <= 0)).any():
+            raise ValueError("momentum variants need top_k > 0")
+        if (self.period < 0).any() or (self.lookback < 0).any() or (self.cost < 0).any():
+            raise ValueError("period, lookback and cost must be non-negative")
+        self.names = list(names) if names is not None else [
+            _variant_name(*p) for p in zip(self.period, self.threshold, self.lookback, self.top_k, self.cost)]
+        if len(self.names) != n:
+            raise ValueError("need one name per variant")
+
+    def __len__(self):
+        return len(self.period)
+
+    def subset(self, rows):
+        """The variants at positions rows (a slice or index array)."""
+        weights = self.weights
+        if weights is not None and len(weights) > 1:
+            weights = weights[rows]
+        return Strategies(self.period[rows], self.threshold[rows], self.lookback[rows],
+                          self.top_k[rows], self.cost[rows], weights,
+                          np.asarray(self.names, dtype=object)[rows])
+
+
+def _variant_name(period, threshold, lookback, top_k, cost):
+    parts = []
+    parts.append(f"mom{lookback}/top{top_k}" if lookback else "static")
+    if period:
+        parts.append(f"every{period}d")
+    if np.isfinite(threshold):
+        parts.append(f"band{threshold:g}")
+    if not period and not np.isfinite(threshold):
+        parts.append("hold")
+    if cost:
+        parts.append(f"cost{cost * 1e4:g}bp")
+    return " ".join(parts)
+
+
+def strategy_grid(periods=(0,), thresholds=(np.inf,), lookbacks=(0,), top_ks=(0,), costs=(0.0,),
+                  weights=None):
+    """
+    Every combination of the given rule parameters as one Strategies batch.
+
+    top_k only applies to momentum variants, so static variants (lookback 0)
+    are not repeated for each top_k.
+    """
+    combos = []
+    for period, threshold, lookback, top_k, cost in itertools.product(
+            periods, thresholds, lookbacks, top_ks, costs):
+        if lookback == 0:
+            top_k = 0
+        combos.append((period, threshold, lookback, top_k, cost))
+    combos = list(dict.fromkeys(combos))
+    if not combos:
+        raise ValueError("empty strategy grid")
+    return Strategies(*map(np.array, zip(*combos)), weights=weights)
+
+
+class BacktestResult:
+    """
+    Output of run_backtest.
+
+    Attributes:
+        returns: Daily net returns, one column per variant
+        turnover: Total one-way turnover per variant (1.0 = whole portfolio)
+        costs: Total transaction costs per variant, as a fraction of value
+        rebalances: Number of rebalances per variant (initial allocation excluded)
+    """
+
+    def __init__(self, returns, turnover, costs, rebalances):
+        self.returns = returns
+        self.turnover = turnover
+        self.costs = costs
+        self.rebalances = rebalances
+
+    def equity(self):
+        """Growth of $1 for every variant."""
+        return (1 + self.returns).cumprod()
+
+    def summary(self, risk_free=0, periods_per_year=252):
+        """Per-variant metrics from data_analysis, plus turnover and costs."""
+        vol = annualized_volatility(self.returns, periods_per_year)
+        years = len(self.returns) / periods_per_year
+        return pd.DataFrame({
+            'total_return': cumulative_returns(self.equity()).iloc[-1] if len(self.returns) else np.nan,
+            'annualized_volatility': vol,
+            'sharpe_ratio': sharpe_ratio(self.returns, vol, risk_free, periods_per_year),
+            'max_drawdown': max_drawdown(self.returns),
+            'annual_turnover': self.turnover / years if years else np.nan,
+            'costs': self.costs,
+            'rebalances': self.rebalances,
+        })
+
+
+def _momentum_ranks(prices, tradable, lookbacks):
+    """
+    Per lookback, a (days x tickers) array ranking tickers by trailing
+    return (0 = best); tickers without a score rank last.
+    """
+    ranks = {}
+    n_days, n_tickers = prices.shape
+    for lookback in lookbacks:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.full((n_days, n_tickers), -np.inf)
+            score[lookback:] = prices[lookback:] / prices[:-lookback] - 1
+        score[~(np.isfinite(score) & tradable)] = -np.inf
+        order = np.argsort(-score, axis=1, kind='stable')
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(n_tickers), axis=1)
+        # Unscored tickers can never be selected
+        rank[~np.isfinite(score)] = n_tickers
+        ranks[lookback] = rank
+    return ranks
+
+
+def _targets(batch, rows, day, tradable, static, ranks):
+    """Target weights on day for the variants at positions rows of batch."""
+    target = np.empty((len(rows), tradable.shape[1]))
+    lookback = batch.lookback[rows]
+    for value in np.unique(lookback):
+        group = lookback == value
+        if value == 0:
+            w = static if len(static) == 1 else static[rows[group]]
+            w = np.where(tradable[day], w, 0.0)
+        else:
+            w = (ranks[value][day] < batch.top_k[rows[group], None]).astype(np.float64)
+        total = w.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            target[group] = np.where(total > 0, w / total, 0.0)
+    return target
+
+
+def _run_batch(prices, returns, tradable, batch, ranks, start):
+    n_days, n_tickers = prices.shape
+    s = len(batch)
+    if batch.weights is None:
+        static = np.full((1, n_tickers), 1.0 / n_tickers)
+    else:
+        static = np.broadcast_to(batch.weights, (max(len(batch.weights), 1), n_tickers))
+
+    out = np.empty((n_days - start - 1, s))
+    turnover = np.zeros(s)
+    costs = np.zeros(s)
+    rebalances = np.zeros(s, dtype=np.int64)
+
+    everyone = np.arange(s)
+    target = _targets(batch, everyone, start, tradable, static, ranks)
+    weights = target.copy()
+    periodic = batch.period > 0
+    banded = np.isfinite(batch.threshold)
+
+    for i, day in enumerate(range(start + 1, n_days)):
+        r = returns[day]
+        gross = weights @ r
+        # Holdings drift with the day's returns
+        weights *= 1 + r
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights /= np.where(gross > -1, 1 + gross, np.nan)[:, None]
+        np.nan_to_num(weights, copy=False)
+
+        due = periodic & ((day - start) % np.maximum(batch.period, 1) == 0)
+        if banded.any():
+            drift = np.abs(weights[banded] - target[banded]).max(axis=1)
+            due[banded] |= drift > batch.threshold[banded]
+
+        net = gross
+        if due.any():
+            rows = np.flatnonzero(due)
+            new = _targets(batch, rows, day, tradable, static, ranks)
+            traded = np.abs(new - weights[rows]).sum(axis=1)
+            cost = batch.cost[rows] * traded
+            target[rows] = new
+            weights[rows] = new
+            turnover[rows] += traded
+            costs[rows] += cost
+            rebalances[rows] += 1
+            net = gross.copy()
+            net[rows] = (1 + gross[rows]) * (1 - cost) - 1
+        out[i] = net
+    return out, turnover, costs, rebalances
+
+
+def run_backtest(prices, strategies, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Backtest every variant of strategies on a price frame.
+
+    Args:
+        prices: Price frame (e.g. the adj_close panel), one column per ticker;
+            NaN prices (before listing) are not tradable
+        strategies: Strategies batch
+        batch_size: Variants simulated together
+
+    All variants start fully invested at the close of the same day, the
+    longest momentum lookback, so their results cover the same dates.
+
+    Returns:
+        BacktestResult
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    n_days, n_tickers = values.shape
+    if strategies.weights is not None and strategies.weights.shape[1] != n_tickers:
+        raise ValueError("static weights must have one column per ticker")
+    start = int(strategies.lookback.max())
+    if n_days - start < 2:
+        raise ValueError("not enough prices for the longest lookback")
+
+    tradable = np.isfinite(values) & (values > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.zeros_like(values)
+        returns[1:] = values[1:] / values[:-1] - 1
+    # Untradable or just-listed tickers contribute no return
+    returns[~np.isfinite(returns)] = 0.0
+    ranks = _momentum_ranks(values, tradable, np.unique(strategies.lookback[strategies.lookback > 0]))
+
+    parts = []
+    for first in range(0, len(strategies), batch_size):
+        batch = strategies.subset(slice(first, first + batch_size))
+        parts.append(_run_batch(values, returns, tradable, batch, ranks, start))
+
+    names = strategies.names
+    return BacktestResult(
+        returns=pd.DataFrame(np.hstack([p[0] for p in parts]), index=prices.index[start + 1:], columns=names),
+        turnover=pd.Series(np.concatenate([p[1] for p in parts]), index=names),
+        costs=pd.Series(np.concatenate([p[2] for p in parts]), index=names),
+        rebalances=pd.Series(np.concatenate([p[3] for p in parts]), index=names),
+    )
@@ -0,0 +1,396 @@
+"""
+Out-of-core version of clean_data -> compute_all_metrics.
+
+The raw panel arrives as time slices (from a provider, one date window at a
+time, or from a frame). ChunkCleaner cleans each slice like clean_data,
+carrying every column's last observed value, its age and its listing state
+across slice boundaries. ChunkedMetrics carries the previous close into the
+next slice's first return and folds each slice's returns into mergeable
+moments (Chan et al.'s pairwise update of mean and co-moment), plus running
+growth/peak levels for the drawdown.
+
+Memory depends on the slice length and the number of tickers (the K x K
+co-moment), not on the length of the history. Results match the in-memory
+functions to floating-point rounding.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_analysis import MetricsResult, _correlation_from_covariance, _float_values
+from data_cleaning import (CLEAN_BLOCK_SIZE, DTYPE_POLICIES, GAP_POLICIES, VOLUME_FIELD,
+                           _field_columns, _frame_from_runs, _runs)
+from data_providers import get_provider
+from schema import ColumnSchema, field_key, get_schema, split_column
+
+# Calendar length of one provider request
+DEFAULT_WINDOW = "365D"
+
+
+def iter_frame_chunks(df, chunk_rows):
+    """Consecutive slices of chunk_rows rows of a frame."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_provider_chunks(provider, tickers, start_date, end_date, window=DEFAULT_WINDOW, fields=None):
+    """
+    Raw OHLCV slices of [start_date, end_date), one provider request per
+    calendar window.
+
+    Every slice has the same (ticker, field) columns: tickers as given and
+    fields as given or as found in the first non-empty window, with NaN for
+    tickers that have no data in a window. LocalFileProvider reads Parquet
+    files with the date filter pushed down, so only the window is loaded.
+    """
+    provider = get_provider(provider)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    window = pd.Timedelta(window)
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    columns = None if fields is None else pd.MultiIndex.from_product([tickers, list(fields)])
+    while start < end:
+        stop = min(start + window, end)
+        frame = provider.download(tickers, start.strftime("%Y-%m-%d"), stop.strftime("%Y-%m-%d"))
+        start = stop
+        if frame.empty:
+            continue
+        if columns is None:
+            found = list(dict.fromkeys(split_column(c)[1] for c in frame.columns))
+            columns = pd.MultiIndex.from_product([tickers, found])
+        yield frame.reindex(columns=columns)
+
+
+def _ffill_carry(block, carry_value, carry_age, limit=None):
+    """
+    Forward fill a (rows x columns) array like data_cleaning._ffill_block,
+    continuing from the previous slice.
+
+    carry_value is each column's last observed value before the block (NaN if
+    none) and carry_age the rows since it. Returns the filled block and the
+    carry for the next block.
+    """
+    n = block.shape[0]
+    rows = np.arange(n)[:, None]
+    last = np.where(~np.isnan(block), rows, -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = np.take_along_axis(block, np.maximum(last, 0), axis=0)
+    from_carry = last < 0
+    filled[from_carry] = np.broadcast_to(carry_value, filled.shape)[from_carry]
+    if limit is not None:
+        age = np.where(from_carry, rows + 1 + carry_age[None, :], rows - last)
+        filled[age > limit] = np.nan
+
+    if n == 0:
+        return filled, carry_value, carry_age
+    final = last[-1]
+    seen = final >= 0
+    value = np.where(seen, block[np.maximum(final, 0), np.arange(block.shape[1])], carry_value)
+    age = np.where(seen, n - 1 - final, carry_age + n)
+    return filled, value, age
+
+
+class ChunkCleaner:
+    """
+    clean_data applied to consecutive time slices of one raw panel.
+
+    Cleaning the slices in order and concatenating the results gives the
+    same frame as clean_data on the whole panel. The column layout and
+    output dtypes are fixed by the first slice; later slices are aligned to
+    its columns. Aligning to a calendar is not supported.
+
+    Args:
+        max_ffill, listing_starts, gap_policy, fields, dtype_policy: As in
+            clean_data
+
+    Attributes:
+        report: Cleaning report summed over the slices seen so far
+        schema: ColumnSchema of the cleaned slices
+    """
+
+    def __init__(self, max_ffill=None, listing_starts=None, gap_policy='intersect', fields=None,
+                 dtype_policy='full'):
+        if gap_policy not in GAP_POLICIES:
+            raise ValueError(f"gap_policy must be one of {GAP_POLICIES}")
+        if dtype_policy not in DTYPE_POLICIES:
+            raise ValueError(f"dtype_policy must be one of {tuple(DTYPE_POLICIES)}")
+        self.max_ffill = max_ffill
+        self.listing_starts = listing_starts
+        self.gap_policy = gap_policy
+        self.fields = fields
+        self.dtype_policy = dtype_policy
+        self.report = dict.fromkeys(['rows_dropped_empty', 'rows_added_calendar', 'rows_dropped_calendar',
+                                     'cells_pre_listing', 'cells_forward_filled', 'cells_left_missing',
+                                     'rows_dropped_gaps'], 0)
+        self.schema = None
+
+    def _setup(self, df):
+        """Fix columns, dtypes and the carried state from the first slice."""
+        price_dtype, volume_dtype = DTYPE_POLICIES[self.dtype_policy]
+        if isinstance(df.columns, pd.MultiIndex):
+            columns = ['_'.join(col).strip() for col in df.columns.values]
+        else:
+            columns = list(df.columns)
+        pairs = [split_column(c) for c in df.columns]
+        raw_schema = ColumnSchema(pairs, columns)
+        positions = _field_columns(raw_schema, self.fields, field_major=price_dtype is not None)
+
+        self.source_columns = df.columns
+        self.positions = positions
+        self.schema = ColumnSchema([pairs[c] for c in positions], [columns[c] for c in positions])
+        common = np.result_type(np.float32, *df.dtypes.iloc[positions])
+        volume = [field_key(f) == VOLUME_FIELD for f in raw_schema.fields]
+        dtypes = [np.dtype((volume_dtype if volume[code] else price_dtype) or common)
+                  for code in raw_schema.field_codes[positions]]
+        self.runs = _runs(dtypes)
+        self.blocks = []
+        for run, (start, stop, _) in enumerate(self.runs):
+            self.blocks += [(a, min(a + CLEAN_BLOCK_SIZE, stop), run) for a in range(start, stop, CLEAN_BLOCK_SIZE)]
+
+        # Listing date per column, or the inferred listing state
+        k = len(positions)
+        tickers = [pairs[c][0] for c in positions]
+        if isinstance(self.listing_starts, dict):
+            # NaT where a ticker has no listing date (always listed)
+            self.listing_dates = pd.DatetimeIndex([self.listing_starts.get(t) for t in tickers])
+        self.listed = np.zeros(k, dtype=bool)
+        # Last observed value (in each run's working dtype) and rows since it
+        self.carry = [(np.full(b - a, np.nan, dtype=self._work_dtype(run)), np.zeros(b - a, dtype=np.int64))
+                      for a, b, run in self.blocks]
+
+    def _work_dtype(self, run):
+        # Integer columns are filled as float64 (NaN marks the gaps)
+        dtype = self.runs[run][2]
+        return dtype if dtype.kind == 'f' else np.dtype(np.float64)
+
+    def _listed(self, block, dates, a, b):
+        """Which cells of block count as listed (updates the inferred state)."""
+        if self.listing_starts is None:
+            return np.ones(block.shape, dtype=bool)
+        if isinstance(self.listing_starts, str) and self.listing_starts == 'infer':
+            listed = np.logical_or.accumulate(~np.isnan(block), axis=0) | self.listed[None, a:b]
+            if len(block):
+                self.listed[a:b] = listed[-1]
+            return listed
+        starts = self.listing_dates[a:b]
+        return np.isnat(starts.to_numpy())[None, :] | (dates.to_numpy()[:, None] >= starts.to_numpy()[None, :])
+
+    def clean(self, df):
+        """Clean the next slice; returns the slice's rows of the clean_data result."""
+        if self.schema is None:
+            self._setup(df)
+        elif not df.columns.equals(self.source_columns):
+            df = df.reindex(columns=self.source_columns)
+        positions = self.positions
+        report = self.report
+
+        has_data = np.zeros(len(df), dtype=bool)
+        for a, b, _ in self.blocks:
+            has_data |= df.iloc[:, positions[a:b]].notna().to_numpy().any(axis=1)
+        source = np.flatnonzero(has_data)
+        dates = df.index[source]
+        report['rows_dropped_empty'] += int(len(df) - len(source))
+
+        filled_blocks = []
+        keep = np.ones(len(dates), dtype=bool)
+        for i, (a, b, run) in enumerate(self.blocks):
+            block = df.iloc[:, positions[a:b]].to_numpy(dtype=self._work_dtype(run), na_value=np.nan)[source]
+            listed = self._listed(block, dates, a, b)
+            block[~listed] = np.nan
+            carry_value, carry_age = self.carry[i]
+            filled, carry_value, carry_age = _ffill_carry(block, carry_value, carry_age, self.max_ffill)
+            self.carry[i] = (carry_value, carry_age)
+            missing = np.isnan(filled)
+            report['cells_pre_listing'] += int((~listed).sum())
+            report['cells_forward_filled'] += int((np.isnan(block) & ~missing).sum())
+            report['cells_left_missing'] += int((missing & listed).sum())
+            if self.gap_policy == 'intersect':
+                keep &= ~missing.any(axis=1)
+            elif self.gap_policy == 'listed':
+                keep &= ~(missing & listed).any(axis=1)
+            filled_blocks.append(filled)
+        report['rows_dropped_gaps'] += int(len(keep) - keep.sum())
+
+        n_rows = int(keep.sum())
+        outs = [np.empty((n_rows, b - a), dtype=dtype) for a, b, dtype in self.runs]
+        for (a, b, run), filled in zip(self.blocks, filled_blocks):
+            start, _, dtype = self.runs[run]
+            kept = filled[keep]
+            if dtype.kind != 'f':
+                kept = np.nan_to_num(np.rint(kept), nan=0)
+            outs[run][:, a - start:b - start] = kept
+
+        cleaned = _frame_from_runs(outs, dates[keep], pd.Index(self.schema.columns))
+        cleaned.attrs['schema'] = self.schema
+        return cleaned
+
+
+class ReturnMoments:
+    """
+    Mergeable count, mean and co-moment (sum of centered cross products) of
+    return vectors.
+
+    Two sets of moments combine exactly (Chan, Golub & LeVeque), so each
+    slice is summarized on its own, centered on its own mean, and merged
+    into the running total.
+
+    Args:
+        k: Number of tickers
+    """
+
+    def __init__(self, k):
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    @classmethod
+    def from_returns(cls, returns):
+        """Moments of a (rows x tickers) array of complete returns, in float64."""
+        values = np.asarray(returns, dtype=np.float64)
+        moments = cls(values.shape[1])
+        moments.count = values.shape[0]
+        if moments.count:
+            moments.mean = values.mean(axis=0)
+            centered = values - moments.mean
+            moments.comoment = centered.T @ centered
+        return moments
+
+    def merge(self, other):
+        """Fold other into these moments (in place)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.comoment = other.count, other.mean.copy(), other.comoment.copy()
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment += other.comoment
+        self.comoment += np.outer(delta, delta * (self.count * other.count / total))
+        self.mean += delta * (other.count / total)
+        self.count = total
+        return self
+
+    def covariance(self, ddof=1):
+        if self.count <= ddof:
+            return np.full(self.comoment.shape, np.nan)
+        return self.comoment / (self.count - ddof)
+
+
+class ChunkedMetrics:
+    """
+    compute_all_metrics over consecutive slices of a cleaned price frame.
+
+    Args:
+        risk_free: Annual risk-free rate for the Sharpe ratio
+        periods_per_year: Bars per year used for annualization
+    """
+
+    def __init__(self, risk_free=0, periods_per_year=252):
+        self.risk_free = risk_free
+        self.periods_per_year = periods_per_year
+        self.tickers = None
+
+    def _setup(self, prices, values):
+        k = values.shape[1]
+        self.tickers = prices.columns
+        self.moments = ReturnMoments(k)
+        self.first_prices = values[0].copy()
+        self.previous = None
+        self.last_date = None
+        # Growth of $1, its running peak (at least the starting $1) and the deepest drawdown
+        self.level = np.ones(k)
+        self.peak = np.ones(k)
+        self.drawdown = np.full(k, np.inf)
+
+    def update(self, prices):
+        """Fold the next slice of prices (same columns every time) into the metrics."""
+        if prices.empty:
+            return self
+        values = _float_values(prices)
+        if self.tickers is None:
+            self._setup(prices, values)
+        elif not prices.columns.equals(self.tickers):
+            raise ValueError("every slice must have the same tickers")
+
+        # The previous slice's last close gives this slice's first return
+        base = values[:-1] if self.previous is None else np.vstack([self.previous, values[:-1]])
+        current = values[1:] if self.previous is None else values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.empty(current.shape, dtype=values.dtype)
+            np.divide(current, base, out=returns)
+            returns -= 1
+        returns = returns[np.isfinite(returns).all(axis=1)]
+
+        if len(returns):
+            self.moments.merge(ReturnMoments.from_returns(returns))
+            growth = np.add(returns, 1, dtype=np.float64)
+            np.cumprod(growth, axis=0, out=growth)
+            growth *= self.level
+            peak = np.maximum.accumulate(growth, axis=0)
+            np.maximum(peak, self.peak, out=peak)
+            self.drawdown = np.minimum(self.drawdown, (growth / peak).min(axis=0) - 1)
+            self.level = growth[-1]
+            self.peak = peak[-1]
+
+        self.previous = values[-1].copy()
+        self.last_date = prices.index[-1]
+        return self
+
+    def result(self):
+        """
+        MetricsResult of everything seen so far.
+
+        daily_returns is None (the full history is never held) and
+        cumulative_returns has a single row: the total return at the last date.
+        """
+        if self.tickers is None:
+            return None
+        tickers = self.tickers
+        k = len(tickers)
+        n_obs = self.moments.count
+        mean = self.moments.mean if n_obs else np.full(k, np.nan)
+        covariance = self.moments.covariance()
+        std, correlation = _correlation_from_covariance(covariance)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volatility = std * np.sqrt(self.periods_per_year)
+            sharpe = (mean * self.periods_per_year - self.risk_free) / volatility
+            total = np.divide(self.previous, self.first_prices)
+            total -= 1
+        drawdown = np.where(n_obs > 0, self.drawdown, np.nan)
+
+        return MetricsResult(
+            daily_returns=None,
+            cumulative_returns=pd.DataFrame([total], index=[self.last_date], columns=tickers),
+            mean=pd.Series(mean, index=tickers),
+            std=pd.Series(std, index=tickers),
+            volatility=pd.Series(volatility, index=tickers),
+            sharpe=pd.Series(sharpe, index=tickers),
+            covariance=pd.DataFrame(covariance, index=tickers, columns=tickers, copy=False),
+            correlation=pd.DataFrame(correlation, index=tickers, columns=tickers, copy=False),
+            max_drawdown=pd.Series(drawdown, index=tickers),
+        )
+
+
+def chunked_metrics(chunks, field=None, risk_free=0, periods_per_year=252, **clean_kwargs):
+    """
+    clean_data -> select one field -> compute_all_metrics over raw slices.
+
+    Args:
+        chunks: Raw OHLCV slices in date order (iter_provider_chunks,
+            iter_frame_chunks or any iterable of frames)
+        field: Price field to analyze (default: adjusted close, else close)
+        clean_kwargs: ChunkCleaner options (max_ffill, listing_starts,
+            gap_policy, fields, dtype_policy)
+
+    Returns:
+        (MetricsResult as from ChunkedMetrics.result, cleaning report)
+    """
+    cleaner = ChunkCleaner(**clean_kwargs)
+    metrics = ChunkedMetrics(risk_free, periods_per_year)
+    for raw in chunks:
+        cleaned = cleaner.clean(raw)
+        schema = get_schema(cleaned)
+        price_field = field or schema.close_field()
+        if price_field is None:
+            raise ValueError("No close/adjusted close columns found in the data.")
+        metrics.update(schema.select(cleaned, price_field))
+    return metrics.result(), cleaner.report
@@ -0,0 +1,190 @@
+"""
+Blocked correlation engine for large ticker universes.
+
+Returns are standardized once so that a correlation block is a single
+matrix product. Blocks of rows are produced one at a time, which lets
+correlation_summary find the most/least correlated pairs and the average
+off-diagonal correlation without ever holding the full K x K matrix.
+
+Returns with gaps (e.g. staggered listings) are correlated pairwise-complete,
+over the rows where both tickers have a return, like DataFrame.corr(); a
+block then takes a few matrix products of the counts and sums of each pair.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 512
+
+
+class CorrelationSummary:
+    """
+    Pair statistics of a correlation matrix.
+
+    Attributes:
+        most_correlated: [(ticker_a, ticker_b, corr)] sorted high to low
+        least_correlated: [(ticker_a, ticker_b, corr)] sorted low to high
+        average: Mean off-diagonal correlation (NaN pairs ignored)
+        n_pairs: Number of finite off-diagonal pairs
+    """
+
+    def __init__(self, most_correlated, least_correlated, average, n_pairs):
+        self.most_correlated = most_correlated
+        self.least_correlated = least_correlated
+        self.average = average
+        self.n_pairs = n_pairs
+
+
+def standardize(returns, dtype=np.float64):
+    """
+    Scale each return column so that Z.T @ Z is the correlation matrix.
+
+    Missing returns are set to the column mean (zero after scaling), so the
+    result is only exact for complete data such as the output of
+    daily_returns; iter_correlation_blocks correlates gappy returns pairwise.
+    """
+    x = returns.to_numpy()
+    if x.dtype != np.float32:
+        x = x.astype(np.float64, copy=False)
+    n_obs = np.isfinite(x).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Centered into a float64 copy, also for float32 returns
+        x = np.subtract(x, np.nanmean(x, axis=0, dtype=np.float64), dtype=np.float64)
+        x /= np.sqrt(np.nansum(x * x, axis=0))
+    x[~np.isfinite(x)] = 0.0
+    x[:, n_obs < 2] = 0.0
+    return x.astype(dtype, copy=False)
+
+
+def _pairwise_block(x, valid, rows, cols):
+    """
+    Pairwise-complete correlation of the columns rows x cols of x, with
+    missing values of x set to 0 and valid marking the observed ones.
+    """
+    xr, xc = x[:, rows], x[:, cols]
+    vr, vc = valid[:, rows], valid[:, cols]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = vr.T @ vc
+        sum_r, sum_c = xr.T @ vc, vr.T @ xc
+        var_r = (xr * xr).T @ vc - sum_r * sum_r / n
+        var_c = vr.T @ (xc * xc) - sum_c * sum_c / n
+        block = (xr.T @ xc - sum_r * sum_c / n) / np.sqrt(var_r * var_c)
+    block[(n < 2) | ~(var_r > 0) | ~(var_c > 0)] = np.nan
+    return block
+
+
+def iter_correlation_blocks(returns, block_size=DEFAULT_BLOCK_SIZE, dtype=np.float64,
+                            upper_only=False):
+    """
+    Yield (start, stop, block) with block = correlation rows start:stop.
+
+    With upper_only=True each block only covers columns start: onwards,
+    which halves the work when the matrix is symmetric-summarized.
+    Columns with zero variance come out as NaN, matching DataFrame.corr(),
+    and missing returns are handled pairwise-complete as it does.
+    """
+    x = returns.to_numpy()
+    valid = np.isfinite(x)
+    if not valid.all():
+        # Centered first, so the per-pair sums do not cancel
+        with np.errstate(invalid='ignore'):
+            x = np.subtract(x, np.nanmean(np.where(valid, x, np.nan), axis=0, dtype=np.float64),
+                            dtype=np.float64)
+        x[~valid] = 0.0
+        x = x.astype(dtype, copy=False)
+        valid = valid.astype(dtype)
+        for start in range(0, x.shape[1], block_size):
+            stop = min(start + block_size, x.shape[1])
+            first_col = start if upper_only else 0
+            yield start, stop, _pairwise_block(x, valid, slice(start, stop), slice(first_col, None))
+        return
+
+    z = standardize(returns, dtype)
+    constant = ~z.any(axis=0)
+    for start in range(0, z.shape[1], block_size):
+        stop = min(start + block_size, z.shape[1])
+        first_col = start if upper_only else 0
+        block = z[:, start:stop].T @ z[:, first_col:]
+        block[:, constant[first_col:]] = np.nan
+        block[constant[start:stop]] = np.nan
+        yield start, stop, block
+
+
+def blocked_correlation(returns, block_size=DEFAULT_BLOCK_SIZE, dtype=np.float64):
+    """Full correlation matrix assembled block by block (optionally float32)."""
+    k = returns.shape[1]
+    out = np.empty((k, k), dtype=dtype)
+    for start, stop, block in iter_correlation_blocks(returns, block_size, dtype):
+        out[start:stop] = block
+    return pd.DataFrame(out, index=returns.columns, columns=returns.columns, copy=False)
+
+
+class _PairTracker:
+    """Keeps the top_k highest and lowest upper-triangle values seen so far."""
+
+    def __init__(self, top_k):
+        self.top_k = top_k
+        self.high = (np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.low = (np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.total = 0.0
+        self.count = 0
+
+    def _keep(self, current, flat, width, row_offset, col_offset, largest):
+        """Merge the k extreme finite entries of flat (NaN = excluded) into current."""
+        keys = -flat if largest else flat
+        k = min(self.top_k, len(flat))
+        pick = np.argpartition(keys, k - 1)[:k]
+        pick = pick[np.isfinite(flat[pick])]
+        values = np.concatenate([current[0], flat[pick].astype(np.float64)])
+        rows = np.concatenate([current[1], pick // width + row_offset])
+        cols = np.concatenate([current[2], pick % width + col_offset])
+        if len(values) > self.top_k:
+            keys = -values if largest else values
+            keep = np.argpartition(keys, self.top_k - 1)[:self.top_k]
+            values, rows, cols = values[keep], rows[keep], cols[keep]
+        return values, rows, cols
+
+    def add(self, block, row_offset, col_offset=0):
+        n_rows, k = block.shape
+        upper = (col_offset + np.arange(k))[None, :] > (row_offset + np.arange(n_rows))[:, None]
+        flat = np.where(upper, block, np.nan).ravel()
+
+        self.total += float(np.nansum(flat, dtype=np.float64))
+        self.count += int(np.isfinite(flat).sum())
+        if self.top_k and len(flat):
+            self.high = self._keep(self.high, flat, k, row_offset, col_offset, largest=True)
+            self.low = self._keep(self.low, flat, k, row_offset, col_offset, largest=False)
+
+    def pairs(self, tickers, which, descending):
+        values, rows, cols = which
+        order = np.argsort(-values if descending else values, kind='stable')
+        return [(tickers[rows[i]], tickers[cols[i]], float(values[i])) for i in order]
+
+    def summary(self, tickers):
+        average = self.total / self.count if self.count else np.nan
+        return CorrelationSummary(
+            most_correlated=self.pairs(tickers, self.high, descending=True),
+            least_correlated=self.pairs(tickers, self.low, descending=False),
+            average=average,
+            n_pairs=self.count,
+        )
+
+
+def correlation_summary(returns, top_k=3, block_size=DEFAULT_BLOCK_SIZE, dtype=np.float64):
+    """
+    Top-k most/least correlated pairs and the average off-diagonal correlation.
+
+    The correlation matrix is computed in blocks of block_size rows and never
+    materialized, so memory stays O(block_size x K).
+    """
+    tracker = _PairTracker(top_k)
+    for start, _, block in iter_correlation_blocks(returns, block_size, dtype, upper_only=True):
+        tracker.add(block, start, start)
+    return tracker.summary(list(returns.columns))
+
+
+def summarize_correlation_matrix(corr_matrix, top_k=3):
+    """Same summary as correlation_summary for an already computed matrix."""
+    tracker = _PairTracker(top_k)
+    tracker.add(corr_matrix.to_numpy(), 0)
+    return tracker.summary(list(corr_matrix.columns))
@@ -1,6 +1,37 @@
+import warnings
+from statistics import NormalDist
+
 import numpy as np
 import pandas as pd
 
+# Columns converted to float64 at a time when float32 data is accumulated
+COLUMN_BLOCK_SIZE = 256
+
+def _float_values(df):
+    """
+    df as a float array. float32 frames (clean_data's compact dtype policy)
+    stay float32 instead of being copied to float64; the metrics below
+    accumulate in float64 either way.
+    """
+    values = df.to_numpy()
+    if values.dtype != np.float32:
+        values = values.astype(np.float64, copy=False)
+    return values
+
+def _column_moment(df, stat):
+    """Column mean or std (ddof=1) skipping NaN, summed in float64 for float32 frames."""
+    if (df.dtypes == np.float64).all():
+        return df.mean() if stat == 'mean' else df.std()
+    values = _float_values(df)
+    with warnings.catch_warnings():
+        # All-NaN or single-observation columns give NaN, as in pandas
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if stat == 'mean':
+            result = np.nanmean(values, axis=0, dtype=np.float64)
+        else:
+            result = np.nanstd(values, axis=0, ddof=1, dtype=np.float64)
+    return pd.Series(result, index=df.columns)
+
 def daily_returns(df):
     """
     Calculate daily returns as percentage change
@@ -27,16 +58,17 @@ def cumulative_returns(df):
         print(f"Error calculating cumulative returns: {e}")
         return pd.DataFrame()
 
-def annualized_volatility(daily_returns): 
+def annualized_volatility(daily_returns, periods_per_year=252): 
     """
-    Calculate annualized volatility (assuming 252 trading days)
+    Calculate annualized volatility (252 trading days by default; see
+    resampling.periods_per_year for other bar sizes)
     The annualized volatility, tells you how much the stock’s price fluctuates over a year. 
     Volatility is a measure of risk.
     """
     try:
         if daily_returns.empty:
             return pd.Series()
-        return daily_returns.std() * np.sqrt(252)
+        return _column_moment(daily_returns, 'std') * np.sqrt(periods_per_year)
     except Exception as e:
         print(f"Error calculating annualized volatility: {e}")
         return pd.Series()
@@ -55,15 +87,311 @@ def correlation_matrix(daily_returns):
         print(f"Error calculating correlation matrix: {e}")
         return pd.DataFrame()
 
-def sharpe_ratio(daily_returns, annual_vol, risk_free=0):
+def sharpe_ratio(daily_returns, annual_vol, risk_free=0, periods_per_year=252):
     """
     The Sharpe ratio is a measure of the risk-adjusted return of an investment.
+    periods_per_year must match the one annual_vol was computed with.
     """
     try:
         if daily_returns.empty or annual_vol.empty:
             return pd.Series()
-        mean_daily = daily_returns.mean()
-        return (mean_daily * 252 - risk_free) / annual_vol
+        mean_daily = _column_moment(daily_returns, 'mean')
+        return (mean_daily * periods_per_year - risk_free) / annual_vol
     except Exception as e:
         print(f"Error calculating Sharpe ratio: {e}")
-        return pd.Series()
\ No newline at end of file
+        return pd.Series()
+
+def _max_drawdown_values(returns):
+    """
+    Maximum drawdown of each column of a NaN-free returns array, compounded
+    in float64 a block of columns at a time.
+    """
+    drawdown = np.empty(returns.shape[1])
+    for a in range(0, returns.shape[1], COLUMN_BLOCK_SIZE):
+        growth = np.add(returns[:, a:a + COLUMN_BLOCK_SIZE], 1, dtype=np.float64)
+        np.cumprod(growth, axis=0, out=growth)
+        # One cumulative-max pass; the starting $1 counts as a peak
+        peak = np.maximum.accumulate(growth, axis=0)
+        np.maximum(peak, 1, out=peak)
+        np.divide(growth, peak, out=growth)
+        drawdown[a:a + COLUMN_BLOCK_SIZE] = growth.min(axis=0) - 1
+    return drawdown
+
+
+def max_drawdown(daily_returns):
+    """
+    Calculate maximum drawdown: the largest peak-to-trough fall of the
+    growth of $1 (as a negative fraction).
+    """
+    try:
+        if daily_returns.empty:
+            return pd.Series()
+        values = _float_values(daily_returns)
+        observed = np.isfinite(values)
+        # A missing return leaves the growth of $1 unchanged
+        drawdown = _max_drawdown_values(np.where(observed, values, 0.0))
+        drawdown[~observed.any(axis=0)] = np.nan
+        return pd.Series(drawdown, index=daily_returns.columns)
+    except Exception as e:
+        print(f"Error calculating max drawdown: {e}")
+        return pd.Series()
+
+def sortino_ratio(daily_returns, risk_free=0, target=0, periods_per_year=252):
+    """
+    The Sortino ratio is the Sharpe ratio with only downside volatility
+    (returns below target) in the denominator.
+    """
+    try:
+        if daily_returns.empty:
+            return pd.Series()
+        values = _float_values(daily_returns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shortfall = np.minimum(values - target, 0)
+            downside = np.sqrt(np.nanmean(shortfall * shortfall, axis=0, dtype=np.float64) * periods_per_year)
+            sortino = (np.nanmean(values, axis=0, dtype=np.float64) * periods_per_year - risk_free) / downside
+        return pd.Series(sortino, index=daily_returns.columns)
+    except Exception as e:
+        print(f"Error calculating Sortino ratio: {e}")
+        return pd.Series()
+
+def _lower_quantile(values, alpha):
+    """
+    The alpha quantile of each column (linear interpolation, like
+    DataFrame.quantile) using a partial partition instead of a full sort.
+    """
+    n = values.shape[0]
+    if np.isnan(values).any():
+        return np.nanquantile(values, alpha, axis=0).astype(np.float64)
+    pos = alpha * (n - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, n - 1)
+    part = np.partition(values, [lo, hi], axis=0)
+    low = part[lo].astype(np.float64)
+    return low + (part[hi] - low) * (pos - lo)
+
+def value_at_risk(daily_returns, confidence=0.95, method="historical"):
+    """
+    Calculate one-day Value at Risk as a positive loss fraction: the loss
+    not exceeded with the given confidence.
+
+    method="historical" uses the empirical quantile of returns,
+    method="parametric" assumes normally distributed returns.
+    """
+    try:
+        if daily_returns.empty:
+            return pd.Series()
+        values = _float_values(daily_returns)
+        alpha = 1 - confidence
+        if method == "historical":
+            var = -_lower_quantile(values, alpha)
+        elif method == "parametric":
+            z = NormalDist().inv_cdf(alpha)
+            var = -(np.nanmean(values, axis=0, dtype=np.float64)
+                    + z * np.nanstd(values, axis=0, ddof=1, dtype=np.float64))
+        else:
+            raise ValueError(f"unknown VaR method {method!r}")
+        return pd.Series(var, index=daily_returns.columns)
+    except Exception as e:
+        print(f"Error calculating value at risk: {e}")
+        return pd.Series()
+
+def conditional_value_at_risk(daily_returns, confidence=0.95):
+    """
+    Calculate Conditional VaR (expected shortfall): the average loss on the
+    days at or beyond the historical VaR, as a positive fraction.
+    """
+    try:
+        if daily_returns.empty:
+            return pd.Series()
+        values = _float_values(daily_returns)
+        tail = values <= _lower_quantile(values, 1 - confidence)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cvar = -np.where(tail, values, 0).sum(axis=0, dtype=np.float64) / tail.sum(axis=0)
+        return pd.Series(cvar, index=daily_returns.columns)
+    except Exception as e:
+        print(f"Error calculating conditional value at risk: {e}")
+        return pd.Series()
+
+def beta(daily_returns, benchmark):
+    """
+    Calculate beta of each ticker against benchmark returns (a Series, or
+    the name of a column of daily_returns): cov(ticker, benchmark) / var(benchmark).
+    Dates missing from either side are skipped pairwise.
+    """
+    try:
+        if daily_returns.empty:
+            return pd.Series()
+        if not isinstance(benchmark, pd.Series):
+            benchmark = daily_returns[benchmark]
+        values = _float_values(daily_returns)
+        bench = benchmark.reindex(daily_returns.index).to_numpy(dtype=np.float64)
+        # Beta does not change when the benchmark is shifted; centering it
+        # keeps the one-pass sums below accurate
+        bench = bench - np.nanmean(bench)
+
+        betas = np.empty(values.shape[1])
+        # A block of columns at a time, so float32 returns are never copied
+        # to float64 in full
+        for a in range(0, values.shape[1], COLUMN_BLOCK_SIZE):
+            block = values[:, a:a + COLUMN_BLOCK_SIZE]
+            both = np.isfinite(block) & np.isfinite(bench)[:, None]
+            r = np.where(both, block, 0.0).astype(np.float64, copy=False)
+            b = np.where(both, bench[:, None], 0.0)
+            n = both.sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sum_b = b.sum(axis=0)
+                cov = (r * b).sum(axis=0) - r.sum(axis=0) * sum_b / n
+                var = (b * b).sum(axis=0) - sum_b * sum_b / n
+                block_betas = cov / var
+            block_betas[n < 2] = np.nan
+            betas[a:a + COLUMN_BLOCK_SIZE] = block_betas
+        return pd.Series(betas, index=daily_returns.columns)
+    except Exception as e:
+        print(f"Error calculating beta: {e}")
+        return pd.Series()
+
+def risk_metrics(daily_returns, benchmark=None, confidence=0.95, risk_free=0, periods_per_year=252):
+    """
+    Table of the downside risk metrics above, one row per ticker.
+    The beta column is only included when a benchmark is given.
+    """
+    try:
+        if daily_returns.empty:
+            return pd.DataFrame()
+        table = pd.DataFrame({
+            'max_drawdown': max_drawdown(daily_returns),
+            'sortino': sortino_ratio(daily_returns, risk_free, periods_per_year=periods_per_year),
+            'var_historical': value_at_risk(daily_returns, confidence, "historical"),
+            'var_parametric': value_at_risk(daily_returns, confidence, "parametric"),
+            'cvar': conditional_value_at_risk(daily_returns, confidence),
+        })
+        if benchmark is not None:
+            table['beta'] = beta(daily_returns, benchmark)
+        return table
+    except Exception as e:
+        print(f"Error calculating risk metrics: {e}")
+        return pd.DataFrame()
+
+class MetricsResult:
+    """
+    Container for the output of compute_all_metrics.
+
+    Attributes:
+        daily_returns: Daily returns (rows with any non-finite return dropped)
+        cumulative_returns: Growth since the first price
+        mean: Mean daily return per ticker
+        std: Standard deviation of daily returns per ticker
+        volatility: Annualized volatility per ticker
+        sharpe: Sharpe ratio per ticker
+        covariance: Covariance matrix of daily returns
+        correlation: Correlation matrix of daily returns
+        max_drawdown: Maximum drawdown per ticker (if computed)
+    """
+
+    def __init__(self, daily_returns, cumulative_returns, mean, std, volatility, sharpe,
+                 covariance, correlation, max_drawdown=None):
+        self.daily_returns = daily_returns
+        self.cumulative_returns = cumulative_returns
+        self.mean = mean
+        self.std = std
+        self.volatility = volatility
+        self.sharpe = sharpe
+        self.covariance = covariance
+        self.correlation = correlation
+        self.max_drawdown = max_drawdown
+
+
+def _gram(values):
+    """
+    values.T @ values accumulated in float64. float32 input is multiplied a
+    block of columns at a time, so no full float64 copy is made.
+    """
+    if values.dtype == np.float64:
+        return values.T @ values
+    k = values.shape[1]
+    gram = np.empty((k, k))
+    starts = range(0, k, COLUMN_BLOCK_SIZE)
+    for a in starts:
+        left = values[:, a:a + COLUMN_BLOCK_SIZE].astype(np.float64)
+        for c in starts:
+            if c > a:
+                break
+            right = left if c == a else values[:, c:c + COLUMN_BLOCK_SIZE].astype(np.float64)
+            tile = left.T @ right
+            gram[a:a + COLUMN_BLOCK_SIZE, c:c + COLUMN_BLOCK_SIZE] = tile
+            gram[c:c + COLUMN_BLOCK_SIZE, a:a + COLUMN_BLOCK_SIZE] = tile.T
+    return gram
+
+
+def _correlation_from_covariance(covariance):
+    """(std, correlation) of a covariance array; zero-variance columns give NaN."""
+    std = np.sqrt(np.maximum(np.diag(covariance), 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / std[:, None]
+        correlation /= std[None, :]
+    correlation[(std == 0)[:, None] | (std == 0)[None, :]] = np.nan
+    np.fill_diagonal(correlation, np.where(std > 0, 1.0, np.nan))
+    return std, correlation
+
+
+def compute_all_metrics(prices, risk_free=0, periods_per_year=252):
+    """
+    Compute every metric above in one pass over a contiguous price array.
+
+    Matches chaining daily_returns, cumulative_returns, annualized_volatility,
+    correlation_matrix, sharpe_ratio and max_drawdown, but the price matrix
+    is converted once, returns are written into a single preallocated array
+    and the covariance comes from one matrix product over the returns.
+
+    float32 prices (clean_data's compact dtype policy) give float32 return
+    frames; means, covariances and drawdowns are still accumulated in float64.
+    """
+    try:
+        if prices.empty:
+            return None
+        tickers = prices.columns
+        values = _float_values(prices)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.empty((values.shape[0] - 1, values.shape[1]), dtype=values.dtype)
+            np.divide(values[1:], values[:-1], out=returns)
+            returns -= 1
+            dates = prices.index[1:]
+            finite = np.isfinite(returns).all(axis=1)
+            if not finite.all():
+                returns = returns[finite]
+                dates = dates[finite]
+
+            cumulative = np.divide(values, values[0])
+            cumulative -= 1
+
+            # Returns are tiny relative to their spread, so the raw second
+            # moment is accurate and spares a centered copy of the matrix
+            n_obs = returns.shape[0]
+            mean = returns.mean(axis=0, dtype=np.float64) if n_obs else np.full(len(tickers), np.nan)
+            if n_obs > 1:
+                covariance = _gram(returns)
+                covariance -= n_obs * np.outer(mean, mean)
+                covariance /= n_obs - 1
+            else:
+                covariance = np.full((len(tickers), len(tickers)), np.nan)
+            std, correlation = _correlation_from_covariance(covariance)
+
+            volatility = std * np.sqrt(periods_per_year)
+            sharpe = (mean * periods_per_year - risk_free) / volatility
+            drawdown = _max_drawdown_values(returns) if n_obs else np.full(len(tickers), np.nan)
+
+        return MetricsResult(
+            daily_returns=pd.DataFrame(returns, index=dates, columns=tickers, copy=False),
+            cumulative_returns=pd.DataFrame(cumulative, index=prices.index, columns=tickers, copy=False),
+            mean=pd.Series(mean, index=tickers),
+            std=pd.Series(std, index=tickers),
+            volatility=pd.Series(volatility, index=tickers),
+            sharpe=pd.Series(sharpe, index=tickers),
+            covariance=pd.DataFrame(covariance, index=tickers, columns=tickers, copy=False),
+            correlation=pd.DataFrame(correlation, index=tickers, columns=tickers, copy=False),
+            max_drawdown=pd.Series(drawdown, index=tickers),
+        )
+    except Exception as e:
+        print(f"Error computing metrics: {e}")
+        return None
@@ -1,44 +1,281 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from pathlib import Path
+from data_providers import get_provider
+from download_scheduler import DEFAULT_BATCH_SIZE, DownloadScheduler
+from price_cache import PriceCache
+from schema import ColumnSchema, field_key, split_column
 
-def load_data(tickers, start_date, end_date):
-    """Download OHLCV data for given tickers and date range"""
+# (price dtype, volume dtype) of each dtype policy; None keeps the source dtype.
+# 'compact' halves the size of price columns, and volumes stay exact as int64
+DTYPE_POLICIES = {
+    'full': (None, None),
+    'compact': (np.float32, np.int64),
+}
+VOLUME_FIELD = 'volume'
+CLEAN_BLOCK_SIZE = 256
+
+def _field_columns(schema, fields=None, field_major=False):
+    """
+    Column positions of the given fields (all columns if None), in column
+    order or grouped field by field (so each field is a contiguous range).
+    """
+    positions = np.arange(len(schema))
+    if fields is not None:
+        wanted = {field_key(f) for f in fields}
+        codes = [i for i, f in enumerate(schema.fields) if field_key(f) in wanted]
+        positions = positions[np.isin(schema.field_codes, codes)]
+    if field_major:
+        positions = positions[np.argsort(schema.field_codes[positions], kind='stable')]
+    return positions
+
+def _runs(values):
+    """(start, stop, value) of every run of equal consecutive values."""
+    runs = []
+    for i, value in enumerate(values):
+        if runs and runs[-1][2] == value:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1, value])
+    return [tuple(r) for r in runs]
+
+def _frame_from_runs(arrays, index, columns):
+    """One frame from per-run column arrays, without copying them."""
+    parts = []
+    start = 0
+    for values in arrays:
+        stop = start + values.shape[1]
+        parts.append(pd.DataFrame(values, index=index, columns=columns[start:stop], copy=False))
+        start = stop
+    return parts[0] if len(parts) == 1 else pd.concat(parts, axis=1)
+
+def apply_dtype_policy(df, fields, dtype_policy):
+    """
+    Raw frame reduced to fields, with prices stored at the policy's dtype.
+
+    Volumes keep their source dtype here: they may still have gaps, which
+    clean_data fills before converting them.
+    """
+    if dtype_policy not in DTYPE_POLICIES:
+        raise ValueError(f"dtype_policy must be one of {tuple(DTYPE_POLICIES)}")
+    price_dtype = DTYPE_POLICIES[dtype_policy][0]
+    schema = ColumnSchema.from_columns(df.columns)
+    positions = _field_columns(schema, fields, field_major=price_dtype is not None)
+    if price_dtype is None:
+        return df.iloc[:, positions] if fields is not None else df
+
+    volume = [field_key(f) == VOLUME_FIELD for f in schema.fields]
+    arrays = []
+    for a, b, is_volume in _runs([volume[c] for c in schema.field_codes[positions]]):
+        out = np.empty((len(df), b - a), dtype=np.float64 if is_volume else price_dtype)
+        # Converted a block of columns at a time to bound the float64 copies
+        for c in range(a, b, CLEAN_BLOCK_SIZE):
+            d = min(c + CLEAN_BLOCK_SIZE, b)
+            out[:, c - a:d - a] = df.iloc[:, positions[c:d]].to_numpy(dtype=out.dtype, na_value=np.nan)
+        arrays.append(out)
+    data = _frame_from_runs(arrays, df.index, df.columns[positions])
+    data.attrs = dict(df.attrs)
+    return data
+
+def load_data(tickers, start_date, end_date, cache=None, provider=None, fields=None,
+              dtype_policy='full'):
+    """
+    Download OHLCV data for given tickers and date range.
+
+    provider selects the data source (see data_providers.get_provider); the
+    default is Yahoo Finance. If cache is given (a PriceCache or a cache
+    directory), previously fetched dates are read from disk and only the
+    missing ones are requested from the provider.
+
+    Universes larger than one batch are downloaded through a DownloadScheduler
+    (pass one as provider to tune it). Tickers that could not be fetched are
+    listed in data.attrs['failed_tickers'] and the rest of the data is kept.
+
+    fields keeps only those fields (e.g. schema.CLOSE_FIELDS; None keeps all).
+    dtype_policy='compact' stores prices as float32, grouped field by field
+    (see DTYPE_POLICIES); 'full' keeps the provider's dtypes.
+    """
     try:
         # Convert single ticker to list
         if isinstance(tickers, str):
             tickers = [tickers]
-            
-        data = yf.download(tickers, start=start_date, end=end_date, group_by='ticker', progress=True)
-        
-        # If only one ticker, yfinance returns DataFrame without MultiIndex
+
+        provider = get_provider(provider)
+        if len(tickers) > DEFAULT_BATCH_SIZE and not isinstance(provider, DownloadScheduler):
+            provider = DownloadScheduler(provider)
+        if isinstance(provider, DownloadScheduler):
+            provider.failures.clear()
+        if cache is not None:
+            if not isinstance(cache, PriceCache):
+                # Keep each provider's data apart inside a shared cache directory
+                cache = PriceCache(Path(cache).joinpath(provider.name))
+            data = cache.get(tickers, start_date, end_date, provider)
+        else:
+            data = provider.download(tickers, start_date, end_date)
+
+        # If only one ticker, flatten to "TICKER_Field" columns
         if len(tickers) == 1:
             # Add ticker prefix to columns
-            data.columns = [f"{tickers[0]}_{col}" for col in data.columns]
+            names = data.columns.get_level_values(-1) if isinstance(data.columns, pd.MultiIndex) else data.columns
+            data.columns = [f"{tickers[0]}_{col}" for col in names]
+        if fields is not None or dtype_policy != 'full':
+            data = apply_dtype_policy(data, fields, dtype_policy)
+
+        failures = getattr(provider, 'failures', None)
+        if failures:
+            data.attrs['failed_tickers'] = dict(failures)
         return data
         
     except Exception as e:
         print(f"Error loading data: {e}")
         return pd.DataFrame()
 
-def clean_data(df):
-    """Flatten MultiIndex, rename columns, drop NAs"""
+GAP_POLICIES = ('intersect', 'listed', 'keep')
+
+def _ffill_block(block, limit=None):
+    """Forward fill a (rows x columns) array down its rows, at most limit steps"""
+    n = block.shape[0]
+    rows = np.arange(n)[:, None]
+    last = np.where(~np.isnan(block), rows, -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = np.take_along_axis(block, np.maximum(last, 0), axis=0)
+    stale = last < 0
+    if limit is not None:
+        stale |= (rows - last) > limit
+    filled[stale] = np.nan
+    return filled
+
+def _listing_rows(block, dates, tickers, listing_starts):
+    """First row of each column at which the ticker counts as listed"""
+    if listing_starts is None:
+        return np.zeros(block.shape[1], dtype=np.int64)
+    if isinstance(listing_starts, str) and listing_starts == 'infer':
+        valid = ~np.isnan(block)
+        return np.where(valid.any(axis=0), valid.argmax(axis=0), block.shape[0])
+    starts = [listing_starts.get(t) for t in tickers]
+    return np.array([0 if s is None else dates.searchsorted(pd.Timestamp(s)) for s in starts],
+                    dtype=np.int64)
+
+def clean_data(df, max_ffill=None, listing_starts=None, calendar=None, gap_policy='intersect',
+               fields=None, dtype_policy='full'):
+    """
+    Flatten MultiIndex, rename columns and fill/drop NAs.
+
+    Columns are processed in blocks straight into preallocated output
+    arrays, so no full intermediate frames are created. The defaults reproduce
+    dropna(how='all') -> ffill() -> dropna().
+
+    Args:
+        df: Raw OHLCV frame from load_data
+        max_ffill: Maximum number of consecutive rows to forward fill (None = unlimited)
+        listing_starts: {ticker: first trading date}, 'infer' to use each column's
+            first observation, or None. Cells before a ticker's listing are never
+            filled.
+        calendar: Session dates to align to instead of the rows present in df
+        gap_policy: Rows to drop when NaNs remain after filling:
+            'intersect' drops any row with a NaN, 'listed' ignores NaNs before
+            a ticker's listing date, 'keep' drops nothing
+        fields: Fields to keep (None keeps all); rows are only dropped for
+            gaps in these fields
+        dtype_policy: 'full' keeps the source dtype; 'compact' stores prices
+            as float32 and volumes as int64 (volumes still missing after
+            filling become 0), with the columns grouped field by field so
+            that selecting a field needs no copy
+
+    The number of rows/cells touched by each step is stored in
+    result.attrs['cleaning_report'], and the (ticker, field) -> column map
+    in result.attrs['schema'] (see schema.ColumnSchema).
+    """
     try:
         # If the DataFrame is empty, it just returns the same empty DataFrame.
         if df.empty:
             return df
-            
+        if gap_policy not in GAP_POLICIES:
+            raise ValueError(f"gap_policy must be one of {GAP_POLICIES}")
+        if dtype_policy not in DTYPE_POLICIES:
+            raise ValueError(f"dtype_policy must be one of {tuple(DTYPE_POLICIES)}")
+        price_dtype, volume_dtype = DTYPE_POLICIES[dtype_policy]
+
         # Check if we have a MultiIndex columns (multiple tickers)
         if isinstance(df.columns, pd.MultiIndex):
-            df.columns = ['_'.join(col).strip() for col in df.columns.values]
-        # Single ticker, columns are already flattened
-        
-        # Drop rows with all NaN values
-        df = df.dropna(how='all')
-        
-        # Forward fill and then drop any remaining NAs
-        df = df.ffill().dropna()
-        
-        return df
+            columns = ['_'.join(col).strip() for col in df.columns.values]
+        else:
+            # Single ticker, columns are already flattened
+            columns = list(df.columns)
+        # Exact (ticker, field) of every column, read before the labels are flattened
+        pairs = [split_column(c) for c in df.columns]
+        raw_schema = ColumnSchema(pairs, columns)
+        # Source column of every output column
+        positions = _field_columns(raw_schema, fields, field_major=price_dtype is not None)
+        schema = ColumnSchema([pairs[c] for c in positions], [columns[c] for c in positions])
+        tickers = [pairs[c][0] for c in positions]
+
+        # Output dtype of every column; each run of equal dtypes gets its own array
+        common = np.result_type(np.float32, *df.dtypes.iloc[positions])
+        volume = [field_key(f) == VOLUME_FIELD for f in raw_schema.fields]
+        dtypes = [np.dtype((volume_dtype if volume[code] else price_dtype) or common)
+                  for code in raw_schema.field_codes[positions]]
+        runs = _runs(dtypes)
+        blocks = []
+        for run, (start, stop, _) in enumerate(runs):
+            blocks += [(a, min(a + CLEAN_BLOCK_SIZE, stop), run) for a in range(start, stop, CLEAN_BLOCK_SIZE)]
+        report = dict.fromkeys(['rows_dropped_empty', 'rows_added_calendar', 'rows_dropped_calendar',
+                                'cells_pre_listing', 'cells_forward_filled', 'cells_left_missing',
+                                'rows_dropped_gaps'], 0)
+
+        # Source row for every output row (-1 where the calendar has a date df lacks)
+        if calendar is None:
+            has_data = np.zeros(len(df), dtype=bool)
+            for a, b, _ in blocks:
+                has_data |= df.iloc[:, positions[a:b]].notna().to_numpy().any(axis=1)
+            source = np.flatnonzero(has_data)
+            dates = df.index[source]
+            report['rows_dropped_empty'] = int(len(df) - len(source))
+        else:
+            dates = pd.DatetimeIndex(calendar)
+            source = df.index.get_indexer(dates)
+            report['rows_added_calendar'] = int((source < 0).sum())
+            report['rows_dropped_calendar'] = int(len(df) - (source >= 0).sum())
+        absent = source < 0
+        rows = np.arange(len(dates))[:, None]
+
+        def filled_blocks():
+            for a, b, run in blocks:
+                # Integer columns are filled as float64 (NaN marks the gaps)
+                work = runs[run][2] if runs[run][2].kind == 'f' else np.float64
+                block = df.iloc[:, positions[a:b]].to_numpy(dtype=work, na_value=np.nan)[source]
+                block[absent] = np.nan
+                listed = rows >= _listing_rows(block, dates, tickers[a:b], listing_starts)[None, :]
+                block[~listed] = np.nan
+                yield a, b, run, block, _ffill_block(block, max_ffill), listed
+
+        # Pass 1: decide which rows survive and count what each policy touched
+        keep = np.ones(len(dates), dtype=bool)
+        for a, b, run, block, filled, listed in filled_blocks():
+            missing = np.isnan(filled)
+            report['cells_pre_listing'] += int((~listed).sum())
+            report['cells_forward_filled'] += int((np.isnan(block) & ~missing).sum())
+            report['cells_left_missing'] += int((missing & listed).sum())
+            if gap_policy == 'intersect':
+                keep &= ~missing.any(axis=1)
+            elif gap_policy == 'listed':
+                keep &= ~(missing & listed).any(axis=1)
+        report['rows_dropped_gaps'] = int(len(keep) - keep.sum())
+
+        # Pass 2: write the kept rows of each filled block into its run's output
+        n_rows = int(keep.sum())
+        outs = [np.empty((n_rows, b - a), dtype=dtype) for a, b, dtype in runs]
+        for a, b, run, block, filled, listed in filled_blocks():
+            start, _, dtype = runs[run]
+            kept = filled[keep]
+            if dtype.kind != 'f':
+                kept = np.nan_to_num(np.rint(kept), nan=0)
+            outs[run][:, a - start:b - start] = kept
+
+        cleaned = _frame_from_runs(outs, dates[keep], pd.Index(schema.columns))
+        cleaned.attrs['cleaning_report'] = report
+        cleaned.attrs['schema'] = schema
+        return cleaned
         
     except Exception as e:
         print(f"Error cleaning data: {e}")
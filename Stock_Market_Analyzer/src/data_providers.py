@@ -0,0 +1,208 @@
+"""
+Data providers used by data_cleaning.load_data.
+
+A provider turns (tickers, start, end) into a frame shaped like the output of
+yf.download(..., group_by='ticker'): a DatetimeIndex and (ticker, field)
+MultiIndex columns. The end date is exclusive. A provider that knows a
+ticker has no rows in the range (rather than failing to fetch it) lists it in
+the frame's attrs[price_cache.NO_SESSIONS].
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from price_cache import NO_SESSIONS, combine_tickers
+from resampling import resample_ohlcv
+
+# Column order and time zone (if any) of an npy store
+NPY_COLUMNS = "_columns.npy"
+NPY_TZ = "_tz.npy"
+
+
+def _window_bound(timestamp, tz):
+    """A window bound in the data's time zone; naive bounds are local wall time."""
+    if tz is None:
+        return timestamp.tz_convert(None) if timestamp.tz is not None else timestamp
+    return timestamp.tz_localize(tz) if timestamp.tz is None else timestamp.tz_convert(tz)
+
+
+class DataProvider:
+    """Base class for OHLCV data sources."""
+
+    name = "base"
+
+    def download(self, tickers, start_date, end_date):
+        """Return OHLCV data for tickers in [start_date, end_date)."""
+        raise NotImplementedError
+
+
+class YFinanceProvider(DataProvider):
+    """Yahoo Finance through yfinance."""
+
+    name = "yfinance"
+
+    def __init__(self, progress=True, **kwargs):
+        self.progress = progress
+        self.kwargs = kwargs
+
+    def download(self, tickers, start_date, end_date):
+        import yfinance as yf
+
+        data = yf.download(tickers, start=start_date, end=end_date, group_by='ticker',
+                           progress=self.progress, **self.kwargs)
+        if not isinstance(data.columns, pd.MultiIndex) and len(tickers) == 1:
+            data.columns = pd.MultiIndex.from_product([tickers, data.columns])
+        return data
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Reads a directory of per-ticker Parquet, npy or CSV files.
+
+    Files are named <TICKER>.parquet or <TICKER>.csv and hold one row per bar
+    with a date column (index_col) followed by the field columns. Parquet
+    files are read with column projection and a date filter pushed down to
+    the reader; CSV files are memory-mapped and only the requested columns
+    are parsed. An npy store is a <TICKER>.npy folder with one .npy file per
+    column (the dates sorted, in UTC for tz-aware data); the columns are memory-mapped, the window is
+    found by binary search on the dates and only its rows are read, which
+    suits minute or tick data with millions of rows per ticker.
+
+    Args:
+        directory: Folder containing the per-ticker files
+        fields: Field columns to load (None loads every column)
+        fmt: 'parquet', 'npy', 'csv' or None to pick whichever file exists
+        index_col: Name of the date column
+        bar_size: Resample each ticker's rows to bars of this size (e.g.
+            '5min', 'h', 'D'; see resampling.resample_ohlcv); None keeps the
+            stored rows
+    """
+
+    name = "local"
+
+    def __init__(self, directory, fields=None, fmt=None, index_col="Date", bar_size=None):
+        self.directory = Path(directory)
+        self.fields = list(fields) if fields is not None else None
+        self.fmt = fmt
+        self.index_col = index_col
+        self.bar_size = bar_size
+        if bar_size is not None:
+            # Bars of different sizes must not share a price cache
+            self.name = f"local_{bar_size}"
+
+    def path(self, ticker, fmt=None):
+        """Location of ticker's file, or None if it does not exist."""
+        for ext in ([fmt or self.fmt] if (fmt or self.fmt) else ["parquet", "npy", "csv"]):
+            candidate = self.directory / f"{ticker}.{ext}"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def _read_parquet(self, path, start, end):
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+        if self.index_col in schema.names:
+            tz = getattr(schema.field(self.index_col).type, "tz", None)
+            start, end = _window_bound(start, tz), _window_bound(end, tz)
+        columns = None if self.fields is None else self.fields
+        frame = pd.read_parquet(
+            path,
+            columns=columns,
+            filters=[(self.index_col, ">=", start), (self.index_col, "<", end)],
+        )
+        if self.index_col in frame.columns:
+            frame = frame.set_index(self.index_col)
+        return frame
+
+    def _read_csv(self, path, start, end):
+        usecols = None if self.fields is None else [self.index_col] + self.fields
+        frame = pd.read_csv(path, usecols=usecols, index_col=self.index_col,
+                            parse_dates=[self.index_col], memory_map=True)
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            # UTC offsets that change (e.g. across DST) only parse as UTC
+            frame.index = pd.to_datetime(frame.index, utc=True)
+        tz = frame.index.tz
+        start, end = _window_bound(start, tz), _window_bound(end, tz)
+        return frame.loc[(frame.index >= start) & (frame.index < end)]
+
+    def _read_npy(self, path, start, end):
+        dates = np.load(path / f"{self.index_col}.npy", mmap_mode="r")
+        tz = str(np.load(path / NPY_TZ)) if (path / NPY_TZ).exists() else None
+        if tz is not None:
+            # Dates are stored in UTC
+            start, end = (_window_bound(t, tz).tz_convert(None) for t in (start, end))
+        lo, hi = np.searchsorted(dates, np.array([start, end], dtype=dates.dtype))
+        columns = self.fields if self.fields is not None else list(np.load(path / NPY_COLUMNS))
+        data = {}
+        for column in columns:
+            if (path / f"{column}.npy").exists():
+                data[column] = np.array(np.load(path / f"{column}.npy", mmap_mode="r")[lo:hi])
+        index = pd.DatetimeIndex(np.array(dates[lo:hi]))
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(data, index=index)
+
+    def read(self, ticker, start_date, end_date):
+        """Return one ticker's OHLCV frame in [start_date, end_date)."""
+        path = self.path(ticker)
+        if path is None:
+            return pd.DataFrame()
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        if path.suffix == ".parquet":
+            frame = self._read_parquet(path, start, end)
+        elif path.suffix == ".npy":
+            frame = self._read_npy(path, start, end)
+        else:
+            frame = self._read_csv(path, start, end)
+        frame.index = pd.DatetimeIndex(frame.index, name=self.index_col)
+        if self.bar_size is not None:
+            return resample_ohlcv(frame, self.bar_size)
+        return frame.sort_index()
+
+    def download(self, tickers, start_date, end_date):
+        frames = {}
+        no_sessions = []
+        for ticker in tickers:
+            frame = self.read(ticker, start_date, end_date)
+            if not frame.empty:
+                frames[ticker] = frame
+            elif self.path(ticker) is not None:
+                no_sessions.append(ticker)
+        data = combine_tickers(frames, tickers)
+        data.attrs[NO_SESSIONS] = no_sessions
+        return data
+
+    def write(self, ticker, frame, fmt="parquet"):
+        """Store one ticker's OHLCV frame in the provider's directory."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        frame = frame.rename_axis(self.index_col)
+        if fmt == "parquet":
+            frame.to_parquet(self.directory / f"{ticker}.parquet")
+        elif fmt == "npy":
+            path = self.directory / f"{ticker}.npy"
+            path.mkdir(exist_ok=True)
+            frame = frame.sort_index()
+            dates = frame.index
+            if dates.tz is not None:
+                np.save(path / NPY_TZ, np.array(str(dates.tz)))
+                dates = dates.tz_convert(None)
+            np.save(path / f"{self.index_col}.npy", dates.to_numpy())
+            np.save(path / NPY_COLUMNS, np.array([str(c) for c in frame.columns]))
+            for column in frame.columns:
+                np.save(path / f"{column}.npy", frame[column].to_numpy())
+        else:
+            frame.to_csv(self.directory / f"{ticker}.csv")
+
+
+def get_provider(provider=None):
+    """Resolve a provider argument: None, a name, a directory path or an instance."""
+    if provider is None or provider == "yfinance":
+        return YFinanceProvider()
+    if isinstance(provider, DataProvider):
+        return provider
+    if isinstance(provider, (str, Path)) and Path(provider).is_dir():
+        return LocalFileProvider(provider)
+    raise ValueError(f"Unknown data provider: {provider}")
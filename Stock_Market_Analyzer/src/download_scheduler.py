@@ -0,0 +1,129 @@
+"""
+Batched, concurrent downloads on top of any DataProvider.
+
+DownloadScheduler splits a ticker universe into batches, runs them on a
+bounded thread pool behind a shared rate limit and keeps whatever came back.
+yfinance does not raise for a bad or throttled ticker but leaves it out of
+the result, so the tickers of a batch that are missing or all-NaN are
+retried with exponential backoff, as is a batch whose provider call raised.
+Tickers still missing after the last attempt are recorded in
+DownloadScheduler.failures, unless the provider reports that they have no
+sessions in the range (attrs[price_cache.NO_SESSIONS]).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data_providers import DataProvider
+from price_cache import NO_SESSIONS, combine_tickers, split_by_ticker
+
+DEFAULT_BATCH_SIZE = 50
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1 / rate seconds apart across all threads.
+
+    Args:
+        rate: Maximum calls per second (None disables the limit)
+        clock: Monotonic time function
+        sleep: Sleep function
+    """
+
+    def __init__(self, rate=None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class DownloadScheduler(DataProvider):
+    """
+    Wraps a provider with batching, concurrency, rate limiting and retries.
+
+    Args:
+        provider: Underlying DataProvider
+        batch_size: Tickers per provider call
+        max_workers: Size of the thread pool
+        max_retries: Extra attempts per batch after the first one
+        backoff: Base delay in seconds, doubled after every failed attempt
+        rate_limit: Maximum provider calls per second across all workers
+        sleep: Sleep function (swap out in tests to avoid real delays)
+    """
+
+    def __init__(self, provider, batch_size=DEFAULT_BATCH_SIZE, max_workers=4,
+                 max_retries=3, backoff=1.0, rate_limit=2.0, sleep=time.sleep):
+        self.provider = provider
+        self.name = provider.name
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.limiter = RateLimiter(rate_limit, sleep=sleep)
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def batches(self, tickers):
+        """Split tickers into consecutive batches of batch_size."""
+        return [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+
+    def _run_batch(self, batch, start_date, end_date):
+        """
+        Download one batch, retrying the tickers that did not come back.
+
+        Returns ({ticker: frame}, tickers without sessions, {ticker: error}).
+        """
+        frames = {}
+        no_sessions = set()
+        missing = list(batch)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.sleep(self.backoff * 2 ** (attempt - 1))
+            self.limiter.wait()
+            try:
+                data = self.provider.download(missing, start_date, end_date)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            frames.update(split_by_ticker(data, missing))
+            no_sessions.update(data.attrs.get(NO_SESSIONS, ()))
+            missing = [t for t in missing if t not in frames and t not in no_sessions]
+            if not missing:
+                break
+            error = "no data returned"
+        return frames, no_sessions, {t: error for t in missing}
+
+    def download(self, tickers, start_date, end_date):
+        tickers = list(tickers)
+        frames = {}
+        no_sessions = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            batches = self.batches(tickers)
+            futures = [pool.submit(self._run_batch, batch, start_date, end_date) for batch in batches]
+            for batch, future in zip(batches, futures):
+                batch_frames, batch_no_sessions, batch_failures = future.result()
+                frames.update(batch_frames)
+                no_sessions.update(batch_no_sessions)
+                with self._lock:
+                    self.failures.update(batch_failures)
+                    for ticker in batch:
+                        if ticker not in batch_failures:
+                            self.failures.pop(ticker, None)
+        data = combine_tickers(frames, tickers)
+        data.attrs[NO_SESSIONS] = [t for t in tickers if t in no_sessions]
+        return data
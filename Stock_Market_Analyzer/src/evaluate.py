@@ -4,11 +4,6 @@ Model evaluation utilities for Online News Popularity.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import (accuracy_score, precision_score, recall_score,
-                             f1_score, roc_auc_score, confusion_matrix,
-                             roc_curve, classification_report)
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -51,6 +46,10 @@ class ModelEvaluator:
             self.probabilities = self.predictions
 
         # Calculate metrics
+        from sklearn.metrics import (accuracy_score, precision_score, recall_score,
+                                     f1_score, roc_auc_score, confusion_matrix,
+                                     classification_report)
+
         self.results = {
             'accuracy': accuracy_score(self.y_test, self.predictions),
             'precision': precision_score(self.y_test, self.predictions),
@@ -71,6 +70,9 @@ class ModelEvaluator:
         if self.results is None:
             self.evaluate()
 
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         fig, ax = plt.subplots(figsize=(8, 6))
         sns.heatmap(self.results['confusion_matrix'],
                     annot=True, fmt='d', cmap='Blues',
@@ -88,6 +90,9 @@ class ModelEvaluator:
         if self.results is None:
             self.evaluate()
 
+        import matplotlib.pyplot as plt
+        from sklearn.metrics import roc_curve
+
         fpr, tpr, _ = roc_curve(self.y_test, self.probabilities)
 
         fig, ax = plt.subplots(figsize=(8, 6))
@@ -117,6 +122,8 @@ class ModelEvaluator:
             'importance': importances
         }).sort_values('importance', ascending=False)
 
+        import matplotlib.pyplot as plt
+
         fig, ax = plt.subplots(figsize=(10, 8))
         top_features = importance_df.head(top_n)
         ax.barh(top_features['feature'], top_features['importance'])
@@ -199,6 +206,8 @@ def compare_models(models, X_test, y_test, model_names=None):
     Returns:
         DataFrame with comparison results
     """
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
     if model_names is None:
         model_names = [f'Model_{i}' for i in range(len(models))]
 
@@ -5,8 +5,6 @@ Matches the feature engineering from notebooks 02 and 04.
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-import joblib
 
 
 class FeatureEngineer:
@@ -42,7 +40,13 @@ class FeatureEngineer:
         # 4. Topic Features
         topic_cols = ['LDA_00', 'LDA_01', 'LDA_02', 'LDA_03', 'LDA_04']
         data['topic_diversity'] = data[topic_cols].var(axis=1)
-        data['dominant_topic'] = data[topic_cols].idxmax(axis=1).str.replace('LDA_', '').astype(int)
+        # Argmax over the topic block (NaN weights skipped, as by idxmax) instead
+        # of a string round-trip per row; -1 where a row has no topic weights
+        topics = data[topic_cols].to_numpy(dtype=np.float64)
+        no_topic = np.isnan(topics).all(axis=1)
+        topic_ids = np.array([int(c.replace('LDA_', '')) for c in topic_cols])
+        best = np.nanargmax(np.where(no_topic[:, None], 0, topics), axis=1)
+        data['dominant_topic'] = np.where(no_topic, -1, topic_ids[best])
 
         # 5. Sentiment Features
         data['sentiment_volatility'] = data['max_positive_polarity'] - abs(data['min_negative_polarity'])
@@ -89,6 +93,7 @@ class FeatureEngineer:
 
     def fit_scaler(self, X):
         """Fit StandardScaler on training data."""
+        from sklearn.preprocessing import StandardScaler
         self.scaler = StandardScaler()
         self.scaler.fit(X)
         self.feature_names = X.columns.tolist() if hasattr(X, 'columns') else None
@@ -108,11 +113,13 @@ class FeatureEngineer:
     def save(self, path_prefix='models/feature_engineer'):
         """Save the feature engineer."""
         if self.scaler is not None:
+            import joblib
             joblib.dump(self.scaler, f'{path_prefix}_scaler.pkl')
         print(f"✅ Feature engineer saved to {path_prefix}_scaler.pkl")
 
     def load(self, path_prefix='models/feature_engineer'):
         """Load the feature engineer."""
+        import joblib
         self.scaler = joblib.load(f'{path_prefix}_scaler.pkl')
         print(f"✅ Feature engineer loaded from {path_prefix}_scaler.pkl")
         return self
@@ -0,0 +1,273 @@
+"""
+Stage-level timing and memory instrumentation for the analysis pipeline.
+
+A Tracer collects one record per pipeline stage: wall time, CPU time, the
+rows/columns and in-memory size of the data the stage produced and its peak
+traced allocation. Stages are marked with a context manager or a decorator:
+
+    tracer = Tracer(name="AAPL,MSFT")
+    with tracer.stage("clean_data") as stage:
+        cleaned = clean_data(raw)
+        stage.record_shape(cleaned)
+
+    @tracer.traced("metrics")
+    def metrics(prices): ...
+
+A disabled tracer (NULL_TRACER, or Tracer(enabled=False)) hands out one
+shared no-op stage, so instrumented code costs an attribute lookup and a
+function call per stage when tracing is off.
+
+tracemalloc is process-wide, so all tracers share one session: the first
+stage to need it starts it and the last one to finish stops it, under a
+lock. Stages of tracers in other threads overlap, so their peaks include
+each other's allocations. When tracemalloc was already started by other
+code, stages leave it alone and record no peak.
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+
+import pandas as pd
+
+
+def _array_nbytes(data):
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(index=True, deep=False).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(index=True, deep=False))
+    nbytes = getattr(data, "nbytes", None)
+    return None if nbytes is None else int(nbytes)
+
+
+def data_nbytes(data):
+    """
+    In-memory size of a frame, series or array, index included. For a dict,
+    list, tuple or result object (e.g. MetricsResult) the sizes of the
+    frames, series and arrays it holds are added up. None if there are none.
+    """
+    nbytes = _array_nbytes(data)
+    if nbytes is not None:
+        return nbytes
+    if isinstance(data, dict):
+        members = data.values()
+    elif isinstance(data, (list, tuple)):
+        members = data
+    elif hasattr(data, "__dict__"):
+        members = vars(data).values()
+    else:
+        return None
+    sizes = [n for n in map(_array_nbytes, members) if n is not None]
+    return sum(sizes) if sizes else None
+
+
+# Shared tracemalloc session: stages using it, and the lock guarding them
+_tracemalloc_lock = threading.Lock()
+_sampling_stages = []
+
+
+def _start_sampling(stage):
+    """
+    Start measuring stage's peak allocation, starting tracemalloc if no
+    stage is using it. False if other code's tracemalloc session is running.
+    """
+    with _tracemalloc_lock:
+        if not _sampling_stages:
+            if tracemalloc.is_tracing():
+                return False
+            tracemalloc.start()
+        # Running stages keep the peak reached so far before it is reset
+        current, peak = tracemalloc.get_traced_memory()
+        for other in _sampling_stages:
+            other._max_seen = max(other._max_seen, peak)
+        tracemalloc.reset_peak()
+        stage._start_bytes = current
+        stage._max_seen = current
+        _sampling_stages.append(stage)
+        return True
+
+
+def _stop_sampling(stage):
+    """Peak allocation of stage above its start; stops tracemalloc after the last stage."""
+    with _tracemalloc_lock:
+        peak = max(tracemalloc.get_traced_memory()[1], stage._max_seen)
+        _sampling_stages.remove(stage)
+        if not _sampling_stages:
+            tracemalloc.stop()
+        return peak - stage._start_bytes
+
+
+class StageRecord:
+    """
+    Measurements of one traced stage.
+
+    Attributes:
+        name: Stage name
+        depth: Nesting level (0 = top-level stage)
+        wall_s: Wall-clock seconds
+        cpu_s: Process CPU seconds
+        rows, cols: Shape of the data the stage produced (if recorded)
+        out_bytes: In-memory size of that data (views count their full size)
+        peak_bytes: Peak traced allocation above the stage's starting point
+            (None when memory tracing is off or tracemalloc belongs to other code)
+        error: Exception type if the stage raised
+    """
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.wall_s = None
+        self.cpu_s = None
+        self.rows = None
+        self.cols = None
+        self.out_bytes = None
+        self.peak_bytes = None
+        self.error = None
+
+    def record_shape(self, data):
+        """Take rows/cols and size from anything with a .shape (frames, arrays)."""
+        shape = getattr(data, "shape", None)
+        if shape:
+            self.rows = int(shape[0])
+            self.cols = int(shape[1]) if len(shape) > 1 else 1
+            self.out_bytes = data_nbytes(data)
+        return data
+
+    def to_dict(self):
+        return {
+            "stage": self.name,
+            "depth": self.depth,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "rows": self.rows,
+            "cols": self.cols,
+            "out_bytes": self.out_bytes,
+            "peak_bytes": self.peak_bytes,
+            "error": self.error,
+        }
+
+
+class _NullStage:
+    """Shared stage handed out by disabled tracers."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def record_shape(self, data):
+        return data
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Context manager that measures one stage of a Tracer."""
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.record = StageRecord(name, len(tracer._stack))
+        self._sampling = False
+        self._start_bytes = 0
+        self._max_seen = 0
+
+    def record_shape(self, data):
+        return self.record.record_shape(data)
+
+    def __enter__(self):
+        tracer = self.tracer
+        if tracer.memory:
+            self._sampling = _start_sampling(self)
+        tracer._stack.append(self)
+        tracer.records.append(self.record)
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = self.record
+        record.wall_s = time.perf_counter() - self._wall
+        record.cpu_s = time.process_time() - self._cpu
+        if exc_type is not None:
+            record.error = exc_type.__name__
+
+        self.tracer._stack.pop()
+        if self._sampling:
+            record.peak_bytes = _stop_sampling(self)
+        return False
+
+
+class Tracer:
+    """
+    Per-request trace of pipeline stages.
+
+    Args:
+        name: Label for the traced request (e.g. the tickers)
+        enabled: When False every stage is a no-op
+        memory: Track peak allocations with tracemalloc (slows allocation-heavy
+            stages down; wall/CPU time are still recorded when off)
+    """
+
+    def __init__(self, name="", enabled=True, memory=True):
+        self.name = name
+        self.enabled = enabled
+        self.memory = memory
+        self.request_id = uuid.uuid4().hex[:12]
+        self.started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.records = []
+        self._stack = []
+
+    def stage(self, name):
+        """Context manager measuring the enclosed block as stage name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def traced(self, name=None):
+        """Decorator measuring every call as a stage (rows/cols from the result's shape)."""
+        def decorator(func):
+            stage_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(stage_name) as stage:
+                    return stage.record_shape(func(*args, **kwargs))
+            return wrapper
+        return decorator
+
+    def to_records(self):
+        """One dict per stage, tagged with the request."""
+        base = {"request_id": self.request_id, "request": self.name, "started": self.started}
+        return [{**base, **record.to_dict()} for record in self.records]
+
+    def to_frame(self):
+        """Stages as a DataFrame (nested stages indented by depth)."""
+        frame = pd.DataFrame([record.to_dict() for record in self.records],
+                             columns=["stage", "depth", "wall_s", "cpu_s", "rows", "cols",
+                                      "out_bytes", "peak_bytes", "error"])
+        frame["stage"] = ["  " * d + s for d, s in zip(frame["depth"], frame["stage"])]
+        frame["out_mb"] = frame.pop("out_bytes") / 2 ** 20
+        frame["peak_mb"] = frame.pop("peak_bytes") / 2 ** 20
+        return frame.drop(columns="depth")
+
+    def to_json_lines(self):
+        return "".join(json.dumps(record) + "\n" for record in self.to_records())
+
+    def write_json_lines(self, path):
+        """Append the trace to a JSON lines file, one line per stage."""
+        if not self.records:
+            return
+        with open(path, "a") as fh:
+            fh.write(self.to_json_lines())
+
+
+# Shared disabled tracer: the default wherever a tracer is optional
+NULL_TRACER = Tracer(enabled=False)
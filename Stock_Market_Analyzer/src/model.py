@@ -4,13 +4,6 @@ Model training and prediction pipeline for Online News Popularity.
 
 import pandas as pd
 import numpy as np
-import joblib
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
-from sklearn.metrics import accuracy_score, roc_auc_score, classification_report
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -41,8 +34,10 @@ class NewsPopularityModel:
     def _create_model(self):
         """Create the appropriate model instance."""
         if self.model_type == 'lr':
+            from sklearn.linear_model import LogisticRegression
             return LogisticRegression(max_iter=1000, random_state=42)
         elif self.model_type == 'rf':
+            from sklearn.ensemble import RandomForestClassifier
             return RandomForestClassifier(
                 n_estimators=200,
                 max_depth=10,
@@ -52,6 +47,7 @@ class NewsPopularityModel:
                 n_jobs=-1
             )
         elif self.model_type == 'xgb':
+            from xgboost import XGBClassifier
             return XGBClassifier(
                 n_estimators=500,
                 max_depth=5,
@@ -81,6 +77,9 @@ class NewsPopularityModel:
         Returns:
             Dictionary with training metrics
         """
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score, roc_auc_score, classification_report
+
         # Split data
         X_train, X_val, y_train, y_val = train_test_split(
             X, y, test_size=test_size, random_state=42, stratify=y
@@ -153,6 +152,8 @@ class NewsPopularityModel:
         Returns:
             Dictionary with evaluation metrics
         """
+        from sklearn.metrics import accuracy_score, roc_auc_score, classification_report
+
         pred = self.predict(X_test)
         proba = self.predict_proba(X_test)
 
@@ -175,11 +176,13 @@ class NewsPopularityModel:
             'model_type': self.model_type,
             'threshold': self.threshold
         }
+        import joblib
         joblib.dump(config, model_path)
         print(f"✅ Model saved to {model_path}")
 
     def load(self, model_path='models/best_model.pkl'):
         """Load a trained model."""
+        import joblib
         config = joblib.load(model_path)
         self.model = config['model']
         self.model_type = config['model_type']
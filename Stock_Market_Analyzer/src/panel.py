@@ -0,0 +1,89 @@
+"""
+Typed price panel: a 3-D array indexed by field x date x ticker.
+
+An alternative to the wide "TICKER_Field" frame produced by clean_data.
+Every field is stored as one contiguous date x ticker block, so selecting a
+field is a zero-copy view instead of a scan over column names.
+"""
+
+import numpy as np
+import pandas as pd
+
+from schema import field_key, get_schema
+
+
+class PricePanel:
+    """
+    Field x date x ticker price panel.
+
+    Args:
+        values: Array of shape (n_fields, n_dates, n_tickers)
+        fields: Field names (e.g. 'Open', 'Adj Close')
+        dates: DatetimeIndex of length n_dates
+        tickers: Ticker symbols of length n_tickers
+    """
+
+    def __init__(self, values, fields, dates, tickers):
+        self.values = values
+        self.fields = list(fields)
+        self.dates = pd.Index(dates)
+        self.tickers = pd.Index(tickers)
+        self._field_pos = {field_key(f): i for i, f in enumerate(self.fields)}
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64, fields=None):
+        """
+        Build a panel from a (ticker, field) MultiIndex or "TICKER_Field" frame.
+
+        Columns are located through the frame's schema (see schema.get_schema)
+        and each field is copied once, straight into its block of the panel;
+        missing (ticker, field) combinations are filled with NaN. fields keeps
+        only those fields (None keeps all).
+        """
+        schema = get_schema(df)
+        if fields is None:
+            fields = schema.fields
+        values = np.full((len(fields), len(df), len(schema.tickers)), np.nan, dtype=dtype)
+        for i, field in enumerate(fields):
+            positions = schema.field_positions(field)
+            present = positions >= 0
+            block = df.iloc[:, positions[present]].to_numpy(dtype=dtype, na_value=np.nan)
+            if present.all():
+                values[i] = block
+            else:
+                values[i][:, present] = block
+        return cls(values, fields, df.index, schema.tickers)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def has_field(self, field):
+        return field_key(field) in self._field_pos
+
+    def get_field(self, field):
+        """Zero-copy (date x ticker) array view of one field."""
+        try:
+            return self.values[self._field_pos[field_key(field)]]
+        except KeyError:
+            raise KeyError(f"Field {field!r} not in panel (available: {self.fields})") from None
+
+    def get_frame(self, field):
+        """DataFrame with ticker columns wrapping the field's array without copying."""
+        return pd.DataFrame(self.get_field(field), index=self.dates, columns=self.tickers, copy=False)
+
+    def close_prices(self):
+        """Adjusted close if available, otherwise close."""
+        field = "adj_close" if self.has_field("adj_close") else "close"
+        return self.get_frame(field)
+
+    def to_long(self):
+        """Tidy frame indexed by (date, ticker) with one column per field."""
+        n_fields, n_dates, n_tickers = self.values.shape
+        index = pd.MultiIndex.from_product([self.dates, self.tickers], names=["Date", "Ticker"])
+        data = self.values.transpose(1, 2, 0).reshape(n_dates * n_tickers, n_fields)
+        return pd.DataFrame(data, index=index, columns=self.fields)
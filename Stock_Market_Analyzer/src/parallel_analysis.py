@@ -0,0 +1,196 @@
+"""
+Process-parallel version of the data_analysis metrics.
+
+Tickers are split into column shards that worker processes handle
+independently; the correlation matrix is split into (row block, column
+block) tiles. Prices, returns and outputs live in shared memory, so workers
+only receive a few array names and slice bounds instead of pickled frames.
+
+Results match daily_returns, cumulative_returns, annualized_volatility,
+sharpe_ratio, max_drawdown and correlation_matrix (to floating-point
+rounding).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from data_analysis import MetricsResult, _max_drawdown_values
+
+
+class SharedArray:
+    """A NumPy array backed by a named shared-memory block."""
+
+    def __init__(self, shape, dtype=np.float64, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def spec(self):
+        """Picklable (name, shape, dtype) handle for worker processes."""
+        return self.shm.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _shards(n, n_parts):
+    """Split range(n) into at most n_parts contiguous (start, stop) slices."""
+    bounds = np.linspace(0, n, min(n_parts, n) + 1).astype(int)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _run_attached(func, specs, *args):
+    """Call func on the attached shared arrays, detaching once no views remain."""
+    arrays = [SharedArray.attach(spec) for spec in specs]
+    try:
+        return func(*[arr.array for arr in arrays], *args)
+    finally:
+        for arr in arrays:
+            arr.close()
+
+
+def _returns_shard(prices, returns, cumulative, cols):
+    """Phase 1: returns and cumulative returns of one column shard; rows with a non-finite return."""
+    a, b = cols
+    p = prices[:, a:b]
+    r = returns[:, a:b]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(p[1:], p[:-1], out=r)
+        r -= 1
+        np.divide(p, p[0], out=cumulative[:, a:b])
+        cumulative[:, a:b] -= 1
+    return ~np.isfinite(r).all(axis=1)
+
+
+def _stats_shard(returns, z, keep, cols, risk_free, periods_per_year):
+    """Phase 2: per-ticker statistics of one shard and its standardized returns."""
+    a, b = cols
+    r = returns[keep, a:b]
+    n_obs = r.shape[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = r.mean(axis=0) if n_obs else np.full(b - a, np.nan)
+        centered = r - mean
+        ss = (centered * centered).sum(axis=0)
+        std = np.sqrt(ss / (n_obs - 1)) if n_obs > 1 else np.full(b - a, np.nan)
+        volatility = std * np.sqrt(periods_per_year)
+        sharpe = (mean * periods_per_year - risk_free) / volatility
+        drawdown = _max_drawdown_values(r) if n_obs else np.full(b - a, np.nan)
+
+        z[:, a:b] = np.where(ss > 0, centered / np.sqrt(ss), 0.0)
+    return mean, std, volatility, sharpe, drawdown
+
+
+def _corr_tile(z, corr, rows, cols):
+    """Phase 3: one tile of the correlation matrix (and its mirror)."""
+    (a, b), (c, d) = rows, cols
+    tile = z[:, a:b].T @ z[:, c:d]
+    corr[a:b, c:d] = tile
+    corr[c:d, a:b] = tile.T
+
+
+def _phase(func, specs):
+    """Bind a phase function to the shared arrays it works on, for pool.map."""
+    return partial(_run_attached, func, specs)
+
+
+def parallel_metrics(prices, n_workers=None, risk_free=0, periods_per_year=252, block_size=256):
+    """
+    Compute the data_analysis metrics for a price frame across worker processes.
+
+    Args:
+        prices: Price frame with one column per ticker
+        n_workers: Worker processes (default: CPU count)
+        risk_free: Annual risk-free rate for the Sharpe ratio
+        periods_per_year: Periods used for annualization
+        block_size: Tickers per correlation tile
+
+    Returns:
+        MetricsResult (with max_drawdown filled in), or None on error
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    n_rows, k = prices.shape
+    tickers = prices.columns
+    if n_rows < 2 or k == 0:
+        return None
+
+    buffers = []
+    try:
+        price_buf = SharedArray((n_rows, k))
+        buffers.append(price_buf)
+        price_buf.array[:] = prices.to_numpy(dtype=np.float64)
+        returns_buf = SharedArray((n_rows - 1, k))
+        buffers.append(returns_buf)
+        cumulative_buf = SharedArray((n_rows, k))
+        buffers.append(cumulative_buf)
+
+        shards = _shards(k, n_workers)
+        n = len(shards)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # Phase 1: returns per shard; a row is dropped if any ticker's return is bad
+            bad = np.zeros(n_rows - 1, dtype=bool)
+            phase = _phase(_returns_shard, [price_buf.spec, returns_buf.spec, cumulative_buf.spec])
+            for shard_bad in pool.map(phase, shards):
+                bad |= shard_bad
+            keep = np.flatnonzero(~bad)
+
+            # Phase 2: per-ticker statistics on the rows every shard keeps
+            z_buf = SharedArray((len(keep), k))
+            buffers.append(z_buf)
+            phase = _phase(_stats_shard, [returns_buf.spec, z_buf.spec])
+            stats = list(pool.map(phase, [keep] * n, shards, [risk_free] * n, [periods_per_year] * n))
+            mean, std, volatility, sharpe, drawdown = (np.concatenate(parts) for parts in zip(*stats))
+
+            # Phase 3: upper-triangle correlation tiles
+            corr_buf = SharedArray((k, k))
+            buffers.append(corr_buf)
+            blocks = _shards(k, -(-k // block_size))
+            tiles = [(blocks[i], blocks[j]) for i in range(len(blocks)) for j in range(i, len(blocks))]
+            list(pool.map(_phase(_corr_tile, [z_buf.spec, corr_buf.spec]), *zip(*tiles)))
+
+        correlation = corr_buf.array.copy()
+        covariance = correlation * np.outer(std, std)
+        np.fill_diagonal(covariance, std ** 2)
+        constant = ~(std > 0)
+        correlation[constant, :] = np.nan
+        correlation[:, constant] = np.nan
+        np.fill_diagonal(correlation, np.where(constant, np.nan, 1.0))
+
+        dates = prices.index[1:][keep]
+        return MetricsResult(
+            daily_returns=pd.DataFrame(returns_buf.array[keep], index=dates, columns=tickers),
+            cumulative_returns=pd.DataFrame(cumulative_buf.array.copy(), index=prices.index, columns=tickers),
+            mean=pd.Series(mean, index=tickers),
+            std=pd.Series(std, index=tickers),
+            volatility=pd.Series(volatility, index=tickers),
+            sharpe=pd.Series(sharpe, index=tickers),
+            covariance=pd.DataFrame(covariance, index=tickers, columns=tickers),
+            correlation=pd.DataFrame(correlation, index=tickers, columns=tickers),
+            max_drawdown=pd.Series(drawdown, index=tickers),
+        )
+    except Exception as e:
+        print(f"Error computing parallel metrics: {e}")
+        return None
+    finally:
+        for buf in buffers:
+            buf.close()
@@ -0,0 +1,312 @@
+"""
+Long-only portfolio construction on top of the data_analysis metrics.
+
+All portfolios are fully invested with no short positions, so every weight
+vector lies on the probability simplex. Minimum-variance and efficient
+frontier points are solved with FISTA (accelerated projected gradient) on
+the simplex; consecutive frontier points are warm-started from the previous
+solution, which keeps a 1,000-asset, 50-point frontier to a few seconds.
+Maximum-Sharpe searches along the frontier and risk parity takes damped
+Newton steps on its convex log-barrier formulation.
+
+Inputs are daily (per-period) mean returns and covariances, as produced by
+compute_all_metrics or shrink_covariance; reported returns, volatilities
+and Sharpe ratios are annualized with periods_per_year.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Frontier points max_sharpe sweeps to bracket the tangency portfolio
+SHARPE_GRID_POINTS = 16
+
+
+class EfficientFrontier:
+    """
+    Points along the long-only efficient frontier, lowest risk first.
+
+    Attributes:
+        returns: Annualized expected return of each point
+        volatility: Annualized volatility of each point
+        sharpe: Sharpe ratio of each point
+        weights: Weights, one row per point and one column per ticker
+    """
+
+    def __init__(self, returns, volatility, sharpe, weights):
+        self.returns = returns
+        self.volatility = volatility
+        self.sharpe = sharpe
+        self.weights = weights
+
+
+def shrink_covariance(daily_returns):
+    """
+    Ledoit-Wolf covariance: the sample covariance shrunk towards a scaled
+    identity with the intensity that minimizes expected squared error.
+
+    Returns (covariance DataFrame, shrinkage intensity in [0, 1]). Rows with
+    any missing return are dropped.
+    """
+    x = daily_returns.to_numpy()
+    if x.dtype != np.float32:
+        x = x.astype(np.float64, copy=False)
+    x = x[np.isfinite(x).all(axis=1)]
+    n, k = x.shape
+    if n < 2:
+        raise ValueError("need at least two complete rows of returns")
+
+    # float32 returns are centered into float64
+    x = np.subtract(x, x.mean(axis=0, dtype=np.float64), dtype=np.float64)
+    sample = x.T @ x
+    sample /= n
+    mu = np.trace(sample) / k
+    # Squared distance of the sample covariance from the target, and the
+    # variance of the sample covariance estimated from the observations
+    target_dist = (sample * sample).sum() - 2 * mu * np.trace(sample) + k * mu * mu
+    row_norms = (x * x).sum(axis=1)
+    estimate_var = ((row_norms * row_norms).sum() - n * (sample * sample).sum()) / (n * n)
+    shrinkage = 1.0 if target_dist <= 0 else float(np.clip(estimate_var / target_dist, 0.0, 1.0))
+
+    covariance = sample * (1 - shrinkage)
+    covariance[np.diag_indices(k)] += shrinkage * mu
+    # Same ddof=1 scaling as compute_all_metrics
+    covariance *= n / (n - 1)
+    columns = daily_returns.columns
+    return pd.DataFrame(covariance, index=columns, columns=columns, copy=False), shrinkage
+
+
+def project_simplex(v):
+    """Euclidean projection of v onto {w : w >= 0, sum(w) = 1}."""
+    u = np.sort(v)[::-1]
+    cumulative = np.cumsum(u) - 1
+    rho = np.flatnonzero(u * np.arange(1, len(v) + 1) > cumulative)[-1]
+    return np.maximum(v - cumulative[rho] / (rho + 1), 0)
+
+
+def _largest_eigenvalue(cov, iterations=100, tol=1e-6):
+    """Largest eigenvalue of a PSD matrix by power iteration."""
+    v = np.full(len(cov), 1 / np.sqrt(len(cov)))
+    value = 0.0
+    for _ in range(iterations):
+        w = cov @ v
+        new_value = np.linalg.norm(w)
+        if new_value == 0:
+            return 0.0
+        v = w / new_value
+        if abs(new_value - value) <= tol * new_value:
+            break
+        value = new_value
+    return new_value
+
+
+def _fista(cov, linear, start, step, max_iter=5000, tol=1e-9):
+    """
+    Minimize 0.5 w'Σw - linear'w over the simplex, starting from start.
+
+    FISTA with gradient-based restarts; stops once an iteration moves no
+    weight by more than tol.
+    """
+    w = start
+    y = w
+    t = 1.0
+    for _ in range(max_iter):
+        w_next = project_simplex(y - step * (cov @ y - linear))
+        if np.abs(w_next - w).max() < tol:
+            return w_next
+        # Restart the momentum when it points uphill
+        if (y - w_next) @ (w_next - w) > 0:
+            t = 1.0
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + ((t - 1) / t_next) * (w_next - w)
+        w, t = w_next, t_next
+    return w
+
+
+def _as_arrays(cov, expected_returns=None):
+    sigma = np.asarray(cov, dtype=np.float64)
+    if sigma.ndim != 2 or sigma.shape[0] != sigma.shape[1] or not np.isfinite(sigma).all():
+        raise ValueError("covariance must be a finite square matrix")
+    if expected_returns is None:
+        return sigma, None
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    if mu.shape != (len(sigma),) or not np.isfinite(mu).all():
+        raise ValueError("expected returns must be finite and match the covariance")
+    return sigma, mu
+
+
+def _tickers(cov):
+    return cov.columns if isinstance(cov, pd.DataFrame) else pd.RangeIndex(len(cov))
+
+
+def min_variance(cov):
+    """Long-only minimum-variance weights."""
+    sigma, _ = _as_arrays(cov)
+    k = len(sigma)
+    lipschitz = _largest_eigenvalue(sigma)
+    if lipschitz == 0:
+        weights = np.full(k, 1 / k)
+    else:
+        weights = _fista(sigma, np.zeros(k), np.full(k, 1 / k), 1 / lipschitz)
+    return pd.Series(weights, index=_tickers(cov))
+
+
+def _max_tradeoff(sigma, mu):
+    """
+    Smallest return weight t at which the maximum-return asset alone
+    minimizes 0.5 w'Σw - t mu'w, i.e. the top end of the frontier.
+    """
+    top = int(np.argmax(mu))
+    gap = mu[top] - mu
+    lower = gap > 0
+    if not lower.any():
+        return 0.0, top
+    needed = (sigma[top, top] - sigma[top]) / np.where(lower, gap, 1)
+    return max(float(needed[lower].max()), 0.0), top
+
+
+class _FrontierSolver:
+    """Warm-started solves of 0.5 w'Σw - t mu'w for increasing t."""
+
+    def __init__(self, sigma, mu):
+        self.sigma = sigma
+        self.mu = mu
+        lipschitz = _largest_eigenvalue(sigma)
+        self.step = 1 / lipschitz if lipschitz > 0 else 1.0
+        self.t_max, self.top = _max_tradeoff(sigma, mu)
+        self.weights = np.full(len(mu), 1 / len(mu))
+
+    def solve(self, t, start=None):
+        start = self.weights if start is None else start
+        self.weights = _fista(self.sigma, t * self.mu, start, self.step)
+        return self.weights
+
+
+def _annualized(weights, sigma, mu, risk_free, periods_per_year):
+    ret = weights @ mu * periods_per_year
+    vol = np.sqrt(max(weights @ sigma @ weights, 0) * periods_per_year)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (ret - risk_free) / vol
+    return ret, vol, sharpe
+
+
+def efficient_frontier(cov, expected_returns, n_points=50, risk_free=0, periods_per_year=252):
+    """
+    Trace the long-only efficient frontier from minimum variance to the
+    maximum-return asset.
+
+    Each point minimizes 0.5 w'Σw - t mu'w for a return weight t; points are
+    solved in order of increasing t, each warm-started from the last.
+
+    Returns:
+        EfficientFrontier
+    """
+    sigma, mu = _as_arrays(cov, expected_returns)
+    solver = _FrontierSolver(sigma, mu)
+    # Denser near the minimum-variance end, where the frontier bends most
+    tradeoffs = solver.t_max * np.linspace(0, 1, n_points) ** 2
+
+    weights = np.empty((n_points, len(mu)))
+    for i, t in enumerate(tradeoffs):
+        weights[i] = solver.solve(t)
+
+    stats = np.array([_annualized(w, sigma, mu, risk_free, periods_per_year) for w in weights])
+    return EfficientFrontier(
+        returns=pd.Series(stats[:, 0]),
+        volatility=pd.Series(stats[:, 1]),
+        sharpe=pd.Series(stats[:, 2]),
+        weights=pd.DataFrame(weights, columns=_tickers(cov)),
+    )
+
+
+def max_sharpe(cov, expected_returns, risk_free=0, periods_per_year=252, tol=1e-6):
+    """
+    Long-only maximum-Sharpe (tangency) weights.
+
+    The tangency portfolio lies on the efficient frontier, where the Sharpe
+    ratio is unimodal in the return weight t: a coarse warm-started sweep
+    over t brackets the best point and a golden-section search refines it
+    to tol * t_max.
+    """
+    sigma, mu = _as_arrays(cov, expected_returns)
+    solver = _FrontierSolver(sigma, mu)
+
+    def sharpe_at(t, start=None):
+        w = solver.solve(t, start)
+        sharpe = _annualized(w, sigma, mu, risk_free, periods_per_year)[2]
+        return (-np.inf if np.isnan(sharpe) else sharpe), w.copy()
+
+    grid = solver.t_max * np.linspace(0, 1, SHARPE_GRID_POINTS) ** 2
+    sweep = [sharpe_at(t) for t in grid]
+    best = max(range(len(grid)), key=lambda i: sweep[i][0])
+    lo, hi = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+    start = sweep[best][1]
+
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+    fa, fb = sharpe_at(a, start), sharpe_at(b, start)
+    while hi - lo > tol * solver.t_max:
+        if fa[0] >= fb[0]:
+            hi, b, fb = b, a, fa
+            a = hi - ratio * (hi - lo)
+            fa = sharpe_at(a, fb[1])
+        else:
+            lo, a, fa = a, b, fb
+            b = lo + ratio * (hi - lo)
+            fb = sharpe_at(b, fa[1])
+    weights = max((sweep[best], fa, fb), key=lambda s: s[0])[1]
+    return pd.Series(weights, index=_tickers(cov))
+
+
+def risk_parity(cov, budgets=None, max_iter=100, tol=1e-12):
+    """
+    Risk-parity weights: each asset contributes its budget share (equal by
+    default) of portfolio variance.
+
+    Minimizes the strictly convex 0.5 y'Σy - sum(b log y), whose minimizer
+    normalized to sum to one has the target risk contributions, by damped
+    Newton steps that keep y positive.
+    """
+    sigma, _ = _as_arrays(cov)
+    k = len(sigma)
+    b = np.full(k, 1 / k) if budgets is None else np.asarray(budgets, dtype=np.float64)
+    b = b / b.sum()
+    diag = np.diag(sigma).copy()
+    if not (diag > 0).all() or not (b > 0).all():
+        raise ValueError("risk parity needs positive variances and budgets")
+
+    def objective(y):
+        return 0.5 * y @ sigma @ y - b @ np.log(y)
+
+    y = b / np.sqrt(diag)
+    value = objective(y)
+    for _ in range(max_iter):
+        grad = sigma @ y - b / y
+        hessian = sigma.copy()
+        hessian[np.diag_indices(k)] += b / (y * y)
+        step = np.linalg.solve(hessian, grad)
+        decrement = grad @ step
+        if decrement / 2 <= tol:
+            break
+        alpha = 1.0
+        while (y - alpha * step).min() <= 0:
+            alpha /= 2
+        while objective(y - alpha * step) > value - 0.25 * alpha * decrement and alpha > 1e-12:
+            alpha /= 2
+        y = y - alpha * step
+        value = objective(y)
+    return pd.Series(y / y.sum(), index=_tickers(cov))
+
+
+def portfolio_stats(weights, cov, expected_returns, risk_free=0, periods_per_year=252):
+    """Annualized (return, volatility, Sharpe) of a weight vector."""
+    sigma, mu = _as_arrays(cov, expected_returns)
+    w = np.asarray(weights, dtype=np.float64)
+    return tuple(float(v) for v in _annualized(w, sigma, mu, risk_free, periods_per_year))
+
+
+def risk_contributions(weights, cov):
+    """Fraction of portfolio variance contributed by each asset."""
+    sigma, _ = _as_arrays(cov)
+    w = np.asarray(weights, dtype=np.float64)
+    contributions = w * (sigma @ w)
+    return pd.Series(contributions / contributions.sum(), index=_tickers(cov))
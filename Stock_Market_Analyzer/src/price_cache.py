@@ -0,0 +1,189 @@
+"""
+Persistent on-disk OHLCV store used by data_cleaning.load_data.
+
+Each ticker is stored as its own pickled DataFrame (date index, OHLCV columns)
+and a small JSON index records which date range has already been requested
+from the provider for that ticker. On a repeat query only the missing leading
+or trailing dates are fetched and merged in.
+
+A ticker's coverage only grows over a range the provider returned rows for,
+or one it positively reports as having no sessions by listing the ticker in
+the downloaded frame's attrs[NO_SESSIONS]. Any other empty result may be a
+failed download, so that range is requested again next time.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+INDEX_FILE = "_index.json"
+# attrs key of a downloaded frame: tickers known to have no rows in the range
+NO_SESSIONS = "no_sessions"
+
+
+def split_by_ticker(data, tickers):
+    """Split a downloaded frame into a {ticker: OHLCV DataFrame} dictionary."""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in available:
+                frame = data[ticker].dropna(how='all')
+                if not frame.empty:
+                    frames[ticker] = frame
+    elif len(tickers) == 1:
+        frame = data.dropna(how='all')
+        if not frame.empty:
+            frames[tickers[0]] = frame
+    return frames
+
+
+def combine_tickers(frames, tickers):
+    """Inverse of split_by_ticker: build a (ticker, field) MultiIndex frame."""
+    present = [t for t in tickers if t in frames]
+    if not present:
+        return pd.DataFrame()
+    return pd.concat({t: frames[t] for t in present}, axis=1).sort_index()
+
+
+class PriceCache:
+    """
+    Local OHLCV store keyed by ticker and date.
+
+    Args:
+        cache_dir: Directory holding one file per ticker plus the coverage index
+    """
+
+    def __init__(self, cache_dir=".price_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self):
+        path = self.cache_dir / INDEX_FILE
+        if not path.exists():
+            return {}
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        path = self.cache_dir / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as fh:
+            json.dump(self._index, fh, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def _path(self, ticker):
+        safe = "".join(c if c.isalnum() or c in "-._" else "_" for c in ticker)
+        return self.cache_dir / f"{safe}.pkl"
+
+    def coverage(self, ticker):
+        """Return the (start, end) range already requested for ticker, or None."""
+        span = self._index.get(ticker)
+        if span is None:
+            return None
+        return pd.Timestamp(span[0]), pd.Timestamp(span[1])
+
+    def read(self, ticker):
+        """Return the cached frame for ticker (empty if not cached)."""
+        path = self._path(ticker)
+        if not path.exists():
+            return pd.DataFrame()
+        return pd.read_pickle(path)
+
+    def write(self, ticker, frame, start, end):
+        """Merge frame into the store and extend the ticker's coverage."""
+        existing = self.read(ticker)
+        if not existing.empty and not frame.empty:
+            merged = pd.concat([existing, frame])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        elif frame.empty:
+            merged = existing
+        else:
+            merged = frame.sort_index()
+        merged.to_pickle(self._path(ticker))
+
+        span = self.coverage(ticker)
+        if span is not None:
+            start, end = min(start, span[0]), max(end, span[1])
+        self._index[ticker] = [start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")]
+
+    def missing_ranges(self, ticker, start, end):
+        """Date ranges (end exclusive) that still have to be fetched for ticker."""
+        span = self.coverage(ticker)
+        if span is None:
+            return [(start, end)]
+        cov_start, cov_end = span
+        ranges = []
+        if start < cov_start:
+            ranges.append((start, cov_start))
+        if end > cov_end:
+            # Keep the stored range contiguous even if the request starts after it
+            ranges.append((cov_end, end))
+        return ranges
+
+    def get(self, tickers, start_date, end_date, provider):
+        """
+        Return OHLCV data for tickers between start_date and end_date.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Inclusive start date
+            end_date: Exclusive end date (same convention as yfinance)
+            provider: DataProvider used to fetch the missing ranges
+
+        Returns:
+            DataFrame with (ticker, field) MultiIndex columns
+        """
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        # Today's bar may still change, so never mark it as covered
+        covered_end = min(end, pd.Timestamp.today().normalize())
+
+        # Group tickers that need the same range so they share one provider call
+        pending = {}
+        for ticker in tickers:
+            for rng in self.missing_ranges(ticker, start, end):
+                pending.setdefault(rng, []).append(ticker)
+
+        for (rng_start, rng_end), group in pending.items():
+            data = provider.download(group, rng_start.strftime("%Y-%m-%d"), rng_end.strftime("%Y-%m-%d"))
+            fetched = split_by_ticker(data, group)
+            no_sessions = set(data.attrs.get(NO_SESSIONS, ()))
+            for ticker in group:
+                frame = fetched.get(ticker, pd.DataFrame())
+                if frame.empty and ticker not in no_sessions:
+                    # Possibly a failed download: leave the range uncovered
+                    continue
+                self.write(ticker, frame, rng_start, min(rng_end, max(covered_end, rng_start)))
+        if pending:
+            self._write_index()
+        return self.read_range(tickers, start, end)
+
+    def read_range(self, tickers, start_date, end_date):
+        """Read cached data only (no provider calls, no writes), e.g. from worker processes."""
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        frames = {}
+        for ticker in tickers:
+            frame = self.read(ticker)
+            if not frame.empty:
+                frame = frame.loc[(frame.index >= start) & (frame.index < end)]
+            if not frame.empty:
+                frames[ticker] = frame
+        return combine_tickers(frames, tickers)
+
+    def clear(self):
+        """Remove every cached ticker."""
+        for path in self.cache_dir.glob("*.pkl"):
+            path.unlink()
+        self._index = {}
+        self._write_index()
@@ -0,0 +1,209 @@
+"""
+OHLCV bar resampling and bar-size aware annualization.
+
+resample_ohlcv turns minute or tick rows into bars of any size. The rows
+are sorted once, every row gets an integer bar code (a floor division of
+the timestamps for fixed bar sizes, a search in the period edges for
+calendar ones) and each field is aggregated over all of its columns at once
+with ufunc.reduceat on the bar boundaries, so the cost is a few passes over
+the arrays whatever the number of bars. Bars are labelled like
+DataFrame.resample (left edge for fixed sizes, period end for 'W', 'ME',
+'QE', 'YE'), but bars without any rows are left out instead of being
+filled with NaN.
+
+periods_per_year gives the annualization factor of a bar size: trading
+days for daily bars, trading days times session length for intraday bars
+and calendar time for longer ones.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import BusinessDay, Day, Tick
+
+from schema import field_key, split_column
+
+TRADING_DAYS = 252
+# Regular US equity session, 09:30-16:00
+SESSION_HOURS = 6.5
+
+# Aggregation of each field (by field_key); other fields keep their last value
+BAR_AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'adj_close': 'last',
+    'volume': 'sum',
+}
+# Offsets whose bars are closed on the right and labelled with the period end
+END_ANCHORED = ('W', 'ME', 'QE', 'YE', 'BME', 'BQE', 'BYE')
+
+_DAY = pd.Timedelta(days=1)
+_YEAR = pd.Timedelta(days=365.25)
+
+
+def _fixed_step(offset):
+    """Length of a fixed-size bar offset, or None for calendar offsets."""
+    if isinstance(offset, Tick):
+        return pd.Timedelta(offset)
+    if isinstance(offset, Day):
+        return offset.n * _DAY
+    return None
+
+
+def _periods_for_step(step, trading_days, session_hours):
+    if step < _DAY:
+        return trading_days * (pd.Timedelta(hours=session_hours) / step)
+    if step == _DAY:
+        return float(trading_days)
+    return _YEAR / step
+
+
+def periods_per_year(bar, trading_days=TRADING_DAYS, session_hours=SESSION_HOURS):
+    """
+    Number of bars of a given size in one year, for annualizing returns.
+
+    Args:
+        bar: Bar size as a pandas frequency ('1min', 'h', 'D', 'W', 'ME', ...)
+        trading_days: Trading days per year
+        session_hours: Trading hours per day (24 for markets that never close)
+
+    Intraday bars count trading time only ('1min' -> 252 * 390), daily and
+    business-day bars count trading days, and longer bars count calendar
+    time ('W' -> 52.18, 'ME' -> 12).
+    """
+    offset = to_offset(bar)
+    if isinstance(offset, BusinessDay):
+        return trading_days / offset.n
+    step = _fixed_step(offset)
+    if step is not None:
+        return _periods_for_step(step, trading_days, session_hours)
+    # Calendar offsets: average bar count over two centuries
+    edges = pd.date_range("2000-01-01", "2199-12-31", freq=offset)
+    return len(edges) / 200
+
+
+def infer_periods_per_year(index, trading_days=TRADING_DAYS, session_hours=SESSION_HOURS):
+    """
+    periods_per_year of a bar index, from its median spacing (so weekends
+    and overnight gaps do not count). Falls back to trading_days for fewer
+    than two bars.
+    """
+    index = pd.DatetimeIndex(index)
+    if len(index) < 2:
+        return float(trading_days)
+    step = pd.Timedelta(int(np.median(np.diff(index.asi8))), unit=index.unit)
+    if step <= pd.Timedelta(0):
+        return float(trading_days)
+    return _periods_for_step(step, trading_days, session_hours)
+
+
+def _bars(index, offset):
+    """Start row and label of every non-empty bar of a sorted index."""
+    step = _fixed_step(offset)
+    if step is not None:
+        tz = index.tz
+        if isinstance(offset, Day) and tz is not None:
+            # Calendar days follow the wall clock across DST changes
+            index = index.tz_localize(None)
+        # origin='start_day', as in DataFrame.resample
+        origin = index[0].normalize()
+        # Integer arithmetic in the index's own unit, unless the bar is finer
+        if step % pd.Timedelta(1, unit=index.unit):
+            index = index.as_unit('ns')
+        tick = pd.Timedelta(1, unit=index.unit)
+        codes = (index.asi8 - (origin - pd.Timestamp(0, tz=index.tz)) // tick) // (step // tick)
+        starts = _run_starts(codes)
+        labels = origin + pd.to_timedelta(codes[starts] * (step // tick), unit=index.unit)
+        if labels.tz is None and tz is not None:
+            labels = labels.tz_localize(tz, ambiguous=True, nonexistent='shift_forward')
+        return starts, labels
+    days = index.normalize()
+    if offset.rule_code.split('-')[0] in END_ANCHORED:
+        edges = pd.date_range(days[0], days[-1] + offset, freq=offset)
+        codes = edges.searchsorted(days, side='left')
+    else:
+        edges = pd.date_range(offset.rollback(days[0]), days[-1] + offset, freq=offset)
+        codes = edges.searchsorted(days, side='right') - 1
+    starts = _run_starts(codes)
+    return starts, edges[codes[starts]]
+
+
+def _run_starts(codes):
+    """Positions where a run of equal bar codes starts."""
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def _aggregate(values, starts, how):
+    """Aggregate a (rows x columns) array over the bars starting at starts."""
+    floating = values.dtype.kind == 'f'
+    if how == 'max':
+        return (np.fmax if floating else np.maximum).reduceat(values, starts, axis=0)
+    if how == 'min':
+        return (np.fmin if floating else np.minimum).reduceat(values, starts, axis=0)
+    if not floating:
+        if how == 'sum':
+            return np.add.reduceat(values, starts, axis=0)
+        ends = np.append(starts[1:], len(values)) - 1
+        return values[starts if how == 'first' else ends]
+
+    valid = ~np.isnan(values)
+    if how == 'sum':
+        total = np.add.reduceat(np.where(valid, values, 0), starts, axis=0)
+        total[~np.logical_or.reduceat(valid, starts, axis=0)] = np.nan
+        return total
+    # Row of the first / last valid value of every bar and column
+    rows = np.arange(len(values))[:, None]
+    if how == 'first':
+        row = np.minimum.reduceat(np.where(valid, rows, len(values)), starts, axis=0)
+        missing = row == len(values)
+    else:
+        row = np.maximum.reduceat(np.where(valid, rows, -1), starts, axis=0)
+        missing = row < 0
+    result = np.take_along_axis(values, np.clip(row, 0, len(values) - 1), axis=0)
+    result[missing] = np.nan
+    return result
+
+
+def resample_ohlcv(df, bar):
+    """
+    Aggregate OHLCV rows into bars of the given size.
+
+    Args:
+        df: Rows indexed by timestamp, with single-ticker OHLCV columns,
+            "TICKER_Field" columns or (ticker, field) MultiIndex columns
+        bar: Bar size as a pandas frequency ('5min', 'h', 'D', 'W', ...)
+
+    Open takes the first valid value of each bar, High the maximum, Low the
+    minimum, Close and Adj Close the last valid value and Volume the sum
+    (NaN where a column has no data in the bar); other fields keep their
+    last valid value.
+
+    Returns:
+        DataFrame with one row per non-empty bar and the same columns
+    """
+    if df.empty:
+        return df.copy()
+    index = pd.DatetimeIndex(df.index)
+    if not index.is_monotonic_increasing:
+        order = np.argsort(index.asi8, kind='stable')
+        df, index = df.iloc[order], index[order]
+
+    starts, labels = _bars(index, to_offset(bar))
+
+    # Columns that share an aggregation are reduced together, a run of one dtype at a time
+    hows = [BAR_AGGREGATIONS.get(field_key(split_column(c)[1]), 'last') for c in df.columns]
+    dtypes = list(df.dtypes)
+    results = [None] * len(df.columns)
+    groups = {}
+    for i, key in enumerate(zip(hows, dtypes)):
+        groups.setdefault(key, []).append(i)
+    for (how, _), positions in groups.items():
+        block = _aggregate(df.iloc[:, positions].to_numpy(), starts, how)
+        for j, i in enumerate(positions):
+            results[i] = block[:, j]
+
+    bars = pd.DataFrame(dict(enumerate(results)), index=pd.DatetimeIndex(labels, name=df.index.name))
+    bars.columns = df.columns
+    return bars
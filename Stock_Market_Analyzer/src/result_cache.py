@@ -0,0 +1,100 @@
+"""
+In-process result cache with TTL and size-bounded LRU eviction.
+
+Used by app.py to reuse computed prices, metrics and figures across
+Streamlit reruns; it has no Streamlit dependency, so batch jobs and
+notebooks can use the same cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+def make_key(tickers, start_date, end_date, provider="yfinance"):
+    """Normalised cache key for an analysis query."""
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    return (tuple(t.strip().upper() for t in tickers), str(start_date), str(end_date), str(provider))
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache whose entries expire after ttl seconds.
+
+    Args:
+        maxsize: Maximum number of entries kept
+        ttl: Seconds an entry stays valid (None = never expires)
+        clock: Monotonic time function
+    """
+
+    def __init__(self, maxsize=32, ttl=900, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Return the value for key, or default if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries."""
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, func, *args, **kwargs):
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_MISSING = object()
+
+
+def memoize(cache, key_func=None):
+    """
+    Decorator caching a function's results in a ResultCache.
+
+    key_func maps the call arguments to a hashable key; by default the
+    positional and keyword arguments themselves are used.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs) if key_func else (args, tuple(sorted(kwargs.items())))
+            return cache.get_or_compute((func.__qualname__, key), func, *args, **kwargs)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+"""
+Rolling-window risk metrics with O(1) window updates.
+
+Each window keeps a running count, means and co-moments (Welford-style)
+that are updated when an observation enters and when one leaves, so moving
+the window forward costs O(1) per series instead of re-scanning W values.
+NaN returns are skipped; a window yields a value once it holds at least
+min_periods valid observations. All results are aligned to the input index.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _sliding_comoments(x, y, window):
+    """
+    Yield (count, mean_x, mean_y, c_xx, c_yy, c_xy) for every row of x and y.
+
+    x and y are arrays whose rows are broadcast against each other (e.g.
+    (n, k) with (n, k), or (n, k, 1) with (n, 1, k) for pairwise results).
+    Only positions where both x and y are finite are counted.
+    """
+    shape = np.broadcast_shapes(x.shape[1:], y.shape[1:])
+    n = np.zeros(shape)
+    mx = np.zeros(shape)
+    my = np.zeros(shape)
+    cxx = np.zeros(shape)
+    cyy = np.zeros(shape)
+    cxy = np.zeros(shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t in range(x.shape[0]):
+            if t >= window:
+                # Remove the observation leaving the window
+                xo, yo = x[t - window], y[t - window]
+                valid = np.isfinite(xo) & np.isfinite(yo)
+                if valid.any():
+                    n_after = n - valid
+                    dx = np.where(valid, xo - mx, 0.0)
+                    dy = np.where(valid, yo - my, 0.0)
+                    mx_after = np.where(n_after > 0, mx - dx / n_after, 0.0)
+                    my_after = np.where(n_after > 0, my - dy / n_after, 0.0)
+                    cxx -= np.where(valid, dx * (xo - mx_after), 0.0)
+                    cyy -= np.where(valid, dy * (yo - my_after), 0.0)
+                    cxy -= np.where(valid, (xo - mx_after) * dy, 0.0)
+                    empty = n_after == 0
+                    cxx[empty] = cyy[empty] = cxy[empty] = 0.0
+                    n, mx, my = n_after, mx_after, my_after
+
+            # Add the observation entering the window
+            xn, yn = x[t], y[t]
+            valid = np.isfinite(xn) & np.isfinite(yn)
+            if valid.any():
+                n = n + valid
+                dx = np.where(valid, xn - mx, 0.0)
+                dy = np.where(valid, yn - my, 0.0)
+                mx = mx + np.where(valid, dx / n, 0.0)
+                my = my + np.where(valid, dy / n, 0.0)
+                cxx += np.where(valid, dx * (xn - mx), 0.0)
+                cyy += np.where(valid, dy * (yn - my), 0.0)
+                cxy += np.where(valid, dx * (yn - my), 0.0)
+
+            yield n, mx, my, cxx, cyy, cxy
+
+
+def _as_array(returns):
+    return returns.to_numpy(dtype=np.float64)
+
+
+def _min_periods(window, min_periods):
+    return window if min_periods is None else max(int(min_periods), 2)
+
+
+def rolling_mean_std(returns, window, min_periods=None):
+    """
+    Rolling mean and sample standard deviation of each column.
+
+    Returns:
+        (mean, std) DataFrames aligned to returns.index
+    """
+    min_periods = _min_periods(window, min_periods)
+    x = _as_array(returns)
+    mean = np.full(x.shape, np.nan)
+    std = np.full(x.shape, np.nan)
+    for t, (n, mx, _, cxx, _, _) in enumerate(_sliding_comoments(x, x, window)):
+        ok = n >= min_periods
+        mean[t] = np.where(ok, mx, np.nan)
+        std[t] = np.where(ok, np.sqrt(np.maximum(cxx, 0) / np.maximum(n - 1, 1)), np.nan)
+    return (pd.DataFrame(mean, index=returns.index, columns=returns.columns),
+            pd.DataFrame(std, index=returns.index, columns=returns.columns))
+
+
+def rolling_volatility(returns, window=20, min_periods=None, periods_per_year=252):
+    """Rolling annualized volatility (see data_analysis.annualized_volatility)."""
+    _, std = rolling_mean_std(returns, window, min_periods)
+    return std * np.sqrt(periods_per_year)
+
+
+def rolling_sharpe(returns, window=60, risk_free=0, min_periods=None, periods_per_year=252):
+    """Rolling Sharpe ratio (see data_analysis.sharpe_ratio)."""
+    mean, std = rolling_mean_std(returns, window, min_periods)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mean * periods_per_year - risk_free) / (std * np.sqrt(periods_per_year))
+
+
+def rolling_beta(returns, benchmark, window=60, min_periods=None):
+    """
+    Rolling beta of every column against a benchmark return series.
+
+    Only rows where both the ticker and the benchmark have a return are used.
+    """
+    min_periods = _min_periods(window, min_periods)
+    x = _as_array(returns)
+    b = benchmark.reindex(returns.index).to_numpy(dtype=np.float64)[:, None]
+    beta = np.full(x.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t, (n, _, _, _, cbb, cxb) in enumerate(_sliding_comoments(x, b, window)):
+            beta[t] = np.where(n >= min_periods, cxb / cbb, np.nan)
+    return pd.DataFrame(beta, index=returns.index, columns=returns.columns)
+
+
+def rolling_correlation(returns, window=60, other=None, min_periods=None):
+    """
+    Rolling correlation.
+
+    With other=None, returns an (n_dates, k, k) array of pairwise correlations
+    (pairwise-complete within each window). With other given as a Series,
+    returns a DataFrame of each column's correlation with it.
+    """
+    min_periods = _min_periods(window, min_periods)
+    x = _as_array(returns)
+    if other is not None:
+        xs, ys = x, other.reindex(returns.index).to_numpy(dtype=np.float64)[:, None]
+        out = np.full(x.shape, np.nan)
+    else:
+        xs, ys = x[:, :, None], x[:, None, :]
+        out = np.full((x.shape[0], x.shape[1], x.shape[1]), np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for t, (n, _, _, cxx, cyy, cxy) in enumerate(_sliding_comoments(xs, ys, window)):
+            out[t] = np.where(n >= min_periods, cxy / np.sqrt(cxx * cyy), np.nan)
+
+    if other is not None:
+        return pd.DataFrame(out, index=returns.index, columns=returns.columns)
+    return out
@@ -0,0 +1,137 @@
+"""
+Column schema of a wide price frame.
+
+clean_data stores a ColumnSchema in result.attrs['schema']: an exact
+(ticker, field) -> column position map built once from the raw column
+labels. Selecting a field then takes its column positions straight from the
+map, in O(tickers), instead of scanning column names for substrings (which
+confuses tickers such as "A" or "T" with parts of other labels).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Preferred price field first
+CLOSE_FIELDS = ("Adj Close", "Close")
+# Fields of yfinance downloads; a "TICKER_Field" label is split at the
+# longest of these it ends with, so multi-word fields stay whole
+KNOWN_FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume",
+                "Dividends", "Stock Splits", "Capital Gains")
+
+
+def field_key(field):
+    """Normalise a field name: 'Adj Close' -> 'adj_close'."""
+    return str(field).strip().lower().replace(" ", "_")
+
+
+_FIELD_SUFFIXES = sorted({field_key(f) for f in KNOWN_FIELDS}, key=len, reverse=True)
+
+
+def split_column(column):
+    """
+    Split a column label into (ticker, field).
+
+    "TICKER_Field" labels are split before the longest known field they end
+    with ('AAPL_Adj Close' and 'AAPL_adj_close' -> 'AAPL', 'Adj Close' /
+    'adj_close'), and at the last underscore otherwise.
+    """
+    if isinstance(column, tuple):
+        return column[0], column[-1]
+    label = str(column)
+    # Same length as label, unlike field_key (which also strips)
+    key = label.lower().replace(" ", "_")
+    for suffix in _FIELD_SUFFIXES:
+        if key == suffix:
+            return "", label
+        if key.endswith("_" + suffix):
+            return label[:-len(suffix) - 1], label[-len(suffix):]
+    ticker, _, field = label.rpartition("_")
+    return ticker, field
+
+
+class ColumnSchema:
+    """
+    Exact (ticker, field) -> column position map.
+
+    Args:
+        pairs: (ticker, field) of every column, in column order
+        columns: The column labels the pairs were read from
+    """
+
+    def __init__(self, pairs, columns=None):
+        pairs = [(str(t), str(f)) for t, f in pairs]
+        self.columns = pd.Index(columns if columns is not None else [f"{t}_{f}" for t, f in pairs])
+        self.tickers = pd.Index(list(dict.fromkeys(t for t, _ in pairs)))
+        self.fields = list(dict.fromkeys(f for _, f in pairs))
+        self._field_pos = {field_key(f): i for i, f in enumerate(self.fields)}
+
+        # Ticker and field of every column as positions in tickers / fields
+        self.ticker_codes = self.tickers.get_indexer([t for t, _ in pairs])
+        self.field_codes = np.array([self._field_pos[field_key(f)] for _, f in pairs], dtype=np.int64)
+        # positions[field, ticker] = column index, -1 where the pair is absent
+        self.positions = np.full((len(self.fields), len(self.tickers)), -1, dtype=np.int64)
+        self.positions[self.field_codes, self.ticker_codes] = np.arange(len(pairs))
+        if (self.positions >= 0).sum() != len(pairs):
+            raise ValueError("duplicate (ticker, field) columns")
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Schema of (ticker, field) MultiIndex or "TICKER_Field" column labels."""
+        return cls([split_column(c) for c in columns], columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def matches(self, columns):
+        """Whether the schema still describes these column labels."""
+        return len(columns) == len(self.columns) and self.columns.equals(pd.Index(columns))
+
+    def has_field(self, field):
+        return field_key(field) in self._field_pos
+
+    def close_field(self):
+        """Adjusted close if available, otherwise close (None if neither)."""
+        return next((f for f in CLOSE_FIELDS if self.has_field(f)), None)
+
+    def field_positions(self, field):
+        """Column index of the field for every ticker (-1 where missing)."""
+        try:
+            return self.positions[self._field_pos[field_key(field)]]
+        except KeyError:
+            raise KeyError(f"Field {field!r} not in schema (available: {self.fields})") from None
+
+    def column(self, ticker, field):
+        """Column index of one (ticker, field) pair."""
+        code = self.tickers.get_indexer([str(ticker)])[0]
+        position = self.field_positions(field)[code] if code >= 0 else -1
+        if position < 0:
+            raise KeyError(f"No column for ({ticker!r}, {field!r})")
+        return int(position)
+
+    def select(self, df, field):
+        """
+        One field of df as a frame with a column per ticker that has it.
+
+        When the field's columns are one contiguous range (clean_data's
+        compact layout) the result is a view instead of a copy.
+        """
+        positions = self.field_positions(field)
+        present = positions >= 0
+        columns = positions[present]
+        if len(columns) and (np.diff(columns) == 1).all():
+            selected = df.iloc[:, columns[0]:columns[-1] + 1]
+        else:
+            selected = df.iloc[:, columns]
+        selected.columns = self.tickers[present]
+        return selected
+
+
+def get_schema(df):
+    """
+    The schema clean_data stored in df.attrs, or one built from df.columns
+    when it is missing or no longer matches the columns.
+    """
+    schema = df.attrs.get('schema')
+    if isinstance(schema, ColumnSchema) and schema.matches(df.columns):
+        return schema
+    return ColumnSchema.from_columns(df.columns)
@@ -0,0 +1,149 @@
+"""
+Online metric accumulators for live price ticks.
+
+StreamingMetrics turns each incoming price vector into returns and folds
+them into running per-ticker means/variances and a running cross-product
+matrix, so current volatility, Sharpe and correlation are available without
+rebuilding a DataFrame. State can be checkpointed to disk and restored.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _npz_path(path):
+    """path with the .npz suffix np.savez would add."""
+    path = Path(path)
+    return path if path.suffix == '.npz' else path.with_name(path.name + '.npz')
+
+
+class StreamingMetrics:
+    """
+    Incremental returns statistics for a fixed list of tickers.
+
+    Per-ticker mean/variance use every tick where that ticker has a return.
+    The covariance/correlation matrix only uses ticks where every ticker has
+    a return, like correlation_matrix on the output of daily_returns.
+
+    Args:
+        tickers: Ticker symbols, in the order of the price vectors
+        risk_free: Annual risk-free rate for the Sharpe ratio
+        periods_per_year: Ticks per year used for annualization
+    """
+
+    def __init__(self, tickers, risk_free=0, periods_per_year=252):
+        self.tickers = pd.Index(tickers)
+        self.risk_free = risk_free
+        self.periods_per_year = periods_per_year
+        k = len(self.tickers)
+
+        self.last_timestamp = None
+        self.last_prices = np.full(k, np.nan)
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.joint_count = 0
+        self.joint_mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def _as_vector(self, prices):
+        if isinstance(prices, dict):
+            prices = pd.Series(prices)
+        if isinstance(prices, pd.Series):
+            return prices.reindex(self.tickers).to_numpy(dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape != self.last_prices.shape:
+            raise ValueError(f"Expected {len(self.tickers)} prices, got shape {prices.shape}")
+        return prices
+
+    def update(self, timestamp, prices):
+        """
+        Fold one price vector into the statistics.
+
+        Args:
+            timestamp: Time of the tick; must be later than the previous one
+            prices: Array aligned with tickers, or a Series/dict keyed by ticker.
+                Missing prices (NaN) keep the ticker's last known price.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            raise ValueError(f"Tick at {timestamp} is not after {self.last_timestamp}")
+        prices = self._as_vector(prices)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = prices / self.last_prices - 1
+        valid = np.isfinite(returns)
+
+        if valid.any():
+            self.count += valid
+            delta = np.where(valid, returns - self.mean, 0.0)
+            self.mean += np.where(valid, delta / np.maximum(self.count, 1), 0.0)
+            self.m2 += np.where(valid, delta * (returns - self.mean), 0.0)
+
+        if valid.all():
+            self.joint_count += 1
+            delta = returns - self.joint_mean
+            self.joint_mean += delta / self.joint_count
+            self.comoment += np.outer(delta, returns - self.joint_mean)
+
+        self.last_prices = np.where(np.isfinite(prices), prices, self.last_prices)
+        self.last_timestamp = timestamp
+        return self
+
+    def volatility(self):
+        """Current annualized volatility per ticker."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+        return pd.Series(np.sqrt(var * self.periods_per_year), index=self.tickers)
+
+    def sharpe(self):
+        """Current Sharpe ratio per ticker."""
+        mean = np.where(self.count > 0, self.mean, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = (mean * self.periods_per_year - self.risk_free) / self.volatility().to_numpy()
+        return pd.Series(sharpe, index=self.tickers)
+
+    def covariance(self):
+        """Current covariance matrix of returns."""
+        if self.joint_count < 2:
+            cov = np.full(self.comoment.shape, np.nan)
+        else:
+            cov = self.comoment / (self.joint_count - 1)
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def correlation(self):
+        """Current correlation matrix of returns."""
+        cov = self.covariance().to_numpy()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+
+    def checkpoint(self, path):
+        """Write the accumulator state to an .npz file (the suffix is added if missing)."""
+        meta = {
+            'tickers': [str(t) for t in self.tickers],
+            'risk_free': self.risk_free,
+            'periods_per_year': self.periods_per_year,
+            'last_timestamp': None if self.last_timestamp is None else self.last_timestamp.isoformat(),
+            'joint_count': self.joint_count,
+        }
+        np.savez(_npz_path(path), meta=np.array(json.dumps(meta)), last_prices=self.last_prices,
+                 count=self.count, mean=self.mean, m2=self.m2,
+                 joint_mean=self.joint_mean, comoment=self.comoment)
+
+    @classmethod
+    def restore(cls, path):
+        """Rebuild an accumulator from a file written by checkpoint(), given the same path."""
+        with np.load(_npz_path(path), allow_pickle=False) as state:
+            meta = json.loads(str(state['meta']))
+            metrics = cls(meta['tickers'], meta['risk_free'], meta['periods_per_year'])
+            for name in ('last_prices', 'count', 'mean', 'm2', 'joint_mean', 'comoment'):
+                setattr(metrics, name, state[name].copy())
+        metrics.joint_count = meta['joint_count']
+        if meta['last_timestamp'] is not None:
+            metrics.last_timestamp = pd.Timestamp(meta['last_timestamp'])
+        return metrics
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from backtest import Strategies, run_backtest, strategy_grid
+
+
+def prices(n_days=300, n_tickers=8, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 50 * np.cumprod(1 + rng.normal(0.0003, 0.015, (n_days, n_tickers)), axis=0)
+    values[:40, 3] = np.nan  # listed later
+    return pd.DataFrame(values, index=pd.bdate_range("2020-01-01", periods=n_days),
+                        columns=[f"T{i}" for i in range(n_tickers)])
+
+
+def reference(frame, start, period, threshold, lookback, top_k, cost):
+    """One variant at a time, tracking dollar holdings."""
+    values = frame.to_numpy()
+    tradable = np.isfinite(values)
+
+    def target(day):
+        if lookback:
+            score = np.where(tradable[day] & tradable[day - lookback],
+                             values[day] / values[day - lookback] - 1, -np.inf)
+            order = np.argsort(-score, kind='stable')[:top_k]
+            w = np.zeros(len(score))
+            w[order[np.isfinite(score[order])]] = 1
+        else:
+            w = tradable[day].astype(float)
+        return w / w.sum()
+
+    goal = target(start)
+    holdings = goal.copy()
+    out = []
+    for day in range(start + 1, len(values)):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.nan_to_num(values[day] / values[day - 1] - 1, nan=0.0, posinf=0.0)
+        before = holdings.sum()
+        holdings = holdings * (1 + r)
+        value = holdings.sum()
+        weights = holdings / value
+        due = (period and (day - start) % period == 0) or np.abs(weights - goal).max() > threshold
+        if due:
+            goal = target(day)
+            value *= 1 - cost * np.abs(goal - weights).sum()
+            holdings = goal * value
+        out.append(value / before - 1)
+    return np.array(out)
+
+
+def test_matches_single_variant_reference():
+    frame = prices()
+    strategies = strategy_grid(periods=(0, 21), thresholds=(np.inf, 0.05), lookbacks=(0, 20), top_ks=(3,),
+                               costs=(0.0, 0.001))
+    result = run_backtest(frame, strategies, batch_size=5)
+    start = int(strategies.lookback.max())
+    for j, name in enumerate(strategies.names):
+        # Every variant starts at the longest lookback
+        expected = reference(frame, start, strategies.period[j], strategies.threshold[j],
+                             strategies.lookback[j], strategies.top_k[j], strategies.cost[j])
+        np.testing.assert_allclose(result.returns[name], expected, atol=1e-12, err_msg=name)
+
+
+def test_buy_and_hold_equity():
+    frame = prices().iloc[40:]
+    result = run_backtest(frame, Strategies())
+    growth = (frame / frame.iloc[0]).mean(axis=1).iloc[1:]
+    np.testing.assert_allclose(result.equity().iloc[:, 0], growth, rtol=1e-12)
+    assert result.rebalances.iloc[0] == 0 and result.turnover.iloc[0] == 0
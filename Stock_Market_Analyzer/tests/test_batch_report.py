@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from batch_report import basket_dirname, main, read_baskets
+from data_providers import LocalFileProvider
+
+
+def test_empty_baskets_files(tmp_path):
+    for name in ("baskets.csv", "baskets.json"):
+        (tmp_path / name).write_text("")
+        assert read_baskets(tmp_path / name) == []
+    (tmp_path / "header.csv").write_text("name,tickers,start,end\n")
+    assert read_baskets(tmp_path / "header.csv") == []
+
+
+def test_blank_cells_are_skipped_or_defaulted(tmp_path, capsys):
+    path = tmp_path / "baskets.csv"
+    path.write_text("name,tickers,start,end\n"
+                    ",AAPL MSFT,2024-01-01,2024-02-01\n"
+                    "no_tickers,,2024-01-01,2024-02-01\n"
+                    "no_start,AAPL,,2024-02-01\n"
+                    "bad_end,AAPL,2024-01-01,someday\n"
+                    "ok,\"goog, t\",2024-01-01,2024-02-01\n")
+    baskets = read_baskets(path)
+    assert baskets == [
+        {"name": "basket_0", "tickers": ["AAPL", "MSFT"], "start": "2024-01-01", "end": "2024-02-01"},
+        {"name": "ok", "tickers": ["GOOG", "T"], "start": "2024-01-01", "end": "2024-02-01"},
+    ]
+    warnings = capsys.readouterr().err
+    assert "no_tickers" in warnings and "no_start" in warnings and "bad_end" in warnings
+    assert "nan" not in json.dumps(baskets)
+
+
+def test_json_nulls(tmp_path):
+    path = tmp_path / "baskets.json"
+    path.write_text(json.dumps([{"name": None, "tickers": ["aapl"], "start": "2024-01-01", "end": "2024-02-01"},
+                                {"name": "x", "tickers": None, "start": "2024-01-01", "end": "2024-02-01"}]))
+    assert [b["name"] for b in read_baskets(path)] == ["basket_0"]
+
+
+def test_basket_dirname():
+    taken = set()
+    assert [basket_dirname(n, taken) for n in ["../evil", "x", "X", ".."]] == ["_evil", "x", "X_2", "basket"]
+
+
+def test_main_writes_reports(tmp_path):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2024-01-01", periods=60, name="Date")
+    provider = LocalFileProvider(tmp_path / "prices")
+    for ticker in ("AAA", "BBB", "CCC"):
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, len(index)))
+        provider.write(ticker, pd.DataFrame({"Close": close, "Adj Close": close, "Volume": 1000.0}, index=index))
+    baskets = tmp_path / "baskets.csv"
+    baskets.write_text("name,tickers,start,end\none,AAA BBB,2024-01-01,2024-04-01\n"
+                       "two,BBB CCC,2024-01-01,2024-04-01\nempty,,2024-01-01,2024-04-01\n")
+
+    output = tmp_path / "reports"
+    status = main([str(baskets), "--output", str(output), "--workers", "1",
+                   "--cache-dir", str(tmp_path / "cache"), "--provider", str(tmp_path / "prices")])
+    assert status == 0
+    summary = pd.read_csv(output / "summary.csv")
+    assert list(summary["name"]) == ["one", "two"] and summary["ok"].all()
+    metrics = pd.read_csv(output / "one" / "metrics.csv", index_col=0)
+    assert list(metrics.index) == ["AAA", "BBB"]
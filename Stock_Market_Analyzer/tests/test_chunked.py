@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked import (ChunkCleaner, ReturnMoments, chunked_metrics, iter_frame_chunks,
+                     iter_provider_chunks)
+from data_analysis import compute_all_metrics
+from data_cleaning import clean_data
+from data_providers import LocalFileProvider
+from schema import get_schema
+from synthetic import synthetic_ohlcv
+
+
+def in_memory(raw, **clean_kwargs):
+    cleaned = clean_data(raw, **clean_kwargs)
+    schema = get_schema(cleaned)
+    return cleaned, compute_all_metrics(schema.select(cleaned, schema.close_field()))
+
+
+@pytest.mark.parametrize("clean_kwargs", [
+    {},
+    {"max_ffill": 2, "listing_starts": "infer", "gap_policy": "listed"},
+    {"max_ffill": 4, "gap_policy": "keep", "dtype_policy": "compact"},
+])
+def test_chunk_cleaner_matches_clean_data(clean_kwargs):
+    raw = synthetic_ohlcv(40, 500, seed=11, late_listing=0.2, gaps=0.003)
+    cleaner = ChunkCleaner(**clean_kwargs)
+    chunked = pd.concat([cleaner.clean(chunk) for chunk in iter_frame_chunks(raw, 37)])
+    expected = clean_data(raw, **clean_kwargs)
+    pd.testing.assert_frame_equal(chunked, expected, check_freq=False)
+    assert cleaner.report == expected.attrs['cleaning_report']
+
+
+def test_chunked_metrics_match_compute_all_metrics():
+    raw = synthetic_ohlcv(30, 600, seed=12, late_listing=0.05)
+    cleaned, expected = in_memory(raw, max_ffill=3)
+    result, report = chunked_metrics(iter_frame_chunks(raw, 50), max_ffill=3)
+    assert report == cleaned.attrs['cleaning_report']
+    for name in ("mean", "std", "volatility", "sharpe", "max_drawdown"):
+        pd.testing.assert_series_equal(getattr(result, name), getattr(expected, name), rtol=1e-9)
+    for name in ("covariance", "correlation"):
+        pd.testing.assert_frame_equal(getattr(result, name), getattr(expected, name), rtol=1e-9)
+    pd.testing.assert_frame_equal(result.cumulative_returns, expected.cumulative_returns.iloc[[-1]],
+                                  check_freq=False)
+    assert result.daily_returns is None
+
+
+def test_provider_chunks_match_load_data(tmp_path):
+    raw = synthetic_ohlcv(6, 400, seed=13, late_listing=0.3, start="2020-01-01")
+    provider = LocalFileProvider(tmp_path)
+    for ticker in raw.columns.get_level_values(0).unique():
+        frame = raw[ticker].dropna(how="all")
+        frame.index.name = "Date"
+        provider.write(ticker, frame)
+    tickers = list(raw.columns.get_level_values(0).unique())
+
+    chunks = list(iter_provider_chunks(tmp_path, tickers, "2020-01-01", "2021-08-01", window="90D"))
+    assert all(c.columns.equals(chunks[0].columns) for c in chunks)
+    whole = provider.download(tickers, "2020-01-01", "2021-08-01").reindex(columns=chunks[0].columns)
+    pd.testing.assert_frame_equal(pd.concat(chunks), whole, check_freq=False)
+
+    result, _ = chunked_metrics(iter_provider_chunks(tmp_path, tickers, "2020-01-01", "2021-08-01",
+                                                     window="90D"))
+    _, expected = in_memory(whole)
+    pd.testing.assert_series_equal(result.volatility, expected.volatility, rtol=1e-9)
+    pd.testing.assert_frame_equal(result.correlation, expected.correlation, rtol=1e-9)
+
+
+def test_return_moments_merge():
+    values = np.random.default_rng(0).normal(size=(100, 4))
+    merged = ReturnMoments(4)
+    for part in np.array_split(values, [10, 11, 60]):
+        merged.merge(ReturnMoments.from_returns(part))
+    assert merged.count == 100
+    np.testing.assert_allclose(merged.mean, values.mean(axis=0))
+    np.testing.assert_allclose(merged.covariance(), np.cov(values.T))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation_engine import blocked_correlation, correlation_summary, summarize_correlation_matrix
+from synthetic import factor_returns
+
+
+def returns(n_days=300, n_tickers=40, seed=0):
+    data = factor_returns(n_days, n_tickers, rng=seed)
+    return pd.DataFrame(data, columns=[f"T{i:02d}" for i in range(n_tickers)])
+
+
+def staggered(df, seed=0):
+    """Late listings, a delisting and scattered missing days."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    for i, start in enumerate(rng.integers(0, len(df) // 2, 10)):
+        df.iloc[:start, i] = np.nan
+    df.iloc[len(df) - 40:, 12] = np.nan
+    df[rng.random(df.shape) < 0.02] = np.nan
+    # A ticker with a single return and one that never moves
+    df.iloc[:-1, 20] = np.nan
+    df.iloc[:, 21] = 0.001
+    return df
+
+
+@pytest.mark.parametrize("gappy", [False, True])
+@pytest.mark.parametrize("block_size", [7, 512])
+def test_blocked_correlation_matches_dataframe_corr(gappy, block_size):
+    df = staggered(returns()) if gappy else returns()
+    pd.testing.assert_frame_equal(blocked_correlation(df, block_size=block_size), df.corr(), atol=1e-12)
+
+
+@pytest.mark.parametrize("gappy", [False, True])
+def test_summary_matches_summary_of_full_matrix(gappy):
+    df = staggered(returns(seed=1)) if gappy else returns(seed=1)
+    result = correlation_summary(df, top_k=5, block_size=8)
+    expected = summarize_correlation_matrix(df.corr(), top_k=5)
+    assert result.n_pairs == expected.n_pairs
+    assert result.average == pytest.approx(expected.average, abs=1e-12)
+    for got, want in ((result.most_correlated, expected.most_correlated),
+                      (result.least_correlated, expected.least_correlated)):
+        assert [p[:2] for p in got] == [p[:2] for p in want]
+        np.testing.assert_allclose([p[2] for p in got], [p[2] for p in want], atol=1e-12)
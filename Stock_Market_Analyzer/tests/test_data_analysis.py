@@ -0,0 +1,83 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analysis import (annualized_volatility, compute_all_metrics, correlation_matrix, cumulative_returns,
+                           daily_returns, max_drawdown, risk_metrics, sharpe_ratio)
+from synthetic import factor_returns
+
+
+def prices(n_days=500, n_tickers=25, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 50 * np.exp(np.cumsum(factor_returns(n_days, n_tickers, rng=rng), axis=0))
+    columns = [f"T{i}" for i in range(n_tickers)]
+    return pd.DataFrame(values, index=pd.bdate_range("2020-01-01", periods=n_days), columns=columns)
+
+
+@pytest.mark.parametrize("risk_free", [0, 0.02])
+def test_matches_chained_functions(risk_free):
+    frame = prices()
+    frame.iloc[100, 3] = frame.iloc[99, 3] * 0  # a zero price gives an infinite return next day
+    returns = daily_returns(frame)
+    volatility = annualized_volatility(returns)
+    result = compute_all_metrics(frame, risk_free=risk_free)
+
+    pd.testing.assert_frame_equal(result.daily_returns, returns, check_freq=False)
+    pd.testing.assert_frame_equal(result.cumulative_returns, cumulative_returns(frame))
+    pd.testing.assert_series_equal(result.volatility, volatility)
+    pd.testing.assert_series_equal(result.sharpe, sharpe_ratio(returns, volatility, risk_free=risk_free))
+    pd.testing.assert_frame_equal(result.correlation, correlation_matrix(returns))
+    pd.testing.assert_frame_equal(result.covariance, returns.cov())
+
+
+def test_float32_prices_accumulate_in_float64():
+    frame = prices(seed=1)
+    full = compute_all_metrics(frame)
+    compact = compute_all_metrics(frame.astype(np.float32))
+    assert compact.daily_returns.dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(compact.volatility, full.volatility, rtol=1e-5)
+    np.testing.assert_allclose(compact.correlation, full.correlation, atol=1e-5)
+
+
+def test_empty_prices():
+    assert compute_all_metrics(pd.DataFrame()) is None
+
+
+def naive_max_drawdown(returns):
+    growth = (1 + returns.fillna(0)).cumprod()
+    peak = growth.cummax().clip(lower=1)
+    return (growth / peak).min() - 1
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+def test_risk_metrics_match_pandas(gaps):
+    returns = compute_all_metrics(prices(seed=2)).daily_returns
+    if gaps:
+        returns = returns.copy()
+        returns.iloc[::17, 2] = np.nan
+    table = risk_metrics(returns, benchmark=returns.mean(axis=1), confidence=0.95)
+
+    pd.testing.assert_series_equal(table['max_drawdown'], naive_max_drawdown(returns), check_names=False)
+    pd.testing.assert_series_equal(max_drawdown(returns), naive_max_drawdown(returns))
+
+    downside = np.sqrt((returns.clip(upper=0) ** 2).mean() * 252)
+    pd.testing.assert_series_equal(table['sortino'], returns.mean() * 252 / downside, check_names=False)
+
+    quantile = returns.quantile(0.05)
+    pd.testing.assert_series_equal(table['var_historical'], -quantile, check_names=False)
+    parametric = -(returns.mean() + NormalDist().inv_cdf(0.05) * returns.std())
+    pd.testing.assert_series_equal(table['var_parametric'], parametric, check_names=False)
+    cvar = pd.Series({c: -returns[c][returns[c] <= quantile[c]].mean() for c in returns})
+    pd.testing.assert_series_equal(table['cvar'], cvar, check_names=False)
+
+    bench = returns.mean(axis=1)
+    expected_beta = pd.Series({c: returns[c].cov(bench) / bench[returns[c].notna()].var() for c in returns})
+    pd.testing.assert_series_equal(table['beta'], expected_beta, check_names=False)
+
+
+def test_compute_all_metrics_max_drawdown():
+    frame = prices(seed=3)
+    result = compute_all_metrics(frame)
+    pd.testing.assert_series_equal(result.max_drawdown, naive_max_drawdown(result.daily_returns))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analysis import compute_all_metrics
+from data_cleaning import CLEAN_BLOCK_SIZE, apply_dtype_policy, clean_data
+from instrumentation import data_nbytes
+from schema import CLOSE_FIELDS, get_schema
+from synthetic import synthetic_ohlcv
+
+
+def flattened(raw):
+    flat = raw.copy()
+    flat.columns = ['_'.join(col).strip() for col in raw.columns.values]
+    return flat
+
+
+@pytest.mark.parametrize("n_tickers", [20, CLEAN_BLOCK_SIZE // 2])
+def test_defaults_match_dropna_ffill_dropna(n_tickers):
+    raw = synthetic_ohlcv(n_tickers, 300, seed=3, late_listing=0.02)
+    raw.iloc[5] = np.nan
+    expected = flattened(raw).dropna(how='all').ffill().dropna()
+    result = clean_data(raw)
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+    assert result.attrs['cleaning_report']['rows_dropped_empty'] == 1
+
+
+def test_max_ffill_and_listed_policy():
+    raw = synthetic_ohlcv(30, 400, seed=4, late_listing=0.3)
+    flat = flattened(raw)
+    result = clean_data(raw, max_ffill=3, listing_starts='infer', gap_policy='keep')
+    # Leading NaNs (before a ticker's first observation) stay missing, as with ffill
+    expected = flat.dropna(how='all').ffill(limit=3)
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+    report = result.attrs['cleaning_report']
+    assert report['cells_forward_filled'] == int(expected.notna().sum().sum() - flat.notna().sum().sum())
+    assert report['cells_pre_listing'] == int(flat.where(flat.ffill().isna(), 0).isna().sum().sum())
+
+    listed = clean_data(raw, max_ffill=3, listing_starts='infer', gap_policy='listed')
+    # Late listings no longer cut the history of every other ticker
+    assert len(listed) > len(clean_data(raw, max_ffill=3))
+    first = flat.apply(pd.Series.first_valid_index)
+    after_listing = listed.apply(lambda c: c.loc[first[c.name]:].notna().all())
+    assert after_listing.all()
+
+
+def test_calendar_alignment():
+    raw = synthetic_ohlcv(5, 30, seed=5, missing_cells=0, gaps=0, late_listing=0)
+    calendar = pd.bdate_range(raw.index[0], raw.index[-1] + pd.offsets.BDay(2))
+    result = clean_data(raw.drop(index=raw.index[10]), calendar=calendar, gap_policy='keep')
+    pd.testing.assert_index_equal(result.index, calendar)
+    np.testing.assert_array_equal(result.iloc[10], result.iloc[9])
+    report = result.attrs['cleaning_report']
+    assert report['rows_added_calendar'] == 3
+
+
+def test_apply_dtype_policy():
+    raw = synthetic_ohlcv(10, 50, seed=6)
+    assert apply_dtype_policy(raw, None, 'full') is raw
+    reduced = apply_dtype_policy(raw, ["Close", "Volume"], 'compact')
+    # Grouped field by field: every Close column, then every Volume column
+    assert list(reduced.columns.get_level_values(1)) == ["Close"] * 10 + ["Volume"] * 10
+    assert (reduced.dtypes.iloc[:10] == np.float32).all() and (reduced.dtypes.iloc[10:] == np.float64).all()
+    np.testing.assert_array_equal(reduced.xs("Close", axis=1, level=1),
+                                  raw.xs("Close", axis=1, level=1).astype(np.float32))
+    with pytest.raises(ValueError):
+        apply_dtype_policy(raw, None, 'tiny')
+
+
+def test_compact_policy_matches_full():
+    raw = synthetic_ohlcv(CLEAN_BLOCK_SIZE + 20, 300, seed=7, late_listing=0.02)
+    full = clean_data(raw, max_ffill=5)
+    compact = clean_data(raw, max_ffill=5, dtype_policy='compact')
+    pd.testing.assert_index_equal(compact.index, full.index)
+    assert compact.attrs['cleaning_report'] == full.attrs['cleaning_report']
+
+    schema = get_schema(compact)
+    assert set(schema.fields) == set(get_schema(full).fields)
+    for field in schema.fields:
+        block = schema.select(compact, field)
+        expected = get_schema(full).select(full, field)
+        if field == "Volume":
+            assert (block.dtypes == np.int64).all()
+            np.testing.assert_array_equal(block, expected.fillna(0).round().astype(np.int64))
+        else:
+            assert (block.dtypes == np.float32).all()
+            np.testing.assert_allclose(block, expected, rtol=1e-6)
+        # Fields are grouped, so each one is a contiguous range of columns
+        assert (np.diff(schema.field_positions(field)) == 1).all()
+
+    assert data_nbytes(compact) < data_nbytes(full) * 0.6
+    close = schema.close_field()
+    metrics = compute_all_metrics(schema.select(compact, close))
+    reference = compute_all_metrics(get_schema(full).select(full, close))
+    np.testing.assert_allclose(metrics.volatility, reference.volatility, rtol=1e-4)
+    np.testing.assert_allclose(metrics.correlation, reference.correlation, atol=1e-4)
+
+
+def test_compact_close_fields_only():
+    raw = synthetic_ohlcv(15, 120, seed=8)
+    compact = clean_data(raw, fields=CLOSE_FIELDS, dtype_policy='compact')
+    assert sorted(get_schema(compact).fields) == ["Adj Close", "Close"]
+    assert (compact.dtypes == np.float32).all()
+    expected = clean_data(raw, fields=CLOSE_FIELDS)
+    np.testing.assert_allclose(compact[expected.columns], expected, rtol=1e-6)
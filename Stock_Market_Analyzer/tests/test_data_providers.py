@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import load_data
+from data_providers import LocalFileProvider, YFinanceProvider, get_provider
+
+
+def daily(seed, periods=100):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2024-01-01", periods=periods, name="Date")
+    close = 100 + rng.normal(0, 1, periods).cumsum()
+    return pd.DataFrame({"Open": close + 0.5, "Close": close, "Volume": rng.integers(1, 1000, periods)},
+                        index=index)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv", "npy"])
+def test_reads_only_the_window_and_fields(tmp_path, fmt):
+    frame = daily(0)
+    LocalFileProvider(tmp_path).write("AAA", frame, fmt=fmt)
+    provider = LocalFileProvider(tmp_path, fields=["Close"], fmt=fmt)
+    window = provider.read("AAA", "2024-02-01", "2024-03-01")
+    expected = frame.loc["2024-02-01":"2024-02-29", ["Close"]]
+    pd.testing.assert_frame_equal(window, expected, check_freq=False)
+
+
+def test_download_matches_provider_layout(tmp_path):
+    provider = LocalFileProvider(tmp_path)
+    provider.write("AAA", daily(1))
+    provider.write("BBB", daily(2))
+    data = provider.download(["AAA", "BBB", "CCC"], "2024-01-01", "2024-02-01")
+    assert list(data.columns.get_level_values(0).unique()) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(data["BBB"], daily(2).loc[:"2024-01-31"], check_freq=False)
+
+
+def test_load_data_from_directory(tmp_path):
+    LocalFileProvider(tmp_path).write("AAA", daily(3))
+    LocalFileProvider(tmp_path).write("BBB", daily(4))
+    data = load_data(["AAA", "BBB"], "2024-01-01", "2024-02-01", provider=str(tmp_path))
+    np.testing.assert_array_equal(data[("AAA", "Close")], daily(3).loc[:"2024-01-31", "Close"])
+
+
+def test_get_provider():
+    assert isinstance(get_provider(), YFinanceProvider)
+    provider = LocalFileProvider(".")
+    assert get_provider(provider) is provider
+    with pytest.raises(ValueError):
+        get_provider("no-such-provider")
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from data_providers import DataProvider
+from download_scheduler import DownloadScheduler
+from price_cache import NO_SESSIONS, PriceCache
+
+INDEX = pd.bdate_range("2024-01-01", periods=5, name="Date")
+
+
+class StubProvider(DataProvider):
+    """
+    Serves a few rows per ticker without ever raising, like yfinance: tickers
+    in drop are left out (or all-NaN) for their first `drop[t]` calls, tickers
+    in empty are reported as having no sessions. With error set every call
+    raises instead.
+    """
+
+    name = "stub"
+
+    def __init__(self, drop=None, empty=(), error=None, all_nan=False):
+        self.drop = dict(drop or {})
+        self.empty = set(empty)
+        self.error = error
+        self.all_nan = all_nan
+        self.calls = []
+
+    def download(self, tickers, start_date, end_date):
+        self.calls.append(list(tickers))
+        if self.error:
+            raise self.error
+        frames = {}
+        for t in tickers:
+            if t in self.empty:
+                continue
+            value = np.nan if self.drop.get(t, 0) > 0 else 1.0
+            self.drop[t] = self.drop.get(t, 0) - 1
+            if np.isnan(value) and not self.all_nan:
+                continue
+            frames[t] = pd.DataFrame({"Close": value, "Volume": value}, index=INDEX)
+        data = pd.concat(frames, axis=1) if frames else pd.DataFrame()
+        data.attrs[NO_SESSIONS] = sorted(self.empty & set(tickers))
+        return data
+
+
+def scheduler(provider, sleeps):
+    return DownloadScheduler(provider, batch_size=2, max_workers=1, rate_limit=None, sleep=sleeps.append)
+
+
+def test_missing_tickers_are_retried():
+    provider, sleeps = StubProvider(drop={"B": 2}), []
+    sched = scheduler(provider, sleeps)
+    data = sched.download(["A", "B", "C"], "2024-01-01", "2024-01-08")
+    assert provider.calls == [["A", "B"], ["B"], ["B"], ["C"]]
+    assert sleeps == [1.0, 2.0]
+    assert list(data.columns.get_level_values(0).unique()) == ["A", "B", "C"]
+    assert sched.failures == {}
+
+
+def test_all_nan_tickers_are_retried_then_recorded():
+    provider, sleeps = StubProvider(drop={"A": 10}, all_nan=True), []
+    sched = scheduler(provider, sleeps)
+    data = sched.download(["A", "B"], "2024-01-01", "2024-01-08")
+    assert provider.calls == [["A", "B"]] + [["A"]] * sched.max_retries
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert sched.failures == {"A": "no data returned"}
+    assert list(data.columns.get_level_values(0).unique()) == ["B"]
+
+
+def test_reported_empty_range_is_not_retried():
+    provider, sleeps = StubProvider(empty={"A", "B", "C"}), []
+    sched = scheduler(provider, sleeps)
+    data = sched.download(["A", "B", "C"], "2024-01-06", "2024-01-08")
+    assert data.empty and data.attrs[NO_SESSIONS] == ["A", "B", "C"]
+    assert len(provider.calls) == 2
+    assert sleeps == []
+    assert sched.failures == {}
+
+
+def test_exceptions_are_retried_then_recorded():
+    provider, sleeps = StubProvider(error=ConnectionError("down")), []
+    sched = scheduler(provider, sleeps)
+    sched.download(["A", "B", "C"], "2024-01-06", "2024-01-08")
+    assert len(provider.calls) == 2 * (sched.max_retries + 1)
+    assert sleeps == [1.0, 2.0, 4.0] * 2
+    assert sched.failures == {t: "ConnectionError: down" for t in "ABC"}
+
+
+def test_cache_skips_failed_tickers(tmp_path):
+    provider, sleeps = StubProvider(drop={"A": 10}, empty={"C"}), []
+    cache = PriceCache(tmp_path)
+    cache.get(["A", "B", "C"], "2024-01-01", "2024-01-08", scheduler(provider, sleeps))
+    assert cache.coverage("A") is None
+    assert cache.coverage("B") == cache.coverage("C") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-08"))
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from features import FeatureEngineer
+
+TOPIC_COLUMNS = ['LDA_00', 'LDA_01', 'LDA_02', 'LDA_03', 'LDA_04']
+COUNT_COLUMNS = ['n_tokens_content', 'num_hrefs', 'num_self_hrefs', 'num_imgs', 'num_videos', 'shares']
+VALUE_COLUMNS = ['kw_avg_avg', 'kw_min_avg', 'kw_max_avg', 'max_positive_polarity', 'min_negative_polarity']
+
+
+def articles(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {c: rng.integers(0, 50, n) for c in COUNT_COLUMNS}
+    columns.update({c: rng.random(n) for c in VALUE_COLUMNS})
+    columns.update(zip(TOPIC_COLUMNS, rng.random((n, len(TOPIC_COLUMNS))).T))
+    df = pd.DataFrame(columns)
+    df['min_negative_polarity'] *= -1
+    df['url'] = [f"https://example.com/{i}" for i in range(n)]
+    return df
+
+
+def test_dominant_topic_matches_idxmax():
+    df = articles()
+    # Missing topic weights are skipped, as by idxmax
+    df.loc[0, 'LDA_00'] = np.nan
+    df.loc[1, ['LDA_01', 'LDA_03']] = np.nan
+    expected = df[TOPIC_COLUMNS].idxmax(axis=1).str.replace('LDA_', '').astype(int)
+    result = FeatureEngineer().create_features(df)
+    pd.testing.assert_series_equal(result['dominant_topic'], expected, check_names=False)
+
+
+def test_row_without_topic_weights():
+    df = articles(n=5)
+    df.loc[2, TOPIC_COLUMNS] = np.nan
+    dominant = FeatureEngineer().create_features(df)['dominant_topic']
+    assert dominant[2] == -1 and (dominant.drop(2) >= 0).all()
+    assert dominant.dtype == np.int64
+
+
+def test_dtypes_and_pass_through_columns():
+    df = articles()
+    engineer = FeatureEngineer()
+    result = engineer.clean_features(engineer.create_features(df))
+    # Non-numeric and integer columns are kept as they are
+    pd.testing.assert_series_equal(result['url'], df['url'])
+    assert result['shares'].dtype == df['shares'].dtype
+    assert result['has_media'].dtype == int and result['media_count'].dtype == df['num_imgs'].dtype
+    assert 'num_imgs' not in result.columns and 'LDA_02' not in result.columns
+    assert list(df.columns) == COUNT_COLUMNS + VALUE_COLUMNS + TOPIC_COLUMNS + ['url']
@@ -0,0 +1,116 @@
+import threading
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analysis import compute_all_metrics
+from instrumentation import NULL_TRACER, Tracer, data_nbytes
+
+
+def allocate(n_bytes):
+    return np.ones(n_bytes // 8)
+
+
+def test_nested_stages_record_their_peaks():
+    tracer = Tracer("test")
+    with tracer.stage("outer"):
+        with tracer.stage("inner") as inner:
+            inner.record_shape(allocate(8_000_000))
+        del inner
+        with tracer.stage("small"):
+            allocate(80_000)
+    outer, inner, small = tracer.records
+    assert (outer.depth, inner.depth, small.depth) == (0, 1, 1)
+    assert inner.peak_bytes >= 8_000_000 and (inner.rows, inner.cols) == (1_000_000, 1)
+    assert small.peak_bytes < 1_000_000
+    # The outer stage keeps the inner peak although it was reset in between
+    assert outer.peak_bytes >= 8_000_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracers_do_not_stop_each_other():
+    a, b = Tracer("a"), Tracer("b")
+    with a.stage("a"):
+        with b.stage("b"):
+            pass
+        # b ended first: tracemalloc must still be running for a
+        assert tracemalloc.is_tracing()
+        allocate(4_000_000)
+    assert a.records[0].peak_bytes >= 4_000_000
+    assert not tracemalloc.is_tracing()
+
+
+def test_concurrent_tracers():
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def run():
+        tracer = Tracer()
+        try:
+            for _ in range(20):
+                with tracer.stage("work"):
+                    barrier.wait(timeout=5)
+                    allocate(800_000)
+            # Overlapping stages see each other's allocations, so peaks are
+            # only approximate, but every stage is still sampled
+            assert all(r.peak_bytes is not None and r.peak_bytes >= 0 for r in tracer.records)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert not tracemalloc.is_tracing()
+
+
+def test_running_tracemalloc_is_left_alone():
+    tracemalloc.start()
+    try:
+        allocate(4_000_000)
+        tracer = Tracer()
+        with tracer.stage("s"):
+            pass
+        assert tracemalloc.is_tracing()
+        # The caller's peak was not reset
+        assert tracemalloc.get_traced_memory()[1] >= 4_000_000
+        assert tracer.records[0].peak_bytes is None
+    finally:
+        tracemalloc.stop()
+
+
+def test_errors_timings_and_disabled_tracers():
+    tracer = Tracer(memory=False)
+
+    @tracer.traced()
+    def frame():
+        return pd.DataFrame(np.zeros((10, 3)))
+
+    frame()
+    with pytest.raises(ValueError):
+        with tracer.stage("boom"):
+            raise ValueError
+    ok, boom = tracer.records
+    assert (ok.name, ok.rows, ok.cols, ok.peak_bytes) == ("frame", 10, 3, None)
+    assert ok.wall_s >= 0 and boom.error == "ValueError"
+    assert list(tracer.to_frame()["stage"]) == ["frame", "boom"]
+    assert len(tracer.to_json_lines().splitlines()) == 2
+
+    with NULL_TRACER.stage("x") as stage:
+        assert stage.record_shape(1) == 1
+    assert NULL_TRACER.records == []
+
+
+def test_data_nbytes():
+    df = pd.DataFrame(np.zeros((100, 4)))
+    assert data_nbytes(df) == df.memory_usage(index=True).sum()
+    assert data_nbytes(np.zeros(10)) == 80
+    assert data_nbytes({"a": np.zeros(10), "b": "x"}) == 80
+    assert data_nbytes("x") is None
+    metrics = compute_all_metrics(pd.DataFrame(np.random.default_rng(0).uniform(1, 2, (30, 3))))
+    assert data_nbytes(metrics) == sum(data_nbytes(v) for v in vars(metrics).values()
+                                       if data_nbytes(v) is not None)
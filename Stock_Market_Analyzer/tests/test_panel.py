@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaning import clean_data
+from panel import PricePanel
+from synthetic import synthetic_ohlcv
+
+
+def test_get_field_is_a_view_matching_the_columns():
+    cleaned = clean_data(synthetic_ohlcv(30, 200, seed=1), gap_policy='keep')
+    panel = PricePanel.from_frame(cleaned)
+    assert panel.shape == (6, len(cleaned), 30)
+
+    close = panel.get_field('adj_close')
+    assert np.shares_memory(close, panel.values) and close.flags['C_CONTIGUOUS']
+    expected = cleaned[[f"S{i:05d}_Adj Close" for i in range(30)]].to_numpy()
+    np.testing.assert_array_equal(close, expected)
+    pd.testing.assert_index_equal(panel.close_prices().columns, pd.Index([f"S{i:05d}" for i in range(30)]))
+
+
+def test_missing_pairs_are_nan():
+    raw = synthetic_ohlcv(4, 50, seed=2).drop(columns=[("S00001", "Close")])
+    panel = PricePanel.from_frame(raw, dtype=np.float32, fields=["Close", "Volume"])
+    close = panel.get_frame("Close")
+    assert panel.values.dtype == np.float32 and panel.fields == ["Close", "Volume"]
+    assert close["S00001"].isna().all()
+    np.testing.assert_array_equal(close["S00002"], raw[("S00002", "Close")].astype(np.float32))
+    long = panel.to_long()
+    assert long.loc[(raw.index[3], "S00003"), "Volume"] == np.float32(raw[("S00003", "Volume")].iloc[3])
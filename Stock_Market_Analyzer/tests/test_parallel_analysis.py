@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from data_analysis import compute_all_metrics
+from parallel_analysis import parallel_metrics
+from synthetic import factor_returns
+
+
+def test_matches_in_memory_metrics():
+    rng = np.random.default_rng(0)
+    values = 20 * np.exp(np.cumsum(factor_returns(400, 30, rng=rng), axis=0))
+    prices = pd.DataFrame(values, index=pd.bdate_range("2020-01-01", periods=400),
+                          columns=[f"T{i}" for i in range(30)])
+    prices.iloc[50, 4] = 0.0  # an infinite return drops that row for every ticker
+    prices["FLAT"] = 10.0
+
+    expected = compute_all_metrics(prices)
+    result = parallel_metrics(prices, n_workers=3, block_size=8)
+    pd.testing.assert_frame_equal(result.daily_returns, expected.daily_returns, check_freq=False)
+    pd.testing.assert_frame_equal(result.cumulative_returns, expected.cumulative_returns)
+    for name in ("mean", "std", "volatility", "sharpe", "max_drawdown"):
+        pd.testing.assert_series_equal(getattr(result, name), getattr(expected, name), rtol=1e-9)
+    pd.testing.assert_frame_equal(result.correlation, expected.correlation, atol=1e-10)
+    pd.testing.assert_frame_equal(result.covariance, expected.covariance, atol=1e-14)
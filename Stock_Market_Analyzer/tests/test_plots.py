@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from utils.plot_corr_matrix import (ANNOTATE_MAX_TICKERS, aggregate_corr_matrix, cluster_labels,
+                                    plot_corr_matrix)
+from utils.plot_cumulative_returns import plot_cumulative_returns
+
+
+def cumulative(n_days=3000, n_tickers=5, seed=0):
+    rng = np.random.default_rng(seed)
+    growth = np.cumprod(1 + rng.normal(0.0004, 0.01, (n_days, n_tickers)), axis=0) - 1
+    index = pd.bdate_range("2010-01-01", periods=n_days)
+    return pd.DataFrame(growth, index=index, columns=[f"T{i}" for i in range(n_tickers)])
+
+
+def baseline_traces(cum_returns):
+    """Traces of the original plot: every point of every column."""
+    return [go.Scatter(x=cum_returns.index, y=cum_returns[c], name=c, mode='lines') for c in cum_returns]
+
+
+def test_full_resolution_matches_baseline_traces():
+    cum = cumulative(n_days=300)
+    fig = plot_cumulative_returns(cum, method=None)
+    for trace, expected in zip(fig.data, baseline_traces(cum), strict=True):
+        assert isinstance(trace, go.Scatter) and trace.name == expected.name and trace.mode == 'lines'
+        np.testing.assert_array_equal(pd.DatetimeIndex(trace.x), pd.DatetimeIndex(expected.x))
+        np.testing.assert_array_equal(trace.y, expected.y)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsampled_traces_are_points_of_the_baseline(method):
+    cum = cumulative()
+    fig = plot_cumulative_returns(cum, width_px=400, method=method)
+    for trace, column in zip(fig.data, cum.columns, strict=True):
+        assert trace.name == column and len(trace.x) <= 402
+        x = pd.DatetimeIndex(trace.x)
+        assert x.is_monotonic_increasing and x[0] == cum.index[0] and x[-1] == cum.index[-1]
+        np.testing.assert_array_equal(trace.y, cum[column].loc[x].to_numpy())
+    if method == "minmax":
+        # The extremes of every series survive
+        for trace, column in zip(fig.data, cum.columns):
+            assert max(trace.y) == cum[column].max() and min(trace.y) == cum[column].min()
+
+
+def test_webgl_above_threshold():
+    cum = cumulative(n_days=300)
+    assert isinstance(plot_cumulative_returns(cum, webgl_threshold=100).data[0], go.Scattergl)
+
+
+def correlation(n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(500, 4))
+    loadings = rng.normal(size=(4, n_tickers))
+    data = factors @ loadings + rng.normal(size=(500, n_tickers))
+    return pd.DataFrame(data, columns=[f"T{i:03d}" for i in range(n_tickers)]).corr()
+
+
+@pytest.mark.parametrize("n_tickers", [10, 60])
+def test_heatmap_cells_match_their_labels(n_tickers):
+    corr = correlation(n_tickers)
+    heatmap = plot_corr_matrix(corr).data[0]
+    if n_tickers > ANNOTATE_MAX_TICKERS:
+        # Clustered, so the axes are no longer in the input order
+        assert list(heatmap.x) != list(corr.columns)
+    for i, row in enumerate(heatmap.y):
+        for j, col in enumerate(heatmap.x):
+            assert tuple(heatmap.customdata[i][j]) == (row, col)
+            assert heatmap.z[i][j] == corr.loc[row, col]
+
+
+def test_clicked_block_drills_down_to_its_members():
+    corr = correlation(150)
+    groups = cluster_labels(corr)
+    heatmap = plot_corr_matrix(corr).data[0]
+    labels = aggregate_corr_matrix(corr, groups)
+    for i, row in enumerate(heatmap.y):
+        key = heatmap.customdata[i][0][0]
+        size = sum(g == key for g in groups.values())
+        assert row == f"{key} ({size})"
+        np.testing.assert_allclose(heatmap.z[i], labels.loc[row, list(heatmap.x)], equal_nan=True)
+
+        drilled = plot_corr_matrix(corr, block=key).data[0]
+        assert sorted(drilled.x) == sorted(t for t, g in groups.items() if g == key)
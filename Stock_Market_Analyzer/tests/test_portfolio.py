@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+from portfolio import (efficient_frontier, max_sharpe, min_variance, portfolio_stats, risk_contributions,
+                       risk_parity, shrink_covariance)
+from synthetic import factor_returns
+
+
+def returns(n_days=500, n_tickers=12, seed=0):
+    data = factor_returns(n_days, n_tickers, rng=seed)
+    return pd.DataFrame(data, columns=[f"T{i}" for i in range(n_tickers)])
+
+
+def slsqp(objective, k):
+    """Reference long-only, fully invested optimum from scipy."""
+    result = minimize(objective, np.full(k, 1 / k), method="SLSQP", bounds=[(0, 1)] * k,
+                      constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1}],
+                      options={"ftol": 1e-15, "maxiter": 1000})
+    return result.x
+
+
+def test_shrink_covariance_matches_ledoit_wolf_formula():
+    df = returns()
+    x = df.to_numpy() - df.to_numpy().mean(axis=0)
+    n, k = x.shape
+    sample = x.T @ x / n
+    mu = np.trace(sample) / k
+    target = mu * np.eye(k)
+    d2 = ((sample - target) ** 2).sum()
+    b2 = min(sum(((np.outer(row, row) - sample) ** 2).sum() for row in x) / n ** 2, d2)
+    expected = (b2 / d2 * target + (1 - b2 / d2) * sample) * n / (n - 1)
+
+    covariance, shrinkage = shrink_covariance(df)
+    assert shrinkage == pytest.approx(b2 / d2)
+    np.testing.assert_allclose(covariance, expected, rtol=1e-10)
+
+
+def test_min_variance_and_max_sharpe_match_scipy():
+    df = returns(seed=1)
+    cov, mu = df.cov(), df.mean()
+    k = len(mu)
+
+    weights = min_variance(cov)
+    expected = slsqp(lambda w: w @ cov.to_numpy() @ w, k)
+    assert weights.sum() == pytest.approx(1) and (weights >= 0).all()
+    assert weights @ cov @ weights <= expected @ cov.to_numpy() @ expected * (1 + 1e-6)
+
+    weights = max_sharpe(cov, mu, risk_free=0.01)
+    expected = slsqp(lambda w: -portfolio_stats(w, cov, mu, risk_free=0.01)[2], k)
+    assert portfolio_stats(weights, cov, mu, risk_free=0.01)[2] >= \
+        portfolio_stats(expected, cov, mu, risk_free=0.01)[2] - 1e-6
+
+
+def test_efficient_frontier_is_monotonic():
+    df = returns(seed=2)
+    frontier = efficient_frontier(df.cov(), df.mean(), n_points=20)
+    assert (np.diff(frontier.returns) >= -1e-10).all()
+    assert (np.diff(frontier.volatility) >= -1e-10).all()
+    np.testing.assert_allclose(frontier.weights.sum(axis=1), 1)
+    # Ends at minimum variance and at the best single asset
+    np.testing.assert_allclose(frontier.weights.iloc[0], min_variance(df.cov()), atol=1e-6)
+    assert frontier.weights.iloc[-1].idxmax() == df.mean().idxmax()
+
+
+def test_risk_parity_budgets():
+    df = returns(seed=3)
+    budgets = np.linspace(1, 2, df.shape[1])
+    weights = risk_parity(df.cov(), budgets)
+    np.testing.assert_allclose(risk_contributions(weights, df.cov()), budgets / budgets.sum(), atol=1e-8)
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from data_providers import DataProvider, LocalFileProvider
+from price_cache import NO_SESSIONS, PriceCache
+
+
+class StubProvider(DataProvider):
+    """Serves fixed daily rows, optionally failing silently or reporting empty ranges."""
+
+    name = "stub"
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.fail = False
+        self.no_sessions = False
+        self.calls = []
+
+    def download(self, tickers, start_date, end_date):
+        self.calls.append((tuple(tickers), start_date, end_date))
+        if self.fail:
+            # Like yfinance after a throttled request: no exception, no rows
+            return pd.DataFrame()
+        frames = {t: self.frames[t].loc[start_date:pd.Timestamp(end_date) - pd.Timedelta(days=1)]
+                  for t in tickers}
+        data = pd.concat({t: f for t, f in frames.items() if len(f)}, axis=1) if any(
+            len(f) for f in frames.values()) else pd.DataFrame()
+        if self.no_sessions:
+            data.attrs[NO_SESSIONS] = [t for t, f in frames.items() if f.empty]
+        return data
+
+
+def daily(start, periods):
+    index = pd.bdate_range(start, periods=periods, name="Date")
+    return pd.DataFrame({"Close": range(periods), "Volume": 100}, index=index, dtype=float)
+
+
+def test_silent_failure_does_not_extend_coverage(tmp_path):
+    provider = StubProvider({"A": daily("2024-01-01", 60)})
+    cache = PriceCache(tmp_path)
+    cache.get(["A"], "2024-01-01", "2024-02-01", provider)
+    assert cache.coverage("A") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01"))
+
+    provider.fail = True
+    cache.get(["A"], "2024-01-01", "2024-03-01", provider)
+    assert cache.coverage("A") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01"))
+
+    # The gap is fetched again once the provider recovers
+    provider.fail = False
+    data = cache.get(["A"], "2024-01-01", "2024-03-01", provider)
+    assert provider.calls[-1] == (("A",), "2024-02-01", "2024-03-01")
+    pd.testing.assert_frame_equal(data["A"], provider.frames["A"].loc[:"2024-02-29"], check_freq=False)
+    assert cache.coverage("A") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01"))
+
+
+def test_unseen_ticker_without_data_is_not_cached(tmp_path):
+    provider = StubProvider({"A": daily("2024-01-01", 5), "B": daily("2024-01-01", 5)})
+    provider.fail = True
+    cache = PriceCache(tmp_path)
+    assert cache.get(["A", "B"], "2024-01-01", "2024-01-08", provider).empty
+    assert cache.coverage("A") is None and cache.coverage("B") is None
+
+
+def test_reported_empty_range_is_covered(tmp_path):
+    provider = StubProvider({"A": daily("2024-01-01", 5)})
+    provider.no_sessions = True
+    cache = PriceCache(tmp_path)
+    cache.get(["A"], "2024-01-01", "2024-01-06", provider)
+    # A weekend: the provider reports it has no sessions, so it is not asked again
+    cache.get(["A"], "2024-01-01", "2024-01-08", provider)
+    cache.get(["A"], "2024-01-01", "2024-01-08", provider)
+    assert len(provider.calls) == 2
+    assert cache.coverage("A") == (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-08"))
+
+
+def test_local_provider_reports_empty_windows(tmp_path):
+    provider = LocalFileProvider(tmp_path)
+    provider.write("A", daily("2024-01-01", 5))
+    data = provider.download(["A", "MISSING"], "2024-01-06", "2024-01-08")
+    assert data.empty and data.attrs[NO_SESSIONS] == ["A"]
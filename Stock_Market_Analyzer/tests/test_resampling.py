@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_providers import LocalFileProvider
+from resampling import resample_ohlcv
+
+AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def minute_rows(tz, n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-03-01 09:30', tz=tz).value
+    index = pd.DatetimeIndex(np.sort(start + rng.integers(0, 90 * 86400 * 10 ** 9, n)), tz='UTC')
+    index = index.tz_convert(tz) if tz else index.tz_localize(None)
+    close = 100 + rng.normal(0, 0.1, n).cumsum()
+    frame = pd.DataFrame({'Open': close, 'High': close + 0.1, 'Low': close - 0.1, 'Close': close,
+                          'Volume': rng.integers(1, 100, n)}, index=index)
+    frame.loc[frame.index[::7], 'Close'] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize('tz', [None, 'America/New_York'])
+@pytest.mark.parametrize('bar', ['1min', '5min', 'h', 'D', 'W', 'ME'])
+def test_matches_pandas_resample(tz, bar):
+    rows = minute_rows(tz)
+    expected = rows.resample(bar).agg(AGGREGATIONS)
+    expected = expected[rows['Volume'].resample(bar).count() > 0]
+    pd.testing.assert_frame_equal(resample_ohlcv(rows, bar), expected, check_freq=False)
+
+
+def test_local_provider_resamples_tz_aware_files(tmp_path):
+    rows = minute_rows('America/New_York')
+    provider = LocalFileProvider(tmp_path, bar_size='30min')
+    provider.write('AAA', rows)
+    bars = provider.read('AAA', '2024-03-01', '2024-04-01')
+    assert len(bars) and bars.index.tz is not None
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'npy', 'csv'])
+def test_local_provider_reads_tz_aware_window(tmp_path, fmt):
+    rows = minute_rows('America/New_York', n=2000)
+    provider = LocalFileProvider(tmp_path, fmt=fmt)
+    provider.write('AAA', rows, fmt=fmt)
+    start, end = (pd.Timestamp(t, tz='America/New_York') for t in ('2024-03-10', '2024-03-20'))
+    window = provider.read('AAA', start, end)
+    expected = rows.loc['2024-03-10':'2024-03-19']
+    np.testing.assert_allclose(window['Open'], expected['Open'])
+    assert (window.index == expected.index).all()
@@ -0,0 +1,49 @@
+from result_cache import ResultCache, make_key, memoize
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None and len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_get_or_compute_runs_once_per_key():
+    cache = ResultCache()
+    calls = []
+
+    @memoize(cache)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert [square(3), square(3), square(4)] == [9, 9, 16]
+    assert calls == [3, 4]
+    assert cache.get_or_compute("k", lambda: None) is None and "k" in cache
+
+
+def test_make_key_normalizes_tickers():
+    assert make_key(" aapl", "2024-01-01", "2024-02-01") == make_key(["AAPL"], "2024-01-01", "2024-02-01")
+    assert make_key(["AAPL", "MSFT"], "2024-01-01", "2024-02-01") != make_key(["MSFT", "AAPL"], "2024-01-01",
+                                                                            "2024-02-01")
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling_metrics import rolling_beta, rolling_correlation, rolling_sharpe, rolling_volatility
+
+
+def returns(n=400, k=6, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.normal(0.0005, 0.01, (n, k))
+    data[rng.random((n, k)) < 0.05] = np.nan
+    data[:80, 2] = np.nan  # late listing
+    return pd.DataFrame(data, index=pd.bdate_range("2020-01-01", periods=n), columns=list("ABCDEF"))
+
+
+@pytest.mark.parametrize("window,min_periods", [(20, None), (60, 30)])
+def test_volatility_and_sharpe_match_pandas_rolling(window, min_periods):
+    df = returns()
+    roll = df.rolling(window, min_periods=min_periods or window)
+    expected_vol = roll.std() * np.sqrt(252)
+    pd.testing.assert_frame_equal(rolling_volatility(df, window, min_periods), expected_vol, atol=1e-12)
+    expected_sharpe = roll.mean() * 252 / expected_vol
+    pd.testing.assert_frame_equal(rolling_sharpe(df, window, min_periods=min_periods), expected_sharpe,
+                                  rtol=1e-8)
+
+
+def test_beta_and_correlation_match_pandas_rolling():
+    df = returns(seed=1)
+    bench = df.mean(axis=1)
+    window = 40
+    # pandas uses the rows where both series have a value, like rolling_beta
+    expected_beta = pd.DataFrame({c: df[c].rolling(window).cov(bench) / bench.where(df[c].notna())
+                                  .rolling(window).var() for c in df})
+    pd.testing.assert_frame_equal(rolling_beta(df, bench, window), expected_beta, atol=1e-10)
+
+    expected = df.rolling(window).corr()
+    result = rolling_correlation(df, window)
+    for t in (window, 150, len(df) - 1):
+        np.testing.assert_allclose(result[t], expected.loc[df.index[t]].to_numpy(), atol=1e-10)
+    pd.testing.assert_frame_equal(rolling_correlation(df, window, other=bench),
+                                  df.rolling(window).corr(bench), atol=1e-10)
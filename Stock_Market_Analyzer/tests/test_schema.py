@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import clean_data
+from schema import ColumnSchema, get_schema, split_column
+from synthetic import synthetic_ohlcv
+
+
+@pytest.mark.parametrize("column,expected", [
+    ("AAPL_Adj Close", ("AAPL", "Adj Close")),
+    ("AAPL_adj_close", ("AAPL", "adj_close")),
+    ("BRK_B_Close", ("BRK_B", "Close")),
+    ("T_Stock Splits", ("T", "Stock Splits")),
+    ("Adj Close", ("", "Adj Close")),
+    ("adj_close", ("", "adj_close")),
+    ("AAPL_Custom", ("AAPL", "Custom")),
+    (("A", "Adj Close"), ("A", "Adj Close")),
+])
+def test_split_column(column, expected):
+    assert split_column(column) == expected
+
+
+def test_normalized_labels_resolve_to_the_same_schema():
+    columns = ["A_Adj Close", "A_Close", "AA_Adj Close", "AA_Close"]
+    normalized = [c.lower().replace(" ", "_") for c in columns]
+    schema = ColumnSchema.from_columns(normalized)
+    assert list(schema.tickers) == ["a", "aa"] and schema.fields == ["adj_close", "close"]
+    assert schema.close_field() == "Adj Close"
+    assert schema.column("aa", "Adj Close") == 2
+
+
+def test_select_close_from_clean_data():
+    raw = synthetic_ohlcv(12, 80, seed=1, fields=("Close", "Adj Close", "Volume"))
+    cleaned = clean_data(raw, gap_policy='keep')
+    schema = get_schema(cleaned)
+    close = schema.select(cleaned, schema.close_field())
+    assert list(close.columns) == [f"S{i:05d}" for i in range(12)]
+    expected = cleaned[[f"S{i:05d}_Adj Close" for i in range(12)]]
+    np.testing.assert_array_equal(close.to_numpy(), expected.to_numpy())
+    with pytest.raises(KeyError):
+        schema.select(cleaned, "Open")
+
+
+def test_duplicate_pairs_are_rejected():
+    with pytest.raises(ValueError):
+        ColumnSchema.from_columns(["A_Close", "A_close"])
+    assert np.array_equal(ColumnSchema.from_columns(["A_Close", "B_Close"]).field_positions("close"), [0, 1])
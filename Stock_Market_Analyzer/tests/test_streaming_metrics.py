@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_metrics import StreamingMetrics
+
+
+@pytest.mark.parametrize("name", ["state", "state.npz"])
+def test_checkpoint_restore_same_path(tmp_path, name):
+    metrics = StreamingMetrics(["A", "B"])
+    for t, prices in enumerate([[10.0, 20.0], [11.0, 19.0], [12.0, 21.0]]):
+        metrics.update(pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=t), pd.Series(prices, index=["A", "B"]))
+    metrics.checkpoint(tmp_path / name)
+    restored = StreamingMetrics.restore(tmp_path / name)
+    np.testing.assert_allclose(restored.covariance(), metrics.covariance())
+    assert restored.last_timestamp == metrics.last_timestamp
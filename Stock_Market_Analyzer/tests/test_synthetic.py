@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from bench_pipeline import compare, run_grid
+from synthetic import FIELDS, factor_returns, synthetic_ohlcv
+
+
+def test_same_seed_gives_the_same_frame():
+    a = synthetic_ohlcv(20, 100, seed=3)
+    pd.testing.assert_frame_equal(a, synthetic_ohlcv(20, 100, seed=3))
+    assert not a.equals(synthetic_ohlcv(20, 100, seed=4))
+
+
+def test_layout():
+    df = synthetic_ohlcv(7, 50, fields=("Volume", "Close"), seed=1)
+    assert df.shape == (50, 14)
+    assert list(df.columns.get_level_values(1)[:2]) == ["Close", "Volume"]
+    assert list(df.columns.get_level_values(0).unique()) == [f"S{i:05d}" for i in range(7)]
+    pd.testing.assert_index_equal(df.index, pd.bdate_range("2000-01-03", periods=50))
+
+
+def test_ohlc_consistency():
+    df = synthetic_ohlcv(30, 200, seed=2, missing_cells=0, gaps=0, late_listing=0)
+    assert not df.isna().any().any()
+    field = lambda f: df.xs(f, axis=1, level=1).to_numpy()
+    high, low = field("High"), field("Low")
+    for f in ("Open", "Close"):
+        assert (field(f) <= high).all() and (field(f) >= low).all()
+    assert (field("Adj Close") <= field("Close")).all()
+    assert (field("Volume") == np.round(field("Volume"))).all()
+
+
+def test_late_listings_and_gaps_are_nan():
+    df = synthetic_ohlcv(200, 300, seed=5, late_listing=0.5, missing_cells=0, gaps=0)
+    close = df.xs("Close", axis=1, level=1)
+    first = close.notna().idxmax()
+    late = first > close.index[0]
+    assert 0.3 < late.mean() < 0.7
+    # Once listed, a ticker has no holes when cells and gaps are disabled
+    assert all(close.loc[day:, t].notna().all() for t, day in first.items())
+    # The same cells are missing in every field
+    missing = df.isna().to_numpy().reshape(300, 200, len(FIELDS))
+    assert (missing == missing[:, :, :1]).all()
+
+
+def test_factor_returns_are_correlated():
+    r = factor_returns(2000, 50, rng=0)
+    corr = np.corrcoef(r.T)[np.triu_indices(50, 1)]
+    assert r.shape == (2000, 50) and corr.mean() > 0.1
+
+
+def test_run_grid_and_compare(capsys):
+    results = run_grid([5], [60], ["Close", "Adj Close"], repeat=1, seed=0,
+                       dense_limit=10, max_cells=10_000)
+    ok = {r["stage"] for r in results if r["status"] == "ok"}
+    assert {"clean_data", "compute_all_metrics", "plot_corr_matrix", "pipeline"} <= ok
+    assert all(r["peak_mb"] >= 0 for r in results if r["status"] == "ok")
+
+    skipped = run_grid([5], [60], ["Close"], repeat=1, seed=0, dense_limit=10, max_cells=10)
+    assert skipped == [{"tickers": 5, "days": 60, "stage": "all", "status": "skipped"}]
+
+    slower = [dict(r, seconds=r["seconds"] * 2) for r in results if "seconds" in r]
+    regressions = compare(slower, {"results": results}, threshold=1.5)
+    assert len(regressions) == len(slower)
+    assert compare(results, {"results": results}, threshold=1.5) == []
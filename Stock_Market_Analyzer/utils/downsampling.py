@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def _bucket_edges(n, n_out):
+    """Row boundaries of the n_out - 2 inner buckets (first/last points are kept as-is)."""
+    return np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of several series at once.
+
+    Args:
+        x: Shared x values, shape (n,)
+        y: Series values, shape (n, k)
+        n_out: Points to keep per series
+
+    Returns:
+        Integer array (n_out, k) of selected row indices for each series
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n, k = y.shape
+    if n_out >= n or n_out < 3:
+        return np.repeat(np.arange(n)[:, None], k, axis=1)
+
+    edges = _bucket_edges(n, n_out)
+    selected = np.empty((n_out, k), dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    cols = np.arange(k)
+
+    ax = np.full(k, x[0])
+    ay = y[0].copy()
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        # Average point of the next bucket (the last point for the final bucket)
+        if b + 2 < len(edges):
+            nxt = slice(stop, edges[b + 2])
+            cx = x[nxt].mean()
+            cy = np.nanmean(y[nxt], axis=0)
+        else:
+            cx, cy = x[-1], y[-1]
+
+        bx = x[start:stop, None]
+        by = y[start:stop]
+        area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+        area[np.isnan(area)] = -1.0
+        pick = start + area.argmax(axis=0)
+
+        selected[b + 1] = pick
+        ax = x[pick]
+        ay = y[pick, cols]
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: keep the lowest and highest point of each bucket.
+
+    Returns:
+        Integer array (~n_out, k) of selected row indices, in time order per series
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n, k = y.shape
+    n_buckets = max((n_out - 2) // 2, 1)
+    if n_out >= n:
+        return np.repeat(np.arange(n)[:, None], k, axis=1)
+
+    edges = _bucket_edges(n, n_buckets + 1)
+    picks = [np.zeros((1, k), dtype=np.int64)]
+    filled = np.where(np.isnan(y), np.inf, y)
+    for start, stop in zip(edges[:-1], edges[1:]):
+        lo = start + filled[start:stop].argmin(axis=0)
+        hi = start + np.where(np.isinf(filled[start:stop]), -np.inf, filled[start:stop]).argmax(axis=0)
+        picks.append(np.sort(np.vstack([lo, hi]), axis=0))
+    picks.append(np.full((1, k), n - 1, dtype=np.int64))
+    return np.vstack(picks)
@@ -1,25 +1,130 @@
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 
-def plot_corr_matrix(corr_matrix):
+# Cells are annotated with their value only up to this many tickers
+ANNOTATE_MAX_TICKERS = 20
+# Above this many tickers the heatmap shows cluster/sector blocks instead
+MAX_TICKERS = 100
+
+
+def _linkage(corr_matrix):
+    """Average-linkage tree on the correlation distance 1 - corr."""
+    # scipy is only needed once a matrix is large enough to cluster
+    from scipy.cluster.hierarchy import linkage
+    from scipy.spatial.distance import squareform
+
+    dist = 1.0 - np.nan_to_num(corr_matrix.to_numpy(dtype=np.float64), nan=0.0)
+    dist = np.clip((dist + dist.T) / 2, 0.0, 2.0)
+    np.fill_diagonal(dist, 0.0)
+    return linkage(squareform(dist, checks=False), method='average')
+
+
+def cluster_order(corr_matrix):
+    """Tickers reordered so that highly correlated ones sit next to each other."""
+    if len(corr_matrix) < 3:
+        return list(corr_matrix.columns)
+    from scipy.cluster.hierarchy import leaves_list
+    return list(corr_matrix.columns[leaves_list(_linkage(corr_matrix))])
+
+
+def cluster_labels(corr_matrix, n_clusters=20):
+    """Map each ticker to a hierarchical-clustering group label."""
+    if len(corr_matrix) <= n_clusters:
+        return {t: f"Cluster {i + 1}" for i, t in enumerate(corr_matrix.columns)}
+    from scipy.cluster.hierarchy import fcluster
+    ids = fcluster(_linkage(corr_matrix), t=n_clusters, criterion='maxclust')
+    return {t: f"Cluster {i}" for t, i in zip(corr_matrix.columns, ids)}
+
+
+def _aggregate(corr_matrix, groups):
+    """Group x group average correlations, the group names and their sizes."""
+    labels = pd.Series(groups).reindex(corr_matrix.columns).fillna("Other")
+    names = list(dict.fromkeys(labels))
+    membership = (labels.to_numpy()[:, None] == np.array(names)[None, :]).astype(np.float64)
+
+    values = corr_matrix.to_numpy(dtype=np.float64)
+    finite = np.isfinite(values)
+    np.fill_diagonal(finite, False)
+    totals = membership.T @ np.where(finite, values, 0.0) @ membership
+    counts = membership.T @ finite.astype(np.float64) @ membership
+    with np.errstate(divide='ignore', invalid='ignore'):
+        block = totals / counts
+    return block, names, membership.sum(axis=0).astype(int)
+
+
+def aggregate_corr_matrix(corr_matrix, groups):
+    """
+    Average correlation between (and within) groups of tickers.
+
+    Diagonal blocks average the off-diagonal pairs inside each group.
+    """
+    block, names, sizes = _aggregate(corr_matrix, groups)
+    names = [f"{name} ({size})" for name, size in zip(names, sizes)]
+    return pd.DataFrame(block, index=names, columns=names)
+
+
+def plot_corr_matrix(corr_matrix, groups=None, block=None, n_clusters=20,
+                     max_tickers=MAX_TICKERS, annotate_max=ANNOTATE_MAX_TICKERS):
     """
     Create a Plotly heatmap for correlation matrix
+
+    Large matrices are reordered by hierarchical clustering and lose their
+    cell annotations. When groups ({ticker: sector}) is given, or above
+    max_tickers (using clusters), tickers are aggregated into blocks; pass
+    block=<label> to drill down into the tickers of one block.
+
+    Every cell's customdata holds the (row, column) tickers, or group labels
+    for blocks, taken from the same reordered labels as the axes, so a
+    clicked cell can be passed straight back as block=customdata[0].
     """
+    title = "Correlation Matrix of Stock Returns"
+    n_tickers = len(corr_matrix)
+
+    aggregate = groups is not None or n_tickers > max_tickers
+    if groups is None and (aggregate or block is not None):
+        groups = cluster_labels(corr_matrix, n_clusters)
+    if block is not None:
+        members = [t for t in corr_matrix.columns if groups.get(t) == block]
+        corr_matrix = corr_matrix.loc[members, members]
+        keys = list(corr_matrix.columns)
+        title = f"{title}: {block}"
+    elif aggregate:
+        values, keys, sizes = _aggregate(corr_matrix, groups)
+        names = [f"{name} ({size})" for name, size in zip(keys, sizes)]
+        corr_matrix = pd.DataFrame(values, index=names, columns=names)
+        title = f"{title} (average by group)"
+    else:
+        keys = list(corr_matrix.columns)
+
+    if len(corr_matrix) > annotate_max:
+        order = corr_matrix.columns.get_indexer(cluster_order(corr_matrix))
+        corr_matrix = corr_matrix.iloc[order, order]
+        keys = [keys[i] for i in order]
+        annotations = {}
+    else:
+        annotations = dict(
+            text=corr_matrix.round(2).values,
+            texttemplate="%{text}",
+            textfont={"size": 12}
+        )
+    keys = np.array(keys, dtype=object)
+    customdata = np.stack(np.broadcast_arrays(keys[:, None], keys[None, :]), axis=-1)
+
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
         x=corr_matrix.columns,
         y=corr_matrix.index,
+        customdata=customdata,
         colorscale='RdBu',
         zmin=-1,
         zmax=1,
         hoverongaps=False,
-        text=corr_matrix.round(2).values,
-        texttemplate="%{text}",
-        textfont={"size": 12}
+        **annotations
     ))
-    
+
     fig.update_layout(
-        title="Correlation Matrix of Stock Returns",
+        title=title,
         xaxis_title="Stocks",
         yaxis_title="Stocks",
         plot_bgcolor='rgba(0,0,0,0)',
@@ -27,5 +132,5 @@ def plot_corr_matrix(corr_matrix):
         font=dict(color='black'),
         height=400
     )
-    
-    return fig
\ No newline at end of file
+
+    return fig
@@ -1,20 +1,57 @@
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 
-def plot_cumulative_returns(cum_returns):
+from utils.downsampling import lttb_indices, minmax_indices
+
+# Above this many plotted points in total, draw with WebGL (Scattergl)
+WEBGL_THRESHOLD = 20000
+
+
+def plot_cumulative_returns(cum_returns, width_px=800, method='lttb', webgl_threshold=WEBGL_THRESHOLD):
     """
     Create a Plotly line chart for cumulative returns
+
+    Each series is downsampled to about one point per horizontal pixel
+    (width_px) with a shape-preserving method ('lttb', 'minmax' or None to
+    plot every point), so the figure size follows the chart width rather
+    than the history length.
     """
     fig = go.Figure()
-    
-    for column in cum_returns.columns:
-        fig.add_trace(go.Scatter(
-            x=cum_returns.index,
-            y=cum_returns[column],
+
+    # The index is converted to an array once; each trace takes its rows from it
+    x_values = cum_returns.index.to_numpy()
+    if isinstance(cum_returns.index, pd.DatetimeIndex):
+        x_numeric = cum_returns.index.asi8.astype(np.float64)
+    else:
+        x_numeric = np.arange(len(cum_returns), dtype=np.float64)
+    y_values = cum_returns.to_numpy(dtype=np.float64)
+
+    n_points = max(int(width_px), 3)
+    if method is None or len(cum_returns) <= n_points:
+        rows = None
+    elif method == 'lttb':
+        rows = lttb_indices(x_numeric, y_values, n_points)
+    elif method == 'minmax':
+        rows = minmax_indices(y_values, n_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    plotted = len(cum_returns) if rows is None else rows.shape[0]
+    scatter = go.Scattergl if plotted * len(cum_returns.columns) > webgl_threshold else go.Scatter
+
+    for j, column in enumerate(cum_returns.columns):
+        if rows is None:
+            x, y = x_values, y_values[:, j]
+        else:
+            x, y = x_values[rows[:, j]], y_values[rows[:, j], j]
+        fig.add_trace(scatter(
+            x=x,
+            y=y,
             name=column,
             mode='lines'
         ))
-    
+
     fig.update_layout(
         title="Cumulative Returns Over Time",
         xaxis_title="Date",
@@ -25,8 +62,8 @@ def plot_cumulative_returns(cum_returns):
         font=dict(color='black'),
         height=400
     )
-    
+
     fig.update_xaxes(gridcolor='lightgray')
     fig.update_yaxes(gridcolor='lightgray')
-    
-    return fig
\ No newline at end of file
+
+    return fig
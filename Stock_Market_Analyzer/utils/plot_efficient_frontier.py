@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.plot_cumulative_returns import WEBGL_THRESHOLD
+
+
+def plot_efficient_frontier(frontier, asset_returns=None, asset_volatility=None, portfolios=None):
+    """
+    Create a Plotly risk/return chart of the efficient frontier
+
+    frontier is a portfolio.EfficientFrontier. Individual tickers are drawn
+    as points when their annualized returns and volatilities are given, and
+    portfolios ({name: (annual return, annual volatility)}) are highlighted.
+    """
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=frontier.volatility,
+        y=frontier.returns,
+        mode='lines',
+        name='Efficient Frontier',
+        customdata=np.asarray(frontier.sharpe),
+        hovertemplate="Volatility %{x:.1%}<br>Return %{y:.1%}<br>Sharpe %{customdata:.2f}<extra></extra>"
+    ))
+
+    if asset_returns is not None and asset_volatility is not None:
+        assets = pd.DataFrame({'ret': asset_returns, 'vol': asset_volatility}).dropna()
+        scatter = go.Scattergl if len(assets) > WEBGL_THRESHOLD else go.Scatter
+        fig.add_trace(scatter(
+            x=assets['vol'],
+            y=assets['ret'],
+            mode='markers',
+            name='Stocks',
+            text=assets.index,
+            marker=dict(size=6, opacity=0.6),
+            hovertemplate="%{text}<br>Volatility %{x:.1%}<br>Return %{y:.1%}<extra></extra>"
+        ))
+
+    for name, (ret, vol) in (portfolios or {}).items():
+        fig.add_trace(go.Scatter(
+            x=[vol],
+            y=[ret],
+            mode='markers',
+            name=name,
+            marker=dict(size=12, symbol='star'),
+            hovertemplate=f"{name}<br>Volatility %{{x:.1%}}<br>Return %{{y:.1%}}<extra></extra>"
+        ))
+
+    fig.update_layout(
+        title="Efficient Frontier",
+        xaxis_title="Annualized Volatility",
+        yaxis_title="Annualized Return",
+        showlegend=True,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='black'),
+        height=400
+    )
+
+    fig.update_xaxes(gridcolor='lightgray', tickformat='.0%')
+    fig.update_yaxes(gridcolor='lightgray', tickformat='.0%')
+
+    return fig